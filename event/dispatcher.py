@@ -16,9 +16,11 @@
 # along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import time
 import logging
 import pygame
 from pygame.time import Clock
+from timeit import default_timer as timer
 from util.config import BUTTON_TYPE, USAGE, USE_LIRC, USE_ROTARY_ENCODERS, SCREEN_INFO, \
     FRAME_RATE, SHOW_MOUSE_EVENTS, FLIP_TOUCH_XY, WIDTH, HEIGHT, MULTI_TOUCH, GPIO, ROTARY_VOLUME_UP, ROTARY_VOLUME_DOWN, ROTARY_VOLUME_MUTE, \
     ROTARY_NAVIGATION_LEFT, ROTARY_NAVIGATION_RIGHT, ROTARY_NAVIGATION_SELECT, ROTARY_JITTER_FILTER, USE_BUTTONS, \
@@ -31,6 +33,7 @@ from event.gpiobutton import GpioButton
 from event.i2cbuttons import I2CButtons
 
 HOLD_BUTTON_SCREENS = [IMAGE_VIEWER_SCREEN]
+MAX_IDLE_TIMEOUT = 1.0
 
 # Maps IR remote control keys to keyboard keys
 lirc_keyboard_map = {"options": pygame.K_m,
@@ -80,6 +83,7 @@ class EventDispatcher(object):
         :param volume_control: volume control object       
         """
         self.screensaver_dispatcher = screensaver_dispatcher
+        self.util = util
         self.config = util.config
         self.volume_control = volume_control
         self.frame_rate = self.config[SCREEN_INFO][FRAME_RATE]
@@ -91,6 +95,7 @@ class EventDispatcher(object):
         self.screensaver_dispatcher.frame_rate = self.frame_rate
         self.lirc = None
         self.lirc_thread = None
+        self.pending_events = []
         self.init_lirc()
         self.init_buttons()
         self.init_rotary_encoders()
@@ -326,7 +331,8 @@ class EventDispatcher(object):
     def handle_single_touch(self):
         """ Handle single touch events """
         
-        events = pygame.event.get()
+        events = self.pending_events + pygame.event.get()
+        self.pending_events = []
 
         if self.current_screen and hasattr(self.current_screen, "name") and self.current_screen.name in HOLD_BUTTON_SCREENS:
             if self.hold_button(events):
@@ -465,6 +471,27 @@ class EventDispatcher(object):
         else:
             return handler
 
+    def get_idle_timeout(self):
+        """ Get the time which the main loop can wait for the next event.
+        The loop runs at the frame rate if there are animations, if input devices should be polled
+        or if the mouse button is held.
+
+        :return: time in seconds or None if the loop shouldn't wait
+        """
+        if self.lirc != None or self.multi_touch or self.util.compositor.is_animating():
+            return None
+
+        if pygame.mouse.get_pressed()[0]:
+            return None
+
+        timeout = self.screensaver_dispatcher.get_timeout()
+        if timeout == None:
+            return MAX_IDLE_TIMEOUT
+        elif timeout <= 1 / self.frame_rate:
+            return None
+        else:
+            return min(timeout, MAX_IDLE_TIMEOUT)
+
     def dispatch(self, player, shutdown):
         """ Dispatch events.  
               
@@ -483,8 +510,15 @@ class EventDispatcher(object):
         handler = self.get_handler()
         pygame.event.clear()
         clock = Clock()
+        compositor = self.util.compositor
+        compositor.start()
 
         while self.run_dispatcher:
+            timeout = self.get_idle_timeout()
+            if timeout:
+                self.pending_events = compositor.wait(timeout)
+            frame_start = timer()
+            cpu_start = time.thread_time()
             handler()
             if self.lirc != None:
                 code = self.lirc.nextcode()
@@ -492,4 +526,7 @@ class EventDispatcher(object):
                     self.handle_lirc_event(code)
             self.current_screen.refresh()
             self.screensaver_dispatcher.refresh()
+            compositor.flush(frame_start, cpu_start)
             clock.tick(self.frame_rate)
+
+        compositor.stop()
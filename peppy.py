@@ -53,6 +53,7 @@ from websiteparser.loyalbooks.loyalbooksparser import LoyalBooksParser
 from websiteparser.audioknigi.audioknigiparser import AudioKnigiParser
 from util.config import *
 from util.util import Util, LABELS, KEY_GENRE, PLAYER_RUNNING, PLAYER_SLEEPING
+from util.startup import Startup
 from util.keys import *
 from ui.player.bookplayer import BookPlayer
 from ui.screen.booktrack import BookTrack
@@ -88,41 +89,65 @@ from ui.screen.imageviewer import ImageViewer
 from ui.player.cdplayer import CdPlayerScreen
 from ui.player.bluetoothsink import BluetoothSinkScreen
 
+STAGE_INTERNET = "internet"
+STAGE_CONNECTIVITY = "connectivity"
+STAGE_UTIL = "util"
+STAGE_WEB_IMPORT = "web import"
+STAGE_WEB = "web server"
+STAGE_VOICE_ASSISTANT_IMPORT = "voice assistant import"
+STAGE_VOICE_ASSISTANT = "voice assistant"
+STAGE_SWITCH = "switch"
+STAGE_DISKS = "disks"
+STAGE_NAS = "nas"
+STAGE_SAMBA = "samba"
+STAGE_BLUETOOTH = "bluetooth"
+STAGE_AUDIO = "audio"
+STAGE_VU_METER = "vu meter"
+STAGE_SCREENSAVER = "screensaver"
+STAGE_ABOUT = "about screen"
+STAGE_FIRST_SCREEN = "initial screen"
+
+LOCAL_MODES = [AUDIO_FILES, COLLECTION, CD_PLAYER, AIRPLAY, SPOTIFY_CONNECT, BLUETOOTH_SINK]
+
 class Peppy(object):
     """ Main class """
     
     lock = RLock()        
     def __init__(self):
-        """ Initializer """
+        """ Initializer. The last used screen is shown as soon as the player is started,
+        the other subsystems are initialized in the background startup stages.
+        """
+        self.startup = Startup()
+        self.startup.add_task(STAGE_INTERNET, self.check_internet_connectivity)
 
-        connected_to_internet = self.check_internet_connectivity()
-    
-        self.util = Util(connected_to_internet)
+        self.util = self.startup.run_stage(STAGE_UTIL, Util, False)
         self.config = self.util.config
         self.cdutil = CdUtil(self.util)
+        self.startup.add_task(STAGE_CONNECTIVITY, self.set_internet_connectivity, [STAGE_INTERNET])
         
         self.use_web = self.config[USAGE][USE_WEB]
+        self.web_server = None
         self.players = {}
         self.volume_control = VolumeControl(self.util)
 
-        try:
-            self.util.switch_util.switch_power()
-        except:
-            pass
+        if self.use_web:
+            self.startup.add_task(STAGE_WEB_IMPORT, self.import_web_server)
+
+        self.voice_assistant = None
+        if self.config[USAGE][USE_VOICE_ASSISTANT]:
+            self.startup.add_task(STAGE_VOICE_ASSISTANT_IMPORT, self.import_voice_assistant)
+
+        self.startup.add_task(STAGE_SWITCH, self.switch_power)
 
         if self.config[LINUX_PLATFORM]:
             from util.diskmanager import DiskManager
             from util.nasmanager import NasManager
             self.disk_manager = DiskManager(self)
             self.nas_manager = NasManager(self)
+            self.startup.add_task(STAGE_DISKS, self.mount_disks, [STAGE_SWITCH])
+            self.startup.add_task(STAGE_NAS, self.mount_nases)
 
-            if self.config[DISK_MOUNT][MOUNT_AT_STARTUP]:
-                self.disk_manager.mount_all_usb_disks()
-                self.nas_manager.mount_all_nases()
-            if self.config[DISK_MOUNT][MOUNT_AT_PLUG]:
-                self.disk_manager.start_observer()
-
-        self.util.samba_util.start_sharing()
+        self.startup.add_task(STAGE_SAMBA, self.util.samba_util.start_sharing, [STAGE_DISKS, STAGE_NAS])
 
         if self.config[DSI_DISPLAY_BACKLIGHT][USE_DSI_DISPLAY] and self.config[BACKLIGHTER]:
             screen_brightness = int(self.config[DSI_DISPLAY_BACKLIGHT][SCREEN_BRIGHTNESS])
@@ -130,13 +155,8 @@ class Peppy(object):
             if self.config[BACKLIGHTER].power == False:
                 self.config[BACKLIGHTER].power = True
 
-        if self.config[LINUX_PLATFORM] and self.config[USAGE][USE_BLUETOOTH]:
-            bluetooth_util = self.util.get_bluetooth_util()
-            if self.config[CURRENT][MODE]:
-                if self.config[CURRENT][MODE] == BLUETOOTH_SINK:
-                    bluetooth_util.connect_bluetooth_sink()
-                else:
-                    bluetooth_util.connect_device(remove_previous=False)
+        if self.config[LINUX_PLATFORM] and self.config[USAGE][USE_BLUETOOTH] and self.config[CURRENT][MODE]:
+            self.startup.add_task(STAGE_BLUETOOTH, self.connect_bluetooth)
         
         s = self.config[SCRIPTS][SCRIPT_PLAYER_START]
         if s != None and len(s.strip()) != 0:
@@ -153,44 +173,30 @@ class Peppy(object):
         except:
             pass            
 
-        if self.use_web:
-            try:
-                f = open(os.devnull, 'w')
-                sys.stdout = sys.stderr = f
-                from web.server.webserver import WebServer
-                self.web_server = WebServer(self.util, self)
-            except Exception as e:
-                logging.debug(e)
-                self.use_web = False
-
-        self.screensaver_dispatcher = ScreensaverDispatcher(self.util, self.web_server)
-        
-        self.voice_assistant = None        
-        if self.config[USAGE][USE_VOICE_ASSISTANT]:
-            language = self.util.get_voice_assistant_language_code(self.config[CURRENT][LANGUAGE])
-            if language:
-                try:
-                    from voiceassistant.voiceassistant import VoiceAssistant
-                    self.voice_assistant = VoiceAssistant(self.util)
-                except:
-                    pass
-        
-        about = AboutScreen(self.util)
-        about.add_listener(self.go_home)
-        self.screens = {KEY_ABOUT : about}
+        self.screens = {}
+        self.startup.add_task(STAGE_ABOUT, self.create_about_screen, [STAGE_CONNECTIVITY])
         self.current_player_screen = None
         self.initial_player_name = self.config[AUDIO][PLAYER_NAME]
         self.current_audio_file = None
         
         if self.config[AUDIO][PLAYER_NAME] == MPD_NAME:
-            self.start_audio()
+            self.startup.run_stage(STAGE_AUDIO, self.start_audio)
             if self.config[USAGE][USE_VU_METER]:
-                self.util.load_screensaver(VUMETER)
+                self.startup.add_task(STAGE_VU_METER, self.load_vu_meter)
         else:
             if self.config[USAGE][USE_VU_METER]:
-                self.util.load_screensaver(VUMETER)
-            self.start_audio()        
-                
+                self.startup.run_stage(STAGE_VU_METER, self.load_vu_meter)
+            self.startup.run_stage(STAGE_AUDIO, self.start_audio)
+
+        if self.use_web:
+            self.startup.run_stage(STAGE_WEB, self.start_web_server)
+
+        self.screensaver_dispatcher = ScreensaverDispatcher(self.util, self.web_server, False)
+        self.startup.add_task(STAGE_SCREENSAVER, self.screensaver_dispatcher.init_screensaver, [STAGE_CONNECTIVITY, STAGE_VU_METER])
+
+        if self.config[USAGE][USE_VOICE_ASSISTANT]:
+            self.startup.run_stage(STAGE_VOICE_ASSISTANT, self.start_voice_assistant)
+
         if self.voice_assistant:
             self.voice_assistant.assistant.add_start_conversation_listener(self.screensaver_dispatcher.handle_event)            
         
@@ -202,6 +208,21 @@ class Peppy(object):
         self.current_screen = None
         self.current_mode = self.config[CURRENT][MODE]
 
+        self.startup.run_stage(STAGE_FIRST_SCREEN, self.go_initial_screen)
+        self.startup.set_first_screen()
+
+        self.player_state = PLAYER_RUNNING
+        self.run_timer_thread = False   
+        self.start_timer_thread()
+
+    def go_initial_screen(self):
+        """ Show the screen of the last used mode. Wait for the background startup stages
+        which are required by this mode.
+        """
+        if self.current_mode not in LOCAL_MODES:
+            self.startup.wait(STAGE_CONNECTIVITY)
+        self.startup.wait(STAGE_DISKS)
+
         disabled_modes = self.util.get_disabled_modes()
         if self.current_mode in disabled_modes:
             self.go_home(None)
@@ -217,6 +238,7 @@ class Peppy(object):
             state.file_name = self.config[FILE_PLAYBACK][CURRENT_FILE]            
             state.url = state.folder + os.sep + state.file_name
             state.playback_mode = self.config[FILE_PLAYBACK][CURRENT_FILE_PLAYBACK_MODE]
+            self.startup.wait(STAGE_NAS)
             self.wait_for_file(state.url)
             self.go_file_playback(state)
         elif self.config[CURRENT][MODE] == STREAM:
@@ -253,15 +275,111 @@ class Peppy(object):
             state.url = self.config[COLLECTION_PLAYBACK][COLLECTION_URL]
             state.track_time = self.config[COLLECTION_PLAYBACK][COLLECTION_TRACK_TIME]
             state.source = INIT
+            self.startup.wait(STAGE_NAS)
             self.wait_for_file(state.url)
             self.go_collection_playback(state)
         elif self.config[CURRENT][MODE] == BLUETOOTH_SINK:
+            self.startup.wait(STAGE_BLUETOOTH)
             self.reconfigure_player(BLUETOOTH_SINK_NAME)
             self.go_bluetooth_sink()
-        
-        self.player_state = PLAYER_RUNNING
-        self.run_timer_thread = False   
-        self.start_timer_thread()
+
+    def create_about_screen(self):
+        """ Create About Screen. It checks for the new release if Internet is available.
+        The screen is added to the screens by the main thread in go_about.
+
+        :return: About Screen
+        """
+        about = AboutScreen(self.util)
+        about.add_listener(self.go_home)
+        return about
+
+    def get_about_screen(self):
+        """ Get About Screen. Waits for the startup stage which creates the screen if it's not finished yet.
+
+        :return: About Screen or None if the screen wasn't created
+        """
+        about = self.screens.get(KEY_ABOUT, None)
+        if about == None:
+            about = self.startup.wait(STAGE_ABOUT)
+        return about
+
+    def set_internet_connectivity(self):
+        """ Set the result of the Internet connectivity check """
+
+        self.util.connected_to_internet = self.startup.get_result(STAGE_INTERNET)
+
+    def import_web_server(self):
+        """ Import web server modules. The standard output is redirected to the null device. """
+
+        f = open(os.devnull, 'w')
+        sys.stdout = sys.stderr = f
+        importlib.import_module("web.server.webserver")
+
+    def start_web_server(self):
+        """ Create web server """
+
+        self.startup.wait(STAGE_WEB_IMPORT)
+        try:
+            from web.server.webserver import WebServer
+            self.web_server = WebServer(self.util, self)
+        except Exception as e:
+            logging.debug(e)
+            self.use_web = False
+
+    def import_voice_assistant(self):
+        """ Import voice assistant modules """
+
+        language = self.util.get_voice_assistant_language_code(self.config[CURRENT][LANGUAGE])
+        if language:
+            importlib.import_module("voiceassistant.voiceassistant")
+
+    def start_voice_assistant(self):
+        """ Create voice assistant """
+
+        self.startup.wait(STAGE_VOICE_ASSISTANT_IMPORT)
+        language = self.util.get_voice_assistant_language_code(self.config[CURRENT][LANGUAGE])
+        if language:
+            try:
+                from voiceassistant.voiceassistant import VoiceAssistant
+                self.voice_assistant = VoiceAssistant(self.util)
+            except:
+                pass
+
+    def switch_power(self):
+        """ Switch disk power supply """
+
+        try:
+            self.util.switch_util.switch_power()
+        except:
+            pass
+
+    def mount_disks(self):
+        """ Mount USB disks and start USB disk observer """
+
+        if self.config[DISK_MOUNT][MOUNT_AT_STARTUP]:
+            self.disk_manager.mount_all_usb_disks()
+        if self.config[DISK_MOUNT][MOUNT_AT_PLUG]:
+            self.disk_manager.start_observer()
+
+    def mount_nases(self):
+        """ Mount network drives """
+
+        if self.config[DISK_MOUNT][MOUNT_AT_STARTUP]:
+            self.nas_manager.mount_all_nases()
+
+    def connect_bluetooth(self):
+        """ Connect Bluetooth device used in the last session """
+
+        bluetooth_util = self.util.get_bluetooth_util()
+        if self.config[CURRENT][MODE] == BLUETOOTH_SINK:
+            bluetooth_util.connect_bluetooth_sink()
+        else:
+            bluetooth_util.connect_device(remove_previous=False)
+
+    def load_vu_meter(self):
+        """ Load VU Meter screensaver """
+
+        self.util.load_screensaver(VUMETER)
 
     def wait_for_file(self, url):
         """ Wait for the file which can be unavailable at the moment after switching the hard drive on
@@ -497,7 +615,7 @@ class Peppy(object):
         self.player_state = PLAYER_RUNNING
         self.player.resume_playback()
         self.set_current_screen(self.previous_screen_name)
-        self.screensaver_dispatcher.delay_counter = 0
+        self.screensaver_dispatcher.reset_delay()
         self.screensaver_dispatcher.current_delay = self.screensaver_dispatcher.get_delay()
         if self.use_web:
             self.web_server.redraw_web_ui()
@@ -623,7 +741,9 @@ class Peppy(object):
         :param state: button state
         """        
         if self.get_current_screen(KEY_HOME): return
-        
+
+        # the modes which require Internet are disabled until the connectivity check is finished
+        self.startup.wait(STAGE_CONNECTIVITY)
         listeners = self.get_home_screen_listeners()
         home_screen = HomeScreen(self.util, listeners, self.voice_assistant)
         self.screens[KEY_HOME] = home_screen
@@ -2127,6 +2247,8 @@ class Peppy(object):
         
         :param state: button state
         """
+        if KEY_ABOUT not in self.screens:
+            self.screens[KEY_ABOUT] = self.get_about_screen() or self.create_about_screen()
         self.exit_current_screen()
         self.set_current_screen(KEY_ABOUT)
         if self.use_web:
@@ -38,4 +38,12 @@ RADIO_PLAYLIST = "playlist"
 PLAYLIST_INFO = "playlistinfo"
 EOL = "\n"
 COMMAND_LIST_BEGIN = "command_list_begin"
-COMMAND_LIST_END = "command_list_end"
\ No newline at end of file
+COMMAND_LIST_END = "command_list_end"
+COMMAND_LIST_OK_BEGIN = "command_list_ok_begin"
+LIST_OK = "list_OK"
+ACK = "ACK"
+PING = "ping"
+MIXER = "mixer"
+PLAYLIST = "playlist"
+IDLE_SUBSYSTEMS = [PLAYER, MIXER, PLAYLIST]
+CHANGED = "changed: "
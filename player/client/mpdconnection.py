@@ -19,15 +19,14 @@ import socket
 import time
 import logging
 
-from threading import RLock
+from threading import RLock, Thread, Event
 from player.client.commandthread import CommandThread
+from player.client.mpdcommands import COMMAND_LIST_OK_BEGIN, COMMAND_LIST_END, LIST_OK, ACK, PING, EOL
 
 class MpdConnection(object):
     """ Handles TCP/IP communication with MPD server """
-    
-    lock = RLock()
         
-    def __init__(self, host, port, reader_flags='rb', writer_flags='w', encoding='utf-8'):
+    def __init__(self, host, port, reader_flags='rb', writer_flags='w', encoding='utf-8', persistent=False):
         """ Initializer
         
         :param host: host where MPD process is running
@@ -35,18 +34,27 @@ class MpdConnection(object):
         :param reader_flags: flags used for creating reader
         :param writer_flags: flags used for creating writer
         :param encoding: encoding used to encode/decode messages
+        :param persistent: True - keep one connection open between commands, False - connect/disconnect per command
         """
+        self.lock = RLock()
         self.host = host
         self.port = port
         self.reader_flags = reader_flags
         self.writer_flags = writer_flags
         self.character_encoding = encoding
+        self.persistent = persistent
         self.OK = "OK"
         self.socket = None
         self.reader = None
         self.writer = None
         self.IDLE_COMMAND_TIMEOUT = 3600.0
         self.COMMAND_TIMEOUT = 5.0 # command thread timeout in seconds
+        self.KEEPALIVE_INTERVAL = 30.0 # should be less than connection_timeout in mpd.conf (default 60 seconds)
+        self.connected = False
+        self.last_activity = 0
+        self.keepalive_event = Event()
+        self.keepalive_thread = None
+        self.latency = {}
 
     def connect(self):
         """ Connect to MPD process' socket. It's making 3 attempts maximum with 2 seconds delay. """ 
@@ -65,6 +73,9 @@ class MpdConnection(object):
                     time.sleep(delay)
                 else:
                     attempt = attempts
+
+            if self.persistent and self.connected:
+                self.start_keepalive()
     
     def try_to_connect(self):
         """ Connect to MPD socket """
@@ -73,7 +84,10 @@ class MpdConnection(object):
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
             self.socket.connect((self.host, self.port))
-            self.socket.settimeout(self.IDLE_COMMAND_TIMEOUT)
+            if self.persistent:
+                self.socket.settimeout(self.COMMAND_TIMEOUT)
+            else:
+                self.socket.settimeout(self.IDLE_COMMAND_TIMEOUT)
             self.reader = self.socket.makefile(self.reader_flags, encoding=self.character_encoding)
             self.writer = self.socket.makefile(self.writer_flags, encoding=self.character_encoding)
             self.read_line()
@@ -81,18 +95,66 @@ class MpdConnection(object):
             if self.socket: 
                 self.disconnect()
                 return False
+        self.connected = True
+        self.last_activity = time.time()
         return True
     
     def disconnect(self):
         """ Disconnect from MPD """
         
         with self.lock:
+            self.connected = False
+            try:
+                if self.socket: self.socket.shutdown(socket.SHUT_RDWR) # unblocks reader waiting in another thread
+            except:
+                pass
             try:
                 if self.reader: self.reader.close()
                 if self.writer: self.writer.close()
                 if self.socket: self.socket.close()
             except:
                 pass
+            self.reader = self.writer = self.socket = None
+
+    def close(self):
+        """ Stop keepalive thread and disconnect persistent connection """
+
+        self.keepalive_event.set()
+        self.disconnect()
+
+    def start_keepalive(self):
+        """ Start thread which pings MPD to prevent closing idle persistent connection """
+
+        if self.keepalive_thread and self.keepalive_thread.is_alive():
+            return
+
+        self.keepalive_event.clear()
+        self.keepalive_thread = Thread(target=self.keepalive, daemon=True)
+        self.keepalive_thread.start()
+
+    def keepalive(self):
+        """ Keepalive loop. Sends 'ping' if connection was idle for keepalive interval. """
+
+        while not self.keepalive_event.wait(self.KEEPALIVE_INTERVAL / 2):
+            with self.lock:
+                if not self.connected:
+                    return
+                if time.time() - self.last_activity < self.KEEPALIVE_INTERVAL:
+                    continue
+                try:
+                    self.send_receive([PING])
+                except Exception as e:
+                    logging.debug("MPD keepalive failed: " + str(e))
+                    self.disconnect()
+                    return
+
+    def ensure_connected(self):
+        """ Connect persistent connection if it's not connected yet or was closed """
+
+        with self.lock:
+            if not self.connected:
+                self.connect()
+            return self.connected
     
     def write(self, line):
         """ Send the message to MPD
@@ -126,6 +188,80 @@ class MpdConnection(object):
     
             return line
 
+    def send_receive(self, lines):
+        """ Send lines to MPD and read response until OK or ACK. Raises exception on socket errors.
+
+        :param lines: list of lines to send
+        :return: list of response lines including terminating OK/ACK line
+        """
+        with self.lock:
+            self.writer.write(EOL.join(lines) + EOL)
+            self.writer.flush()
+            r = []
+            while True:
+                line = self.reader.readline()
+                if not line:
+                    raise ConnectionError("MPD closed connection")
+                if not isinstance(line, str):
+                    line = line.decode(self.character_encoding)
+                line = line.rstrip()
+                r.append(line)
+                if line == self.OK or line.startswith(ACK):
+                    break
+            self.last_activity = time.time()
+            return r
+
+    def execute(self, lines):
+        """ Execute command on persistent connection. Reconnects and repeats command once if connection was lost.
+
+        :param lines: list of lines to send
+        :return: list of response lines including terminating OK/ACK line
+        """
+        with self.lock:
+            name = lines[0].split(" ")[0]
+            start = time.time()
+            for attempt in range(2):
+                if not self.ensure_connected():
+                    return []
+                try:
+                    r = self.send_receive(lines)
+                    self.update_latency(name, time.time() - start)
+                    return r
+                except Exception as e:
+                    logging.debug("MPD connection error: " + str(e))
+                    self.disconnect()
+            return []
+
+    def update_latency(self, name, latency):
+        """ Update latency counter for the command
+
+        :param name: command name
+        :param latency: command latency in seconds
+        """
+        with self.lock:
+            c = self.latency.get(name)
+            if c == None:
+                c = self.latency[name] = {"count": 0, "total": 0.0, "max": 0.0}
+            c["count"] += 1
+            c["total"] += latency
+            if latency > c["max"]:
+                c["max"] = latency
+
+    def get_latency_statistics(self):
+        """ Return per-command latency statistics
+
+        :return: dictionary where key - command name, value - dictionary with count, average and max latency in ms
+        """
+        with self.lock:
+            s = {}
+            for k, v in self.latency.items():
+                s[k] = {
+                    "count": v["count"],
+                    "average": round(v["total"] * 1000 / v["count"], 2),
+                    "max": round(v["max"] * 1000, 2)
+                }
+            return s
+
     def get_multiline_result(self, cmd):
         """ Send command to MPD and read the output messages until it's terminated by OK
          
@@ -133,6 +269,12 @@ class MpdConnection(object):
         :return: list of lines returned after command
         """  
         with self.lock:
+            if self.persistent:
+                r = self.execute([cmd])
+                if r and (r[-1] == self.OK or r[-1].startswith(ACK)):
+                    r = r[:-1]
+                return r
+
             r = []        
             self.connect()
             self.write(cmd)
@@ -145,41 +287,86 @@ class MpdConnection(object):
             self.disconnect()            
             return r
 
+    def parse_dictionary(self, lines):
+        """ Parse the list of lines returned by MPD
+
+        :param lines: list of lines
+        :return: dictionary representing MPD process output
+        """
+        d = {}
+        for line in lines:
+            index = line.find(": ")
+            key = line[0:index]
+            if key.endswith(":file"):
+                key = key[0 : key.strip().find(":file")]
+            value = line[index + 1:]
+            d[key.rstrip()] = value.rstrip().strip()
+        return d
+
     def read_dictionary(self, cmd):
         """ Call multiline result method and parse the list of returned lines
          
         :param cmd: command for MPD
         :return: dictionary representing MPD process output for the specified input command
-        """        
-        ct = CommandThread(target=self.get_multiline_result, args=[cmd])
-        ct.start()
-        r = ct.join(self.COMMAND_TIMEOUT)
+        """
+        if self.persistent:
+            r = self.get_multiline_result(cmd)
+        else:
+            ct = CommandThread(target=self.get_multiline_result, args=[cmd])
+            ct.start()
+            r = ct.join(self.COMMAND_TIMEOUT)
         
-        d = {}
         if r == None:
-            return d
+            return {}
         
         with self.lock:
+            return self.parse_dictionary(r)
+
+    def read_dictionaries(self, cmds):
+        """ Send several commands in one command list and parse results.
+        All commands are executed in one round trip.
+
+        :param cmds: list of commands
+        :return: list of dictionaries, one per command. Empty dictionaries if command list failed.
+        """
+        if not self.persistent:
+            return [self.read_dictionary(cmd) for cmd in cmds]
+
+        with self.lock:
+            r = self.execute([COMMAND_LIST_OK_BEGIN] + cmds + [COMMAND_LIST_END])
+            result = []
+            lines = []
             for line in r:
-                index = line.find(": ")
-                key = line[0:index]
-                if key.endswith(":file"):
-                    key = key[0 : key.strip().find(":file")]
-                value = line[index + 1:]
-                d[key.rstrip()] = value.rstrip().strip()
-        return d        
+                if line == LIST_OK:
+                    result.append(self.parse_dictionary(lines))
+                    lines = []
+                elif line == self.OK or line.startswith(ACK):
+                    break
+                else:
+                    lines.append(line)
+
+            while len(result) < len(cmds):
+                result.append({})
+            return result
 
     def command_method(self, name):
         """ Send command to mpd process and read one line output.
         
-        Connects and disconnects to/from mpd server to avoid mpd client
-        connection timeout - default 60 seconds (property connection_timeout
-        in mpd.conf)
+        Non-persistent connection connects and disconnects to/from mpd server 
+        to avoid mpd client connection timeout - default 60 seconds (property 
+        connection_timeout in mpd.conf). Persistent connection uses keepalive instead.
         
         :param name: command name
         :return: command result
         """        
         with self.lock:
+            if self.persistent:
+                logging.debug("command: " + name)
+                r = self.execute(name.rstrip(EOL).split(EOL))
+                line = r[0] if r else None
+                logging.debug("return: " + str(line))
+                return line
+
             self.connect()
             self.write(name)
             logging.debug("command: " + name)
@@ -198,4 +385,4 @@ class MpdConnection(object):
 #         r = ct.join(self.COMMAND_TIMEOUT)
         self.command_method(name)        
         return ""
-    
\ No newline at end of file
+    
@@ -25,7 +25,8 @@ from player.client.baseplayer import BasePlayer
 from player.client.mpdconnection import MpdConnection
 from player.client.mpdcommands import CLEAR, ADD, PLAY, STOP, PAUSE, RESUME, \
     SET_VOLUME, GET_VOLUME, MUTE_2, STATUS, CURRENT_SONG, IDLE, SEEKCUR, LOAD_PLAYLIST, \
-    RADIO_PLAYLIST, PLAYLIST_INFO, EOL, COMMAND_LIST_BEGIN, COMMAND_LIST_END
+    RADIO_PLAYLIST, PLAYLIST_INFO, EOL, COMMAND_LIST_BEGIN, COMMAND_LIST_END, PLAYER, MIXER, \
+    PLAYLIST, IDLE_SUBSYSTEMS, CHANGED
 from player.client.player import Player
 from util.fileutil import FILE_PLAYLIST, FILE_AUDIO
 from util.config import RADIO, AUDIO_FILES, AUDIOBOOKS, CD_PLAYER, STREAM
@@ -42,6 +43,7 @@ class Mpdsocket(BasePlayer):
         self.muted = False
         self.playing = True
         self.conn = None
+        self.idle_conn = None
         self.dont_parse_track_name = False
         self.current_volume_level = "-1"
     
@@ -53,8 +55,9 @@ class Mpdsocket(BasePlayer):
     def start_client(self):
         """ Start client thread """
         
-        self.conn = MpdConnection(self.host, self.port)
+        self.conn = MpdConnection(self.host, self.port, persistent=True)
         self.conn.connect()
+        self.idle_conn = MpdConnection(self.host, self.port, reader_flags='r', encoding=None)
         thread = threading.Thread(target=self.mpd_event_listener)
         thread.start()
 
@@ -63,55 +66,102 @@ class Mpdsocket(BasePlayer):
 
         with self.lock:
             self.playing = False
+            if self.conn:
+                self.conn.close()
+        if self.idle_conn:
+            self.idle_conn.disconnect()
        
     def mpd_event_listener(self):
-        """ Starts the loop for listening MPD events """
-        
+        """ Starts the loop for listening MPD events. 
+        The same idle connection is used for all events, it's reconnected only if it was lost.
+        """
         while self.playing:
-            c = MpdConnection(self.host, self.port, reader_flags='r', encoding=None)
-            c.connect()
+            if not self.idle_conn.connected:
+                self.idle_conn.connect()
+                if not self.idle_conn.connected:
+                    continue
 
-            if not c.writer:
-                continue
-            
-            c.writer.write(IDLE + "\n")
-            c.writer.flush()
-            
-            line = None
-            try:        
+            events = self.wait_for_events()
+            if events == None:
+                self.idle_conn.disconnect()
+            elif events:
+                self.dispatch_events(events)
+
+    def wait_for_events(self):
+        """ Send idle command for the subscribed subsystems and wait for changes
+        
+        :return: set of changed subsystems or None if connection was lost
+        """
+        c = self.idle_conn
+        c.write(IDLE + " " + " ".join(IDLE_SUBSYSTEMS))
+        events = set()
+        
+        while self.playing:
+            try:
                 line = c.reader.readline()  # blocking line
-                logging.debug("line from idle: " + line) 
             except Exception as e:
                 logging.debug(e)
-            
-            if line and "mixer" in line:
-                volume = self.get_volume()
-                self.notify_volume_listeners(volume)
-                continue
-            
-            self.dispatch_callback(line)
-            c.disconnect()
+                return None
+
+            if not line:
+                return None
+
+            line = line.rstrip()
+            logging.debug("line from idle: " + line)
+
+            if line.startswith(CHANGED):
+                subsystem = line[len(CHANGED):]
+                if subsystem in IDLE_SUBSYSTEMS:
+                    events.add(subsystem)
+            elif line == c.OK:
+                return events
+            else:
+                return None
+
+    def dispatch_events(self, events):
+        """ Fetch the state required by the changed subsystems in one batch and notify listeners
+        
+        :param events: set of changed subsystems
+        """
+        if PLAYER in events or PLAYLIST in events:
+            current, status = self.current_and_status()
+        else:
+            current = None
+            status = self.status()
+
+        if MIXER in events:
+            volume = self.get_volume(status)
+            self.notify_volume_listeners(volume)
+
+        if current != None:
+            self.dispatch_callback(events, current, status)
                 
-    def dispatch_callback(self, line):
+    def dispatch_callback(self, events, current=None, status=None):
         """ Callback dispatcher
         
-        :line: line from idle command
+        :events: changed subsystems from idle command
+        :current: current song, fetched if not provided
+        :status: player status, fetched if not provided
         """
+        if current == None or status == None:
+            current, status = self.current_and_status()
+
         if self.player_mode == RADIO:
-            self.handle_radio_callback()
+            self.handle_radio_callback(current)
         elif self.player_mode == CD_PLAYER:
-            self.handle_cdplayer_callback(line)
+            self.handle_cdplayer_callback(events, current, status)
         elif self.player_mode == AUDIO_FILES:
-            self.handle_audiofiles_callback()
+            self.handle_audiofiles_callback(current, status)
         elif self.player_mode == AUDIOBOOKS:
-            self.handle_audiobooks_callback(line)
+            self.handle_audiobooks_callback(events, current, status)
         elif self.player_mode == STREAM:
-            self.handle_radio_callback()         
+            self.handle_radio_callback(current)         
     
-    def handle_radio_callback(self):
-        """ Radio callback handler """
+    def handle_radio_callback(self, current):
+        """ Radio callback handler
         
-        current = self.current()
+        :current: current song
+        """
         current_title = self.util.get_dictionary_value(current, "Title")
         if current_title == None:
             return
@@ -122,11 +172,12 @@ class Mpdsocket(BasePlayer):
         current["source"] = "player"
         self.notify_player_listeners(current)        
 
-    def handle_audiofiles_callback(self):
-        """ Audiofiles callback handler """
+    def handle_audiofiles_callback(self, current, status):
+        """ Audiofiles callback handler
         
-        current = self.current()
-        status = self.status()
+        :current: current song
+        :status: player status
+        """
         current_file = self.util.get_dictionary_value(current, "file")
         current_title = self.util.get_dictionary_value(current, "Title")
         current["current_track_id"] = self.util.get_dictionary_value(current, "Track")
@@ -154,17 +205,17 @@ class Mpdsocket(BasePlayer):
                 current["seek_time"] = track_time.replace(":", ".")
             self.notify_player_listeners(current)
     
-    def handle_audiobooks_callback(self, line):
+    def handle_audiobooks_callback(self, events, current, status):
         """ Audiobooks callback handler
         
-        :line: line from idle command
+        :events: changed subsystems
+        :current: current song
+        :status: player status
         """
-        current = self.current()
-        status = self.status()
         current_title = self.util.get_dictionary_value(current, "Title")
         current_file = self.util.get_dictionary_value(current, "file")
  
-        if current_title == None and current_file == None and "player" in line:
+        if current_title == None and current_file == None and PLAYER in events:
             self.notify_end_of_track_listeners()
             return
          
@@ -187,13 +238,13 @@ class Mpdsocket(BasePlayer):
         
         self.notify_player_listeners(current)
         
-    def handle_cdplayer_callback(self, line):
+    def handle_cdplayer_callback(self, events, current, status):
         """ CD player callback handler
         
-        :line: line from idle command
+        :events: changed subsystems
+        :current: current song
+        :status: player status
         """
-        current = self.current()
-        status = self.status()
         current_file = current_title = current_track_id = None
         
         current_title = self.util.get_dictionary_value(current, "Title")
@@ -204,7 +255,7 @@ class Mpdsocket(BasePlayer):
         current["state"] = status["state"]
         current["source"] = "player"
         
-        if "playlist" in line and current_title == None:
+        if PLAYLIST in events and current_title == None:
             return
             
         if current_title == None and current_file == None:
@@ -289,7 +340,7 @@ class Mpdsocket(BasePlayer):
 
         if file_name and track_time != "0" and track_time != "0.0":
             self.seek(track_time)
-            self.dispatch_callback("player")
+            self.dispatch_callback({PLAYER})
             
         if getattr(state, "pause", None):
             self.pause()
@@ -358,13 +409,16 @@ class Mpdsocket(BasePlayer):
             if self.muted:
                 self.muted = False
                     
-    def get_volume(self):
+    def get_volume(self, status=None):
         """  Return current volume level 
         
+        :param status: player status, fetched if not provided
         :return: volume level or -1 if not available
         """
         with self.lock:
-            st = self.status()
+            st = status
+            if st == None:
+                st = self.status()
             volume = '-1'
             
             try:
@@ -404,11 +458,33 @@ class Mpdsocket(BasePlayer):
         with self.lock:
             return self.conn.read_dictionary(CURRENT_SONG)
 
+    def current_and_status(self):
+        """ Return the current song and the result of the STATUS command in one round trip
+        
+        :return: tuple (current song, status)
+        """
+        with self.lock:
+            current, status = self.conn.read_dictionaries([CURRENT_SONG, STATUS])
+            return current, status
+
+    def get_latency_statistics(self):
+        """ Return MPD command latency statistics
+        
+        :return: dictionary with per-command latency counters
+        """
+        if self.conn:
+            return self.conn.get_latency_statistics()
+        return {}
+
     def shutdown(self):
         """ Shutdown the player """
         
         with self.lock:
             self.playing = False
+            if self.conn:
+                self.conn.close()
+        if self.idle_conn:
+            self.idle_conn.disconnect()
         
     def get_current_track_time(self):
         """  Return current track time
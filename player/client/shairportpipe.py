@@ -158,7 +158,7 @@ class ShairportPipeConnector(object):
         if picture == None or len(picture) == 0: return
 
         try:
-            self.image_util.image_cache_base64["current_shairport_image"] = picture
+            self.image_util.set_base64_image("current_shairport_image", picture)
             data = base64.b64decode(picture)
             buffer = BytesIO(data)
             state = {}
@@ -0,0 +1,189 @@
+# Copyright 2026 PeppyMeter peppy.player@gmail.com
+#
+# This file is part of PeppyMeter.
+#
+# PeppyMeter is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PeppyMeter is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PeppyMeter. If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import logging
+import pygame
+
+from threading import Thread, RLock
+from timeit import default_timer as timer
+
+class Interpolator(object):
+    """ Interpolates channel value between the data source samples.
+    When the new sample arrives the value moves from the current value to the sample
+    during one sample period, so the needle moves smoothly if the frame rate is higher than the sample rate.
+    The value is calculated for the end of the frame, so the sample is reached in the frame where it's expected.
+    """
+
+    def __init__(self, get_data, sample_period, frame_period):
+        """ Initializer
+
+        :param get_data: function returning the current sample or None
+        :param sample_period: data source polling interval in seconds
+        :param frame_period: UI refresh period in seconds
+        """
+        self.get_data = get_data
+        self.sample_period = sample_period
+        self.frame_period = frame_period
+        self.value = self.start = self.target = 0.0
+        self.start_time = 0
+
+    def get_value(self, now):
+        """ Get interpolated value
+
+        :param now: current time in seconds
+
+        :return: channel value
+        """
+        sample = self.get_data()
+        if sample == None:
+            sample = 0.0
+
+        if sample != self.target:
+            self.start = self.value
+            self.target = sample
+            self.start_time = now
+
+        if self.sample_period > self.frame_period:
+            k = min((now - self.start_time + self.frame_period) / self.sample_period, 1.0)
+        else:
+            k = 1.0
+
+        self.value = self.start + (self.target - self.start) * k
+        return self.value
+
+class MeterAnimator(Thread):
+    """ Animates all channels of the meter in one thread.
+    All channels are advanced in the same tick and the changed areas are updated on display at once.
+    The ticks are scheduled at the fixed UI refresh period. If no channel changed its sprite or mask
+    the frame is skipped without drawing.
+    """
+
+    def __init__(self, base, channels, ui_refresh_period):
+        """ Initializer
+
+        :param base: meter base
+        :param channels: list of channels (CircularChannel or LinearChannel)
+        :param ui_refresh_period: animation interval
+        """
+        Thread.__init__(self, name="meteranimator", daemon=True)
+        self.lock = RLock()
+        self.base = base
+        self.channels = channels
+        self.ui_refresh_period = ui_refresh_period
+        self.run_flag = True
+        self.frames = 0
+        self.skipped_frames = 0
+        self.render_time = 0
+        self.max_render_time = 0
+        self.start_time = None
+        self.stop_time = None
+
+    def run(self):
+        """ Thread method. Runs animation ticks at the UI refresh period. """
+
+        self.start_time = next_time = time.monotonic()
+        while self.run_flag:
+            self.tick(time.monotonic())
+
+            next_time += self.ui_refresh_period
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.monotonic()
+
+        self.stop_time = time.monotonic()
+
+    def tick(self, now):
+        """ Advance all channels and draw the changed ones
+
+        :param now: current time in seconds
+        """
+        start = timer()
+        changed = []
+        for channel in self.channels:
+            index = channel.get_index(now)
+            if index != channel.index:
+                changed.append((channel, index))
+
+        if not changed:
+            with self.lock:
+                self.skipped_frames += 1
+            return
+
+        for channel, _ in changed:
+            self.base.draw_bgr_fgr(channel.get_rect().copy(), self.base.bgr)
+
+        rects = [channel.draw(index) for channel, index in changed]
+
+        if self.base.fgr:
+            for r in rects:
+                self.base.draw_bgr_fgr(r.copy(), self.base.fgr)
+
+        self.update_display(rects)
+
+        t = timer() - start
+        with self.lock:
+            self.frames += 1
+            self.render_time += t
+            if t > self.max_render_time:
+                self.max_render_time = t
+
+    def update_display(self, rects):
+        """ Update the changed areas on display. Inside Peppy player the rectangles
+        are passed to the compositor which updates display from the main loop.
+
+        :param rects: list of rectangles
+        """
+        if not self.base.visible:
+            return
+
+        compositor = self.base.compositor
+        if compositor:
+            for r in rects:
+                compositor.add_rect(r)
+        else:
+            pygame.display.update(rects)
+
+    def stop_thread(self):
+        """ Stop thread """
+
+        self.run_flag = False
+        if self.is_alive():
+            self.join(self.ui_refresh_period * 2)
+        logging.debug(f"""Meter animation: {self.get_statistics()}""")
+
+    def get_statistics(self):
+        """ Get animation statistics
+
+        :return: dictionary with achieved frame rate, number of drawn and skipped frames, render time in milliseconds
+        """
+        with self.lock:
+            if self.start_time == None:
+                duration = 0
+            else:
+                duration = (self.stop_time or time.monotonic()) - self.start_time
+            n = max(self.frames, 1)
+            return {
+                "fps": round(self.frames / duration, 2) if duration else 0,
+                "ticks_per_second": round((self.frames + self.skipped_frames) / duration, 2) if duration else 0,
+                "frames": self.frames,
+                "skipped_frames": self.skipped_frames,
+                "average_render_time": round(self.render_time * 1000 / n, 3),
+                "max_render_time": round(self.max_render_time * 1000, 3)
+            }
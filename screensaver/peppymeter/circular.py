@@ -15,92 +15,62 @@
 # You should have received a copy of the GNU General Public License
 # along with PeppyMeter. If not, see <http://www.gnu.org/licenses/>.
 
-import time
-import math
-import logging
+import pygame
 
-from threading import Thread
+from animator import Interpolator
 
-class CircularAnimator(Thread):
-    """ Provides needle circular animation in a separate thread """
+class CircularChannel(object):
+    """ Needle of the circular meter. Animated by the meter animator. """
     
-    def __init__(self, data_source, component, base, ui_refresh_period, needle_rects, get_data_method):
+    def __init__(self, data_source, component, base, needle_rects, get_data_method):
         """ Initializer
         
         :param data_source: data source
-        :param channel: number of channels
         :param component: UI component
         :param base: meter base
-        :param ui_refresh_period: animation interval 
         :param needle_rects: list of sprite rectangles
         :param get_data_method: method to get data
         """
-        Thread.__init__(self)             
-        self.data_source = data_source
         self.component = component
-        self.run_flag = True
         self.base = base
-        self.ui_refresh_period = ui_refresh_period
-        self.previous_index = 0
         self.needle_rects = needle_rects
-        self.get_data = get_data_method
-        
-    def run(self):
-        """ Thread method. Converts volume value into the needle angle and displays corresponding sprite. """
-        
-        self.set_sprite(None, True)
-        while self.run_flag:
-            volume = self.get_data()
-            n = self.set_sprite(volume)
-            time.sleep(self.ui_refresh_period)
-            self.previous_index = int(n)
+        self.index = None
+        self.value = Interpolator(get_data_method, data_source.polling_interval, base.ui_refresh_period)
 
-    def stop_thread(self):
-        """ Stop thread """
+    def get_index(self, now):
+        """ Convert volume value into the needle sprite index
 
-        self.run_flag = False
-        time.sleep(self.ui_refresh_period * 2)
-
-    def set_sprite(self, volume, init=False):
-        if volume == None:
-                volume = 0.0            
+        :param now: current time in seconds
 
+        :return: sprite index
+        """
+        volume = self.value.get_value(now)
         n = (volume * self.base.max_volume * self.base.incr) / 100.0
-        if n >= len(self.base.needle_sprites):
-            n = len(self.base.needle_sprites) - 1
-            
-        if self.previous_index == int(n) and not init:
-            return n
-            
-        diff = n - self.previous_index
-        sub_steps = range(int(abs(diff)) * self.base.steps_per_degree)
-        sign = int(math.copysign(1, diff))
-        if len(sub_steps) > 0:
-            m = sub_steps[-1]
-        else:
-            m = 0
+        index = int(n * self.base.steps_per_degree)
+        return max(0, min(index, len(self.base.needle_sprites) - 1))
 
-        previous_rect = self.component.bounding_box
-        self.base.draw_bgr_fgr(previous_rect, self.base.bgr)
-        next_index = (self.previous_index * self.base.steps_per_degree) + (m * sign)
-        if next_index >= len(self.base.needle_sprites):
-            next_index = len(self.base.needle_sprites) - 1
+    def get_rect(self):
+        """ Get the needle rectangle on screen
+
+        :return: needle rectangle
+        """
+        return self.component.bounding_box
+
+    def draw(self, index):
+        """ Draw needle sprite. The background under the previous sprite should be restored before.
 
-        sprite = self.base.needle_sprites[next_index]
+        :param index: sprite index
+
+        :return: area which should be updated on screen
+        """
+        previous_rect = self.component.bounding_box
+        sprite = self.base.needle_sprites[index]
+        r = self.needle_rects[index]
         self.component.content = ("", sprite)
-        r = self.needle_rects[next_index]
         self.component.content_x = r.x
         self.component.content_y = r.y
-        r.x = 0
-        r.y = 0
-        self.component.bounding_box = r
+        self.component.bounding_box = pygame.Rect(0, 0, r.w, r.h)
         self.component.draw()
-        r.x = self.component.content_x
-        r.y = self.component.content_y
-
-        a = previous_rect.union(r)
-        if self.base.fgr:
-            self.base.draw_bgr_fgr(a, self.base.fgr)
-
-        self.base.update_rectangle(a)
-        return n
\ No newline at end of file
+        self.component.bounding_box = r
+        self.index = index
+        return previous_rect.union(r)
@@ -36,6 +36,7 @@ class Component(object):
         """
         self.screen = None
         self.screen = util.pygame_screen
+        self.compositor = getattr(util, "compositor", None)
         self.content = c
         self.content_x = x
         self.content_y = y
@@ -138,13 +139,18 @@ class Component(object):
         """ Update Pygame Screen """
         
         if not self.visible: return
-        pygame.display.update(self.bounding_box)
+        self.update_rectangle(self.bounding_box)
         
     def update_rectangle(self, r):
-        """ Update Pygame Screen """
+        """ Update Pygame Screen. Inside Peppy player the rectangle is added to the compositor
+        which updates the display once per frame.
+        """
         
         if not self.visible: return
-        pygame.display.update(r)      
+        if self.compositor:
+            self.compositor.add_rect(r)
+        else:
+            pygame.display.update(r)
         
     def set_visible(self, flag):
         """ Set component visibility 
@@ -25,6 +25,7 @@ from random import uniform
 from threading import Thread, RLock
 from configfileparser import *
 from util.config import VOLUME, PLAYER_SETTINGS
+from util.pipereader import get_pipe_reader
 from collections import deque
 
 SOURCE_CONSTANT = "constant"
@@ -35,6 +36,8 @@ SOURCE_SINE = "sine"
 SOURCE_PIPE = "pipe"
 SOURCE_HTTP = "http"
 
+PIPE_FRAME_FORMAT = "<HH"
+
 MONO_ALGORITHM_MAXIMUM = "maximum"
 MONO_ALGORITHM_AVERAGE = "average"
 
@@ -66,19 +69,17 @@ class DataSource(object):
         
         self.v = 0
         self.step = self.config[STEP]
-        self.pipe_size = 4
-        self.PIPE_BUFFER_SIZE = 1048576 # as defined for Raspberry OS in /proc/sys/fs/pipe-max-size
         self.rng = list(range(int(self.min), int(self.max_in_ui)))
         self.double_rng = self.rng
         self.double_rng.extend(range(int(self.max_in_ui) - 1, int(self.min), -1))
+        self.previous_left = self.previous_right = self.previous_mono = 0.0
+        self.run_flag = True
+        self.polling_interval = self.config[POLLING_INTERVAL]
         self.pipe = None
         if self.ds_type == SOURCE_PIPE:
+            self.pipe = get_pipe_reader(self.pipe_name, PIPE_FRAME_FORMAT, self.polling_interval)
             thread = Thread(target=self.open_pipe)
             thread.start()
-        self.previous_left = self.previous_right = self.previous_mono = 0.0
-        self.run_flag = True
-        self.polling_interval = self.config[POLLING_INTERVAL]
-        self.pipe_polling_inerval = self.polling_interval / 10
         self.prev_time = None
         self.data = ()
         self.http_data = ()
@@ -100,29 +101,15 @@ class DataSource(object):
     def open_pipe(self):
         """ Open named pipe """
 
-        try:            
-            logging.debug("opening pipe...")
-            self.pipe = os.open(self.pipe_name, os.O_RDONLY | os.O_NONBLOCK)
+        logging.debug("opening pipe...")
+        if self.pipe.open():
             logging.debug("pipe opened")
-        except:
-            logging.debug("Cannot open named pipe: " + self.pipe_name)
-
-    def flush_pipe_buffer(self):
-        """ Flush data from the pipe """
-
-        if not self.pipe:
-            return
-
-        try:
-            os.read(self.pipe, self.PIPE_BUFFER_SIZE)
-        except Exception as e:
-            logging.debug(e)
 
     def start_data_source(self):
         """ Start data source thread. """ 
 
         if self.ds_type == SOURCE_PIPE:
-            self.flush_pipe_buffer()
+            self.pipe.start()
 
         self.run_flag = True
         thread = Thread(target=self.get_data)
@@ -132,6 +119,8 @@ class DataSource(object):
         """ Stop data source thread. """ 
                
         self.run_flag = False
+        if self.pipe != None:
+            self.pipe.stop()
     
     def get_current_data(self):
         """ Return current data """
@@ -242,23 +231,6 @@ class DataSource(object):
         self.v = (self.v + self.step * 6) % 360
         return s
     
-    def get_latest_pipe_data(self):
-        """ Read from the named pipe until it's empty """
-
-        latest_data = [0, 0, 0, 0]
-        data = None
-
-        while True:
-            try:
-                data = os.read(self.pipe, self.pipe_size)
-                if len(data) != 0:
-                    latest_data = [data[0], data[1], data[2], data[3]]
-                time.sleep(self.pipe_polling_inerval)
-            except:
-                break
-
-        return latest_data
-
     def get_http_value(self):
         """ Fetch HTTP value """
         
@@ -278,13 +250,12 @@ class DataSource(object):
             return (left, right, mono)
         
         try:
-            data = self.get_latest_pipe_data()
-            length = len(data) 
-            if length == 0:
-                return (0, 0, 0)
+            data = self.pipe.get_values()
+            if data == None:
+                data = (0, 0)
             
-            new_left = int(self.max_in_ui * ((data[length - 4] + (data[length - 3] << 8)) / self.max_in_pipe))
-            new_right = int(self.max_in_ui * ((data[length - 2] + (data[length - 1] << 8)) / self.max_in_pipe))
+            new_left = int(self.max_in_ui * (data[0] / self.max_in_pipe))
+            new_right = int(self.max_in_ui * (data[1] / self.max_in_pipe))
             new_mono = self.get_mono(new_left, new_right)
             
             left = self.get_channel(self.previous_left, new_left)
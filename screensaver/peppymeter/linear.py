@@ -15,85 +15,63 @@
 # You should have received a copy of the GNU General Public License
 # along with PeppyMeter. If not, see <http://www.gnu.org/licenses/>.
 
-import time
-from threading import Thread
+from animator import Interpolator
 
-class LinearAnimator(Thread):
-    """ Provides linear animation in a separate thread """
+class LinearChannel(object):
+    """ Mask of the linear meter. Animated by the meter animator. """
     
-    def __init__(self, data_source, components, base, ui_refresh_period):
+    def __init__(self, data_source, component, base, get_data_method):
         """ Initializer
         
         :param data_source: data source
-        :param components: UI component
+        :param component: UI component
         :param base: meter base
-        :param ui_refresh_period: animation interval 
+        :param get_data_method: method to get data
         """
-        Thread.__init__(self)
-        self.indicator_height = 30 
-        self.index = 0
-        self.data_source = data_source
-        self.components = components
-        self.run_flag = True
+        self.component = component
         self.base = base
-        self.ui_refresh_period = ui_refresh_period
-        self.bgr = self.base.bgr
-        self.fgr = self.base.fgr
-    
-    def run(self):
-        """ Thread method. Converts volume value into the mask width and displays corresponding mask. """
-                
-        previous_rect_left = self.components[1].bounding_box.copy()
-        previous_rect_right = self.components[2].bounding_box.copy()
-        previous_volume_left = previous_volume_right = 0.0
-        
-        while self.run_flag:
-            d = self.data_source.get_current_data() 
-            
-            try:
-                previous_rect_left, previous_volume_left = self.update_channel(d[0], self.components[1], previous_rect_left, previous_volume_left)
-                previous_rect_right, previous_volume_right = self.update_channel(d[1], self.components[2], previous_rect_right, previous_volume_right)
-            except:
-                pass
-            
-            time.sleep(self.ui_refresh_period)
+        self.previous_rect = component.bounding_box.copy()
+        self.index = None
+        self.value = Interpolator(get_data_method, data_source.polling_interval, base.ui_refresh_period)
 
-    def stop_thread(self):
-        """ Stop thread """
+    def get_index(self, now):
+        """ Convert volume value into the mask index
 
-        self.run_flag = False
-        time.sleep(self.ui_refresh_period * 2)
+        :param now: current time in seconds
 
-    def update_channel(self, volume, component, previous_rect, previous_volume):
-        """ Update channel
-        
-        :volume: new volume value
-        :component: component to update
-        :previous_rect: previous bounding rectangle
-        :previous_volume: previous volume value
+        :return: mask index
         """
-        if previous_volume == volume:
-            return (previous_rect, previous_volume) 
-                       
-        self.base.draw_bgr_fgr(previous_rect, self.base.bgr)
-                          
+        volume = self.value.get_value(now)
         n = int((volume * self.base.max_volume) / (self.base.step * 100))
-        if n >= len(self.base.masks): n = len(self.base.masks) - 1            
-        w = self.base.masks[n]
+        return max(0, min(n, len(self.base.masks) - 1))
+
+    def get_rect(self):
+        """ Get the mask rectangle on screen
+
+        :return: mask rectangle
+        """
+        return self.previous_rect
+
+    def draw(self, index):
+        """ Draw indicator using the mask width. The background under the previous mask should be restored before.
+
+        :param index: mask index
+
+        :return: area which should be updated on screen
+        """
+        w = self.base.masks[index]
         if w == 0: w = 1
-                
+
+        component = self.component
         component.bounding_box.w = w
-        component.bounding_box.x = 0          
+        component.bounding_box.x = 0
         component.bounding_box.y = 0
         component.draw()
-            
+
         r = component.bounding_box.copy()
         r.x = component.content_x
-        r.y = component.content_y 
-        u = previous_rect.union(r)
-        if self.base.fgr:
-            self.base.draw_bgr_fgr(u.copy(), self.base.fgr)
-            
-        self.base.update_rectangle(u)
-        
-        return (r.copy(), volume)
+        r.y = component.content_y
+        u = self.previous_rect.union(r)
+        self.previous_rect = r
+        self.index = index
+        return u
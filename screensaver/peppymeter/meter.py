@@ -20,8 +20,9 @@ import os
 from component import Component
 from container import Container
 from configfileparser import TYPE_LINEAR, TYPE_CIRCULAR, SCREEN_INFO, SCREEN_SIZE, BASE_PATH
-from linear import LinearAnimator
-from circular import CircularAnimator
+from linear import LinearChannel
+from circular import CircularChannel
+from animator import MeterAnimator
 
 class Meter(Container):
     """ The base class for all meters """
@@ -63,6 +64,7 @@ class Meter(Container):
         self.masks = None
         self.channels = 1
         self.cached = False
+        self.animator = None
 
     def add_background(self, image_name):
         """ Position and add background image.
@@ -162,19 +164,26 @@ class Meter(Container):
         
         super(Meter, self).draw()
         self.update()
-        rects = (self.left_needle_rects, self.right_needle_rects, self.mono_needle_rects)
+        ds = self.data_source
+        if self.channels == 2:
+            data_methods = [ds.get_current_left_channel_data, ds.get_current_right_channel_data]
+        else:
+            data_methods = [ds.get_current_mono_channel_data]
+
+        channels = []
         if self.meter_type == TYPE_LINEAR:
-            self.animator = LinearAnimator(self.data_source, self.components, self, self.ui_refresh_period)
-            self.animator.start()
+            for i, get_data in enumerate(data_methods):
+                channels.append(LinearChannel(ds, self.components[i + 1], self, get_data))
         elif self.meter_type == TYPE_CIRCULAR:
             if self.channels == 2:
-                self.left = CircularAnimator(self.data_source, self.components[1], self, self.ui_refresh_period, rects[0], self.data_source.get_current_left_channel_data)
-                self.right = CircularAnimator(self.data_source, self.components[2], self, self.ui_refresh_period, rects[1], self.data_source.get_current_right_channel_data)
-                self.left.start()
-                self.right.start()
+                rects = [self.left_needle_rects, self.right_needle_rects]
             else:
-                self.mono = CircularAnimator(self.data_source, self.components[1], self, self.ui_refresh_period, rects[2], self.data_source.get_current_mono_channel_data)
-                self.mono.start()
+                rects = [self.mono_needle_rects]
+            for i, get_data in enumerate(data_methods):
+                channels.append(CircularChannel(ds, self.components[i + 1], self, rects[i], get_data))
+
+        self.animator = MeterAnimator(self, channels, self.ui_refresh_period)
+        self.animator.start()
 
     def reset_bgr_fgr(self, comp):
         """ Reset background or foreground bounding box  
@@ -195,15 +204,15 @@ class Meter(Container):
     def stop(self):
         """ Stop meter animation """
         
-        if self.meter_type == TYPE_LINEAR:
+        if self.animator:
             self.animator.stop_thread()
             self.animator = None
-        elif self.meter_type == TYPE_CIRCULAR:
-            if self.channels == 2:
-                self.left.stop_thread()
-                self.right.stop_thread()
-                self.left = None
-                self.right = None
-            else:
-                self.mono.stop_thread()
-                self.mono = None
+
+    def get_statistics(self):
+        """ Get animation statistics
+
+        :return: dictionary with animation statistics or None if meter is not animated
+        """
+        if self.animator:
+            return self.animator.get_statistics()
+        return None
@@ -15,11 +15,13 @@
 # You should have received a copy of the GNU General Public License
 # along with PeppyMeter. If not, see <http://www.gnu.org/licenses/>.
 
+import os
 import logging
 
 from meter import Meter
 from maskfactory import MaskFactory
 from needlefactory import NeedleFactory
+from spritesheet import SPRITE_SHEET_FOLDER
 from configfileparser import *
 
 class MeterFactory(object):
@@ -122,9 +124,11 @@ class MeterFactory(object):
         stop_angle = config[STOP_ANGLE]
         meter.incr = (abs(start_angle) + abs(stop_angle)) / 100
         meter.add_background(config[BGR_FILENAME])
-        needle = meter.load_image(config[INDICATOR_FILENAME])[1]
+        needle_path, needle = meter.load_image(config[INDICATOR_FILENAME])
+        sprite_sheet_folder = os.path.join(self.meter_config[BASE_PATH], SPRITE_SHEET_FOLDER)
         
-        factory = NeedleFactory(name, needle, config, self.needle_cache, self.mono_rect_cache, self.left_rect_cache, self.right_rect_cache)
+        factory = NeedleFactory(name, needle, config, self.needle_cache, self.mono_rect_cache, self.left_rect_cache, self.right_rect_cache,
+            sprite_sheet_folder, needle_path)
         meter.needle_sprites = factory.needle_sprites
         
         if config[CHANNELS] == 2:
@@ -18,11 +18,13 @@
 import math
 import pygame as pg
 from configfileparser import *
+from spritesheet import SpriteSheet, MONO, LEFT, RIGHT
 
 class NeedleFactory(object):
     """ Factory to prepare needle sprites for circular animator """
     
-    def __init__(self, name, image, config, needle_cache, mono_rect_cache, left_rect_cache, right_rect_cache):
+    def __init__(self, name, image, config, needle_cache, mono_rect_cache, left_rect_cache, right_rect_cache,
+        sprite_sheet_folder=None, image_path=None):
         """ Initializer
         
         :param name: meter name
@@ -32,6 +34,8 @@ class NeedleFactory(object):
         :param mono_rect_cache: dictionary where key - meter name, value - list of mono needle sprite rectangles
         :param left_rect_cache: dictionary where key - meter name, value - list of left needle sprite rectangles
         :param right_rect_cache: dictionary where key - meter name, value - list of right needle sprite rectangles
+        :param sprite_sheet_folder: folder for sprite sheets, None - don't use sprite sheets
+        :param image_path: needle image path
         """
         self.image = image
         self.config = config
@@ -44,17 +48,53 @@ class NeedleFactory(object):
         if len(self.needle_sprites) != 0:
             return
 
+        self.mono_needle_rects = list()
+        self.left_needle_rects = list()
+        self.right_needle_rects = list()
+        sprite_sheet = None
+        if sprite_sheet_folder:
+            sprite_sheet = SpriteSheet(sprite_sheet_folder, name, config, image_path)
+            if not self.load_sprite_sheet(sprite_sheet):
+                self.create_all_needle_sprites()
+                rects = {MONO: self.mono_needle_rects, LEFT: self.left_needle_rects, RIGHT: self.right_needle_rects}
+                sprite_sheet.save(self.needle_sprites, rects)
+        else:
+            self.create_all_needle_sprites()
+
+        needle_cache[name] = self.needle_sprites
         if config[CHANNELS] == 1:
-            self.create_needle_sprites(self.needle_sprites, self.mono_needle_rects, self.config[DISTANCE], self.config[MONO_ORIGIN_X], self.config[MONO_ORIGIN_Y])
-            needle_cache[name] = self.needle_sprites 
             mono_rect_cache[name] = self.mono_needle_rects
         elif config[CHANNELS] == 2:
-            self.create_needle_sprites(self.needle_sprites, self.left_needle_rects, self.config[DISTANCE], self.config[LEFT_ORIGIN_X], self.config[LEFT_ORIGIN_Y])
-            self.create_needle_sprites(None, self.right_needle_rects, self.config[DISTANCE], self.config[RIGHT_ORIGIN_X], self.config[RIGHT_ORIGIN_Y])
-            needle_cache[name] = self.needle_sprites
             left_rect_cache[name] = self.left_needle_rects
             right_rect_cache[name] = self.right_needle_rects
 
+    def load_sprite_sheet(self, sprite_sheet):
+        """ Load needle sprites and rectangles from sprite sheet
+
+        :param sprite_sheet: sprite sheet
+
+        :return: True - sprites loaded, False - sprite sheet doesn't exist
+        """
+        sheet = sprite_sheet.load()
+        if sheet == None:
+            return False
+
+        self.needle_sprites, rects = sheet
+        self.mono_needle_rects = rects.get(MONO, [])
+        self.left_needle_rects = rects.get(LEFT, [])
+        self.right_needle_rects = rects.get(RIGHT, [])
+        return True
+
+    def create_all_needle_sprites(self):
+        """ Create needle sprites for all channels """
+
+        self.needle_sprites = list()
+        if self.config[CHANNELS] == 1:
+            self.create_needle_sprites(self.needle_sprites, self.mono_needle_rects, self.config[DISTANCE], self.config[MONO_ORIGIN_X], self.config[MONO_ORIGIN_Y])
+        elif self.config[CHANNELS] == 2:
+            self.create_needle_sprites(self.needle_sprites, self.left_needle_rects, self.config[DISTANCE], self.config[LEFT_ORIGIN_X], self.config[LEFT_ORIGIN_Y])
+            self.create_needle_sprites(None, self.right_needle_rects, self.config[DISTANCE], self.config[RIGHT_ORIGIN_X], self.config[RIGHT_ORIGIN_Y])
+
     def get_cached_object(self, name, cache):
         """ Get cached object
         
@@ -0,0 +1,248 @@
+# Copyright 2026 PeppyMeter peppy.player@gmail.com
+#
+# This file is part of PeppyMeter.
+#
+# PeppyMeter is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PeppyMeter is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PeppyMeter. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+import json
+import math
+import mmap
+import hashlib
+import logging
+import pygame as pg
+
+from collections import OrderedDict
+from configfileparser import *
+
+SPRITE_SHEET_VERSION = 1
+SPRITE_SHEET_FOLDER = "cache"
+SPRITE_SHEET_EXTENSION = ".raw"
+RECT_TABLE_EXTENSION = ".json"
+NEEDLE_CACHE_SIZE = 4
+
+FRAMES = "frames"
+SIZE = "size"
+FORMAT = "format"
+MONO = "mono"
+LEFT = "left"
+RIGHT = "right"
+
+class SpriteCache(OrderedDict):
+    """ Dictionary which keeps only the most recently used items """
+
+    def __init__(self, max_size=NEEDLE_CACHE_SIZE):
+        """ Initializer
+
+        :param max_size: maximum number of items
+        """
+        OrderedDict.__init__(self)
+        self.max_size = max_size
+
+    def __getitem__(self, key):
+        value = OrderedDict.__getitem__(self, key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        OrderedDict.__setitem__(self, key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+class SpriteSheet(object):
+    """ Needle sprites packed into one image file with the table of the sprite rectangles.
+    The image is stored as raw pixels in the display format which are memory-mapped on loading,
+    so the sprites are not rendered again after restart and the file pages are shared
+    by the page cache.
+    """
+
+    def __init__(self, folder, name, config, image_path):
+        """ Initializer
+
+        :param folder: sprite sheet folder
+        :param name: meter name
+        :param config: meter configuration dictionary
+        :param image_path: needle image path
+        """
+        self.folder = folder
+        key = self.get_key(name, config, image_path)
+        self.image_path = os.path.join(folder, key + SPRITE_SHEET_EXTENSION)
+        self.table_path = os.path.join(folder, key + RECT_TABLE_EXTENSION)
+
+    def get_key(self, name, config, image_path):
+        """ Get file name for the meter. It changes when the needle image or needle parameters change.
+
+        :param name: meter name
+        :param config: meter configuration dictionary
+        :param image_path: needle image path
+
+        :return: file name without extension
+        """
+        try:
+            stat = os.stat(image_path)
+            image_info = [image_path, stat.st_size, stat.st_mtime]
+        except:
+            image_info = [image_path]
+
+        keys = [CHANNELS, START_ANGLE, STOP_ANGLE, STEPS_PER_DEGREE, DISTANCE, MONO_ORIGIN_X, MONO_ORIGIN_Y,
+            LEFT_ORIGIN_X, LEFT_ORIGIN_Y, RIGHT_ORIGIN_X, RIGHT_ORIGIN_Y]
+        values = [SPRITE_SHEET_VERSION, name, image_info] + [config.get(k, None) for k in keys]
+        digest = hashlib.sha1(json.dumps(values).encode()).hexdigest()
+        return name.replace(os.sep, "_") + "." + digest[:16]
+
+    def pack(self, sprites):
+        """ Place sprites on the sheet row by row
+
+        :param sprites: list of sprite images
+
+        :return: tuple (sheet width, sheet height, list of sprite rectangles on the sheet)
+        """
+        area = sum(s.get_width() * s.get_height() for s in sprites)
+        width = max(max(s.get_width() for s in sprites), int(math.sqrt(area)))
+        x = y = row_height = 0
+        frames = []
+
+        for s in sprites:
+            w, h = s.get_size()
+            if x + w > width:
+                x = 0
+                y += row_height
+                row_height = 0
+            frames.append(pg.Rect(x, y, w, h))
+            x += w
+            row_height = max(row_height, h)
+
+        return (width, y + row_height, frames)
+
+    def save(self, sprites, rects):
+        """ Save sprites and rectangle table
+
+        :param sprites: list of sprite images
+        :param rects: dictionary where key - channel name, value - list of sprite rectangles on the screen
+        """
+        if not sprites:
+            return
+
+        width, height, frames = self.pack(sprites)
+        sheet = pg.Surface((width, height), pg.SRCALPHA, 32)
+        for s, r in zip(sprites, frames):
+            sheet.blit(s, r)
+
+        pixel_format = self.get_pixel_format()
+        try:
+            data = pg.image.tostring(sheet, pixel_format)
+        except ValueError:
+            pixel_format = "RGBA"
+            data = pg.image.tostring(sheet, pixel_format)
+
+        table = {k: [tuple(r) for r in v] for k, v in rects.items()}
+        table[FRAMES] = [tuple(r) for r in frames]
+        table[SIZE] = (width, height)
+        table[FORMAT] = pixel_format
+
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            self.write_file(self.image_path, data, "wb")
+            self.write_file(self.table_path, json.dumps(table), "w")
+        except Exception as e:
+            logging.debug(f"""Cannot save sprite sheet: {e}""")
+
+    def get_pixel_format(self):
+        """ Get byte order of the display pixels. The sprites stored in the display format
+        are blitted as fast as the converted images.
+
+        :return: pixel format string for pygame.image.tostring/frombuffer
+        """
+        s = pg.Surface((1, 1), pg.SRCALPHA, 32)
+        try:
+            s = s.convert_alpha()
+        except:
+            pass
+
+        if sys.byteorder == "little" and s.get_masks()[0] == 0xFF0000:
+            return "BGRA"
+        return "RGBA"
+
+    def write_file(self, path, data, mode):
+        """ Write file atomically
+
+        :param path: file path
+        :param data: file content
+        :param mode: file mode
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self):
+        """ Load sprites and rectangle table
+
+        :return: tuple (list of sprite images, dictionary where key - channel name, value - list of rectangles)
+            or None if the sprite sheet doesn't exist
+        """
+        try:
+            with open(self.table_path) as f:
+                table = json.load(f)
+            width, height = table.pop(SIZE)
+            pixel_format = table.pop(FORMAT)
+            if pixel_format != self.get_pixel_format():
+                return None
+            with open(self.image_path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(buffer) != width * height * 4:
+                return None
+            sheet = pg.image.frombuffer(buffer, (width, height), pixel_format)
+        except:
+            return None
+
+        sprites = [sheet.subsurface(r) for r in table.pop(FRAMES)]
+        rects = {k: [pg.Rect(r) for r in v] for k, v in table.items()}
+        return (sprites, rects)
+
+def build(base_path):
+    """ Create sprite sheets for all circular meters of the current screen size
+
+    :param base_path: PeppyMeter folder
+    """
+    from needlefactory import NeedleFactory
+
+    meter_config = ConfigFileParser(base_path).meter_config
+    folder = meter_config[SCREEN_INFO][SCREEN_SIZE]
+    pg.display.init()
+    pg.display.set_mode((1, 1), pg.HIDDEN if hasattr(pg, "HIDDEN") else 0)
+
+    for name in meter_config[METER_NAMES]:
+        config = meter_config.get(name, None)
+        if not config or config[METER_TYPE] != TYPE_CIRCULAR:
+            continue
+        path = os.path.join(base_path, folder, config[INDICATOR_FILENAME])
+        image = pg.image.load(path).convert_alpha()
+        NeedleFactory(name, image, config, {}, {}, {}, {}, os.path.join(base_path, SPRITE_SHEET_FOLDER), path)
+        logging.debug(f"""Sprite sheet for meter '{name}' is ready""")
+
+def main():
+    log_handler = logging.StreamHandler(sys.stdout)
+    logging.basicConfig(
+        level=logging.NOTSET,
+        format='[%(asctime)s] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s',
+        handlers=[log_handler]
+    )
+    base_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    build(base_path)
+
+if __name__ == '__main__':
+    main()
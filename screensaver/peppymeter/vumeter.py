@@ -20,6 +20,7 @@ import time
 import copy
 from meterfactory import MeterFactory
 from screensavermeter import ScreensaverMeter
+from spritesheet import SpriteCache
 from configfileparser import METER, METER_NAMES, RANDOM_METER_INTERVAL
 
 class Vumeter(ScreensaverMeter):
@@ -51,10 +52,10 @@ class Vumeter(ScreensaverMeter):
         self.current_volume = 100.0
         self.seconds = 0
 
-        self.needle_cache = {}
-        self.mono_rect_cache = {}
-        self.left_rect_cache = {}
-        self.right_rect_cache = {}
+        self.needle_cache = SpriteCache()
+        self.mono_rect_cache = SpriteCache()
+        self.left_rect_cache = SpriteCache()
+        self.right_rect_cache = SpriteCache()
 
     def get_meter(self):
         """ Creates meter using meter factory. """  
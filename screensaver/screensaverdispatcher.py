@@ -15,13 +15,14 @@
 # You should have received a copy of the GNU General Public License
 # along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
 
+import time
 import pygame
 
 from ui.component import Component
 from ui.container import Container
 from ui.state import State
 from util.keys import USER_EVENT_TYPE
-from util.config import SCREEN_INFO, FRAME_RATE, SCREENSAVER, NAME, SCREENSAVER_DELAY, CLOCK, LOGO, LYRICS, VUMETER, \
+from util.config import SCREENSAVER, NAME, SCREENSAVER_DELAY, CLOCK, LOGO, LYRICS, VUMETER, \
     WEATHER, SLIDESHOW, KEY_SCREENSAVER_DELAY_1, KEY_SCREENSAVER_DELAY_3, USAGE, USE_VU_METER, SCRIPTS, SCRIPT_SCREENSAVER_START, \
     DSI_DISPLAY_BACKLIGHT, USE_DSI_DISPLAY, BACKLIGHTER, SCREEN_BRIGHTNESS, SCREENSAVER_BRIGHTNESS, SCRIPT_SCREENSAVER_STOP, \
     SCREENSAVER_DISPLAY_POWER_OFF, DELAY, SCREENSAVER_MENU, RANDOM, ACTIVE_SAVERS, DISABLED_SAVERS
@@ -35,33 +36,42 @@ WEB_SAVERS = [CLOCK, LOGO, LYRICS, WEATHER, SLIDESHOW]
 class ScreensaverDispatcher(Component):
     """ Starts and stops screensavers. Handles switching between plug-ins. """
     
-    def __init__(self, util, webserver=None):
+    def __init__(self, util, webserver=None, load_screensaver=True):
         """ Initializer
         
         :param util: utility object which contains configuration
+        :param webserver: web server
+        :param load_screensaver: True - load the current screensaver, False - it will be loaded by init_screensaver
         """
         self.util = util
         self.config = util.config
-        self.send_json_to_web_ui = webserver.send_json_to_web_ui
+        self.send_json_to_web_ui = webserver.send_json_to_web_ui if webserver else None
         Component.__init__(self, util, None, None, False)
         self.current_image = None
         self.current_volume = 0
         self.start_listeners = []
         self.stop_listeners = []
         self.config[ACTIVE_SAVERS] = self.get_active_savers()
-        self.config[DISABLED_SAVERS] = self.set_initial_saver_name()
-        self.set_initial_saver_name()
-        self.current_screensaver = self.get_screensaver()
-        if self.current_screensaver:
-            self.update_period = self.current_screensaver.get_update_period()
+        self.current_screensaver = None
+        self.update_period = 1
+        if load_screensaver:
+            self.init_screensaver()
         self.current_delay = self.get_delay()
         self.current_screen = None
         self.saver_running = False
-        self.one_cycle_period = 1000 / self.config[SCREEN_INFO][FRAME_RATE]
-        self.counter = 0
-        self.delay_counter = 0
+        self.refresh_time = time.monotonic()
+        self.delay_start = time.monotonic()
         self.previous_saver = None
 
+    def init_screensaver(self):
+        """ Select and load the current screensaver. The selection depends on Internet connectivity. """
+
+        self.config[DISABLED_SAVERS] = self.set_initial_saver_name()
+        saver = self.get_screensaver()
+        if saver:
+            self.update_period = saver.get_update_period()
+        self.current_screensaver = saver
+
     def get_active_savers(self):
         """ Get all configured savers
 
@@ -152,8 +162,8 @@ class ScreensaverDispatcher(Component):
             return
 
         self.current_screensaver.refresh()
-        self.counter = 0
-        self.delay_counter = 0    
+        self.refresh_time = time.monotonic()
+        self.reset_delay()
         self.saver_running = True
 
         self.notify_start_listeners(s)
@@ -184,6 +194,7 @@ class ScreensaverDispatcher(Component):
         self.current_screen.set_visible(True)
         self.current_screen.clean_draw_update()
         self.saver_running = False
+        self.reset_delay()
         self.notify_stop_listeners(None)
 
         if self.previous_saver != None and self.config[SCREENSAVER][NAME] != self.previous_saver:
@@ -242,11 +253,11 @@ class ScreensaverDispatcher(Component):
     def refresh(self):
         """ Refresh screensaver """
         
+        now = time.monotonic()
         if self.saver_running:
-            self.counter = self.counter + 1
-            if int(self.counter * self.one_cycle_period) == self.update_period * 1000:
+            if now - self.refresh_time >= self.update_period or getattr(self.current_screensaver, "refresh_requested", False):
                 self.current_screensaver.refresh()
-                self.counter = 0
+                self.refresh_time = now
                 if self.config[SCREENSAVER][NAME] in WEB_SAVERS:
                     s = State()
                     if isinstance(self.current_screensaver, Component):
@@ -262,19 +273,35 @@ class ScreensaverDispatcher(Component):
         else:
             if self.current_delay == 0:
                 return
-            self.delay_counter = self.delay_counter + 1
-            if int(self.delay_counter * self.one_cycle_period) == self.current_delay * 1000:
-                self.start_screensaver()                
+            if now - self.delay_start >= self.current_delay:
+                self.reset_delay()
+                self.start_screensaver()
+
+    def get_timeout(self):
+        """ Get the time left before the next screensaver refresh or start.
+        Used by the main loop which waits for events when nothing is animated.
+
+        :return: time in seconds or None if nothing is scheduled
+        """
+        now = time.monotonic()
+        if self.saver_running:
+            return max(self.update_period - (now - self.refresh_time), 0)
+        elif self.current_delay == 0:
+            return None
+        else:
+            return max(self.current_delay - (now - self.delay_start), 0)
+
+    def reset_delay(self):
+        """ Start counting the delay before screensaver starts again """
+
+        self.delay_start = time.monotonic()
         
     def change_image(self, state):
         """ Set new image on screensaver
         
         :param state: button state which contains new image
         """
-        if not self.current_screensaver:
-            return
-
-        if self.current_screensaver.name == LYRICS:
+        if self.current_screensaver and self.current_screensaver.name == LYRICS:
             self.current_screensaver.set_song_info(state)
 
         if getattr(state, "icon_base", None) == None and getattr(state, "full_screen_image", None) == None:
@@ -284,8 +311,9 @@ class ScreensaverDispatcher(Component):
             self.current_image = state.full_screen_image
         elif getattr(state, "icon_base", None) != None:
             self.current_image = state.icon_base
-                
-        self.current_screensaver.set_image(self.current_image)
+
+        if self.current_screensaver:
+            self.current_screensaver.set_image(self.current_image)
     
     def change_image_folder(self, folder):
         """ Change image folder
@@ -302,11 +330,9 @@ class ScreensaverDispatcher(Component):
         
         :param volume: new volume level
         """
-        if not self.current_screensaver:
-            return
-
         self.current_volume = volume.position
-        self.current_screensaver.set_volume(self.current_volume)
+        if self.current_screensaver:
+            self.current_screensaver.set_volume(self.current_volume)
         
         if self.config[USAGE][USE_VU_METER]:
             try:
@@ -324,7 +350,7 @@ class ScreensaverDispatcher(Component):
             if self.saver_running:               
                 self.cancel_screensaver(event)
             else:
-                self.delay_counter = 0                
+                self.reset_delay()
                 
     def add_start_listener(self, listener):
         """ Add start screensaver event listener
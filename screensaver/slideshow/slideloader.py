@@ -0,0 +1,123 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+#
+# This file is part of Peppy Player.
+#
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from collections import deque
+from threading import Thread, Condition
+
+SLIDE_BUFFER_SIZE = 3
+
+class SlideLoader(object):
+    """ Decodes and scales the next slides in the background thread.
+    Only a few decoded slides are kept in the ring buffer, so the memory usage
+    doesn't depend on the number of images in the folder.
+    """
+
+    def __init__(self, load_function, buffer_size=SLIDE_BUFFER_SIZE, listener=None):
+        """ Initializer
+
+        :param load_function: function which takes image path and returns tuple (path, image)
+        :param buffer_size: maximum number of decoded slides
+        :param listener: function called when slide is decoded
+        """
+        self.load_function = load_function
+        self.buffer_size = buffer_size
+        self.listener = listener
+        self.condition = Condition()
+        self.buffer = deque()
+        self.names = []
+        self.next_index = 0
+        self.failures = 0
+        self.generation = 0
+        self.thread = None
+
+    def set_images(self, names):
+        """ Set image paths. The slides decoded for the previous images are discarded.
+
+        :param names: list of image paths in the slideshow order
+        """
+        with self.condition:
+            if names == self.names:
+                return
+            self.names = list(names)
+            self.next_index = 0
+            self.failures = 0
+            self.generation += 1
+            self.buffer.clear()
+
+            if self.thread == None:
+                self.thread = Thread(target=self.run, name="slideloader", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def has_images(self):
+        """ Check if there are images to show
+
+        :return: True - there are images, False - no images
+        """
+        with self.condition:
+            return len(self.names) > 0
+
+    def is_full(self):
+        """ Check if the loader should wait. Called with the acquired condition.
+
+        :return: True - buffer is full or there is nothing to load, False - next slide can be loaded
+        """
+        return len(self.buffer) >= self.buffer_size or not self.names or self.failures >= len(self.names)
+
+    def run(self):
+        """ Load slides. Runs in the loader thread. """
+
+        while True:
+            with self.condition:
+                while self.is_full():
+                    self.condition.wait()
+                generation = self.generation
+                path = self.names[self.next_index]
+                self.next_index = (self.next_index + 1) % len(self.names)
+
+            try:
+                slide = self.load_function(path)
+            except Exception as e:
+                logging.debug(e)
+                slide = None
+
+            with self.condition:
+                if generation != self.generation:
+                    continue
+                if slide == None:
+                    self.failures += 1
+                    continue
+                self.failures = 0
+                self.buffer.append(slide)
+                self.condition.notify_all()
+
+            if self.listener:
+                self.listener()
+
+    def get_next(self):
+        """ Get the next decoded slide without waiting
+
+        :return: tuple (path, image) or None if slide is not ready
+        """
+        with self.condition:
+            if not self.buffer:
+                return None
+            slide = self.buffer.popleft()
+            self.condition.notify_all()
+            return slide
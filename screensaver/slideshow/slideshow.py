@@ -19,8 +19,8 @@ import os
 
 from ui.component import Component
 from ui.container import Container
-from itertools import cycle
 from screensaver.screensaver import Screensaver, PLUGIN_CONFIGURATION
+from screensaver.slideshow.slideloader import SlideLoader, SLIDE_BUFFER_SIZE
 from util.config import SCREEN_INFO, WIDTH, HEIGHT, SLIDESHOW
 from util.util import PACKAGE_SCREENSAVER
 from random import shuffle
@@ -40,6 +40,9 @@ class Slideshow(Container, Screensaver):
     If there is no album art folder then images from the 'slides' folder will be displayed.
     The images will be displayed in cycle. 
     The period in seconds can be defined in the configuration file.
+    The next slides are decoded in the background. With cache enabled several slides
+    are decoded in advance, otherwise only the next one. If the next slide is not decoded yet
+    the current slide stays on screen and the slide is shown as soon as it's decoded.
     """    
     def __init__(self, util):
         """ Initializer
@@ -66,9 +69,15 @@ class Slideshow(Container, Screensaver):
         else:            
             self.current_folder = self.default_folder
 
-        self.slides = []
         self.image_names = []
         self.random = self.plugin_config_file.getboolean(PLUGIN_CONFIGURATION, RANDOM_ORDER)
+        self.compositor = getattr(util, "compositor", None)
+        self.waiting = False
+        self.refresh_requested = False
+        if self.use_cache:
+            self.slide_loader = SlideLoader(self.image_util.load_slide, SLIDE_BUFFER_SIZE, self.slide_loaded)
+        else:
+            self.slide_loader = SlideLoader(self.image_util.load_slide, 1, self.slide_loaded)
         self.component = Component(util)
         self.component.name = self.name
         self.add_component(self.component)
@@ -78,40 +87,49 @@ class Slideshow(Container, Screensaver):
         
         :param folder: images folder 
         """
+        names = self.image_util.get_image_names_from_folder(folder)
+        if folder == self.current_folder and sorted(names) == sorted(self.image_names):
+            return
+
         self.current_folder = folder
-        
-        if self.use_cache:
-            self.slides = self.image_util.load_scaled_images(folder)
-            self.slide_index = cycle(range(len(self.slides)))
-        else:
-            self.image_names = self.image_util.get_image_names_from_folder(folder)
-            self.image_index = cycle(range(len(self.image_names)))
+        self.image_names = names
 
         if self.random:
             shuffle(self.image_names)
-            shuffle(self.slides)
         else:
-            self.slides.sort()
             self.image_names.sort()
 
+        self.slide_loader.set_images(self.image_names)
+
+    def slide_loaded(self):
+        """ Slide loader listener. Requests refresh if the slideshow waits for this slide. """
+
+        if not self.waiting:
+            return
+
+        self.refresh_requested = True
+        if self.compositor:
+            self.compositor.request_frame()
+
     def refresh(self):
-        """ Update image on screen """
+        """ Update image on screen. The method doesn't wait for the slide which is not decoded yet,
+        the refresh is requested again when the slide is ready.
+        """
         
-        if self.use_cache:
-            if not self.slides:
-                self.change_folder(self.current_folder)
-            if not self.slides:
+        if not self.image_names:
+            self.change_folder(self.current_folder)
+        if not self.image_names:
+            return
+
+        slide = self.slide_loader.get_next()
+        if slide == None:
+            self.waiting = True
+            # the slide could be decoded before the flag was set
+            slide = self.slide_loader.get_next()
+            if slide == None:
                 return
-            i = next(self.slide_index)
-            slide = self.slides[i]
-        else:
-            if not self.image_names:
-                self.change_folder(self.current_folder)
-            if not self.image_names:
-                return   
-            i = next(self.image_index)
-            path = self.image_names[i]
-            slide = self.image_util.load_scaled_image(path)
+        self.waiting = False
+        self.refresh_requested = False
 
         self.component.content = (slide[0], slide[1])
         self.component.image_filename = slide[0]
@@ -133,7 +151,4 @@ class Slideshow(Container, Screensaver):
         folder = getattr(state, "cover_art_folder", None)
         if not folder:
             folder = self.default_folder
-        self.current_folder = folder
-        self.slides = []
-        self.image_names = []
         self.change_folder(folder)
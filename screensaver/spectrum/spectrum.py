@@ -16,7 +16,6 @@
 # along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
 
 import pygame
-import math
 import time
 import logging
 import sys
@@ -27,20 +26,35 @@ from ui.container import Container
 from random import randrange
 from screensaver.screensaver import Screensaver, PLUGIN_CONFIGURATION
 from util.config import SCREEN_INFO, WIDTH, HEIGHT
-from threading import Thread
+from threading import Thread, RLock
 from util.util import PACKAGE_SCREENSAVER
+from util.pipereader import get_pipe_reader
 from itertools import cycle
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 MAX_VALUE = "max.value"
 PIPE_NAME = "pipe.name"
 SIZE = "size"
 UPDATE_UI_INTERVAL = "update.ui.interval"
 DEFAULT_IMAGES_FOLDER = "images"
 AMPLIFIER = "amplifier"
+SMOOTHING = "smoothing"
+PEAK_HOLD = "peak.hold"
 SIDE_GAP = 5 # width percent
+REFLECTION_GAP = 2
+PEAK_HEIGHT = 2
+PEAK_FALL_TIME = 1.0 # seconds to fall from the top to the bottom
 
 class Spectrum(Container, Screensaver):
-    """ Spectrum Analyzer screensaver plug-in. """
+    """ Spectrum Analyzer screensaver plug-in.
+
+    The bar heights are calculated for all bars at once using NumPy arrays. The bars, reflections and peaks
+    are drawn by one batch blit into the spectrum area which is the only area updated on display.
+    """
         
     def __init__(self, util):
         """ Initializer
@@ -56,25 +70,25 @@ class Spectrum(Container, Screensaver):
         self.image_util = util.image_util
         self.util = util        
         self.run_flag = False
-        self.run_datasource = False        
+        self.lock = RLock()
         
         self.pipe_name = self.plugin_config_file.get(PLUGIN_CONFIGURATION, PIPE_NAME)
-        self.PIPE_BUFFER_SIZE = 1048576 # as defined for Raspberry OS in /proc/sys/fs/pipe-max-size
         self.max_value = self.plugin_config_file.getint(PLUGIN_CONFIGURATION, MAX_VALUE)
         self.size = self.plugin_config_file.getint(PLUGIN_CONFIGURATION, SIZE)
         self.update_ui_interval = self.plugin_config_file.getfloat(PLUGIN_CONFIGURATION, UPDATE_UI_INTERVAL)
         self.amplifier = self.plugin_config_file.getfloat(PLUGIN_CONFIGURATION, AMPLIFIER)
-        self.pipe_polling_inerval = self.update_ui_interval / 10
-        self.bar_heights = [0] * self.size
-        self.pipe_size = 4 * self.size
+        self.smoothing = self.plugin_config_file.getfloat(PLUGIN_CONFIGURATION, SMOOTHING, fallback=0.0)
+        self.peak_hold = self.plugin_config_file.getfloat(PLUGIN_CONFIGURATION, PEAK_HOLD, fallback=0.0)
         
         self.fifth = self.bounding_box.h / 5
         self.unit = (self.fifth * 2) / self.max_value
         self.bar_max_height = int(self.unit * self.max_value * self.amplifier)
+        self.peak_step = self.bar_max_height * self.update_ui_interval / PEAK_FALL_TIME
         self.gap = int((self.bounding_box.w * SIDE_GAP) / 100)
         width = self.bounding_box.w - self.gap * 2
         self.bar_width = int(width / self.size)
         self.start_x = int((self.bounding_box.w - self.bar_width * self.size) / 2)
+        self.bar_x = [self.start_x + (r * self.bar_width) for r in range(self.size)]
         
         base_line_1 = self.bounding_box.h - (self.fifth * 1.8)
         base_line_2 = self.bounding_box.h - (self.fifth * 3.0)
@@ -82,15 +96,23 @@ class Spectrum(Container, Screensaver):
         self.base_line = [base_line_1, base_line_2, base_line_3] 
 
         self.indexes = cycle(range(3))
+        self.index = 0
+        self.spectrum_rect = None
+        self.redraw = False
         self.pipe = None
         
         self.init_images()
         self.init_container()
+        self.reset_levels()
+
+        if numpy == None:
+            logging.error("NumPy library not found")
 
         if "win" in sys.platform:
             self.windows = True
         else:
             self.windows = False
+            self.pipe = get_pipe_reader(self.pipe_name, f"<{self.size}I", self.update_ui_interval)
             thread = Thread(target=self.open_pipe)
             thread.start()
     
@@ -99,11 +121,6 @@ class Spectrum(Container, Screensaver):
         
         c = Component(self.util)
         self.add_component(c)
-        for r in range(self.size):
-            c = Component(self.util)
-            self.add_component(c)
-            c = Component(self.util)
-            self.add_component(c)        
     
     def init_images(self):
         """ Initialize lists of images """
@@ -135,39 +152,38 @@ class Spectrum(Container, Screensaver):
     def open_pipe(self):
         """ Open named pipe  """
         
-        try:            
-            self.pipe = os.open(self.pipe_name, os.O_RDONLY | os.O_NONBLOCK)
-        except Exception as e:
-            logging.debug("Cannot open named pipe: " + self.pipe_name)
-            logging.debug(e)
-
-    def flush_pipe_buffer(self):
-        """ Flush data from the pipe """
+        self.pipe.open()
 
-        if not self.pipe:
-            return
+    def reset_levels(self):
+        """ Set bar levels and peaks to zero """
 
-        try:
-            os.read(self.pipe, self.PIPE_BUFFER_SIZE)
-        except Exception as e:
-            logging.debug(e)
+        if numpy != None:
+            self.levels = numpy.zeros(self.size)
+            self.peaks = numpy.zeros(self.size)
+            self.peak_times = numpy.zeros(self.size)
+        else:
+            self.levels = [0.0] * self.size
+            self.peaks = [0.0] * self.size
+            self.peak_times = [0.0] * self.size
 
     def start(self):
         """ Start spectrum thread. """ 
         
-        self.index = 0
-        self.set_background()        
-        self.set_bars()
-        self.set_reflections()
+        with self.lock:
+            self.index = 0
+            self.set_background()
+            self.redraw = True
         
+        self.reset_levels()
         self.run_flag = True
-        self.start_data_source()
+        if self.pipe != None:
+            self.pipe.start()
         thread = Thread(target=self.update_ui)
         thread.start()
         pygame.event.clear()
     
     def set_background(self):
-        """ Set background image """
+        """ Set background image and spectrum area """
         
         c = self.components[0]
         c.content = ("", self.bgr[self.index])
@@ -180,119 +196,152 @@ class Spectrum(Container, Screensaver):
             c.content_x = int((w - size[0])/2)
             c.content_y = int((h - size[1])/2)
     
-    def set_bars(self):
-        """ Set spectrum bars  """
-        
-        for r in range(self.size):
-            c = self.components[r + 1]
-            x = self.start_x + (r * self.bar_width)
-            c.content_x = x
-            c.content_y = self.base_line[self.index]
-            w = self.bar_width - 1
-            c.content = ("", self.bar[self.index])
-            c.bounding_box = pygame.Rect(0, 0, w, 0)
-            
-    def set_reflections(self):
-        """ Set reflection bars """
-        
-        for r in range(self.size):
-            c = self.components[r + 1 + self.size]
-            x = self.start_x + (r * self.bar_width)
-            c.content_x = x
-            c.content_y = self.base_line[self.index]
-            w = self.bar_width - 1
-            c.content = ("", self.reflection[self.index])
-            c.bounding_box = pygame.Rect(0, 0, w, 0)
+        base = int(self.base_line[self.index])
+        top = base - self.bar_max_height - PEAK_HEIGHT
+        height = self.bar_max_height * 2 + PEAK_HEIGHT + REFLECTION_GAP
+        r = pygame.Rect(self.start_x, top, self.bar_width * self.size, height)
+        self.spectrum_rect = r.clip(self.bounding_box)
     
     def refresh(self):
         """ Update spectrum """
         
-        self.index = next(self.indexes)
-        self.set_background()        
-        self.set_bars()
-        self.set_reflections()
+        with self.lock:
+            self.index = next(self.indexes)
+            self.set_background()
+            self.redraw = True
             
     def stop(self):
         """ Stop spectrum thread. """ 
         
         self.run_flag = False
-        self.run_datasource = False
+        if self.pipe != None:
+            self.pipe.stop()
     
-    def start_data_source(self):
-        """ Start data source thread. """
+    def get_values(self):
+        """ Get the newest spectrum values
 
-        self.flush_pipe_buffer()
-        self.run_datasource = True
-        thread = Thread(target=self.get_data)
-        thread.start()
+        :return: NumPy array or list of values, None if there is no data
+        """
+        if self.windows:
+            values = [randrange(0, int(self.max_value * 0.5)) for _ in range(self.size)]
+            return numpy.array(values) if numpy != None else values
         
-    def get_data(self):
-        """ Data Source Thread method. """ 
+        if self.pipe == None:
+            return None
                
-        while self.run_datasource:
-            self.set_values()
-            time.sleep(self.update_ui_interval)
+        if numpy == None:
+            return self.pipe.get_values()
     
-    def get_latest_pipe_data(self):
-        """ Read from the named pipe until it's empty """
-
-        data = [0]*self.pipe_size
-        while True:
-            try:
-                tmp_data = os.read(self.pipe, self.pipe_size)
-                if len(tmp_data) == self.pipe_size:
-                    data = tmp_data
-                time.sleep(self.pipe_polling_inerval)
-            except:
-                break
+        frame = self.pipe.get_frame()
+        if frame == None:
+            return None
+        return numpy.frombuffer(frame, "<u4")
 
-        return data
+    def update_levels(self, values, now):
+        """ Apply amplification, smoothing and peak hold to all bars at once
 
-    def set_values(self):
-        """ Get signal from the named pile and update spectrum bars. """ 
+        :param values: spectrum values or None
+        :param now: current time in seconds
 
-        data = []
+        :return: tuple (list of bar heights, list of peak heights)
+        """
+        if numpy == None:
+            return self.update_levels_list(values, now)
 
-        if self.windows:
-            data = []
-            mask = 0b11111111
-            for _ in range(self.size):
-                v = int((randrange(0, int(self.max_value * 0.5))))
-                data.append(v & mask)
-                data.append((v >> 8) & mask)
-                data.append((v >> 16) & mask)
-                data.append((v >> 24) & mask)
+        if values is None:
+            target = numpy.zeros(self.size)
         else:
-            try:
-                if self.pipe == None:
-                    return
-    			
-                data = self.get_latest_pipe_data()
-            except Exception as e:
-                logging.debug(e)
-                return
-
-        length = len(data)
-        if length == 0:
-            return
-            
-        words = int(length / 4)
-        for m in range(words):
-            v = data[4 * m] + (data[4 * m + 1] << 8) + (data[4 * m + 2] << 16) + (data[4 * m + 3] << 24)
-            h = int(v * self.unit * self.amplifier)
-            i = m + 1
-            comp = self.components[i]
-            comp.bounding_box.h = h
-            comp.bounding_box.y = self.bar_max_height - h
-            comp.content_y = int(self.base_line[self.index] - self.bar_max_height + comp.bounding_box.y)
-            comp = self.components[i + self.size]
-            comp.bounding_box.h = h
-            comp.bounding_box.y = 0
-            comp.content_y = int(self.base_line[self.index] + 2)
+            target = numpy.minimum(values * (self.unit * self.amplifier), self.bar_max_height)
+
+        falling = self.levels * self.smoothing + target * (1.0 - self.smoothing)
+        self.levels = numpy.where(target >= self.levels, target, falling)
+
+        if self.peak_hold:
+            rising = self.levels >= self.peaks
+            self.peak_times[rising] = now
+            released = now - self.peak_times > self.peak_hold
+            fallen = numpy.maximum(self.peaks - self.peak_step, self.levels)
+            self.peaks = numpy.where(rising, self.levels, numpy.where(released, fallen, self.peaks))
+
+        return (self.levels.astype(int).tolist(), self.peaks.astype(int).tolist())
+
+    def update_levels_list(self, values, now):
+        """ Apply amplification, smoothing and peak hold without NumPy
+
+        :param values: spectrum values or None
+        :param now: current time in seconds
+
+        :return: tuple (list of bar heights, list of peak heights)
+        """
+        if values == None:
+            values = [0] * self.size
+
+        k = self.unit * self.amplifier
+        for i, v in enumerate(values):
+            target = min(v * k, self.bar_max_height)
+            level = self.levels[i]
+            if target < level:
+                target = level * self.smoothing + target * (1.0 - self.smoothing)
+            self.levels[i] = target
+
+            if self.peak_hold:
+                if target >= self.peaks[i]:
+                    self.peaks[i] = target
+                    self.peak_times[i] = now
+                elif now - self.peak_times[i] > self.peak_hold:
+                    self.peaks[i] = max(self.peaks[i] - self.peak_step, target)
+
+        return ([int(v) for v in self.levels], [int(v) for v in self.peaks])
+
+    def draw_spectrum(self, heights, peaks):
+        """ Draw background of the spectrum area, bars, reflections and peaks by one batch blit
+
+        :param heights: bar heights
+        :param peaks: peak heights
+        """
+        bgr = self.components[0]
+        base = int(self.base_line[self.index])
+        bar = self.bar[self.index]
+        reflection = self.reflection[self.index]
+        w = self.bar_width - 1
+        max_height = self.bar_max_height
+        r = self.spectrum_rect
+
+        blits = [(bgr.content[1], r, r.move(-bgr.content_x, -bgr.content_y))]
+        for x, h in zip(self.bar_x, heights):
+            if h > 0:
+                blits.append((bar, (x, base - h), (0, max_height - h, w, h)))
+                blits.append((reflection, (x, base + REFLECTION_GAP), (0, 0, w, h)))
+
+        if self.peak_hold:
+            for x, p in zip(self.bar_x, peaks):
+                if p > 0:
+                    blits.append((bar, (x, base - p - PEAK_HEIGHT), (0, 0, w, PEAK_HEIGHT)))
+
+        self.screen.blits(blits, doreturn=False)
 
     def update_ui(self):
         """ Update UI Thread method. """ 
                
+        next_time = time.monotonic()
         while self.run_flag:
-            self.clean_draw_update()            
-            time.sleep(self.update_ui_interval)
+            heights, peaks = self.update_levels(self.get_values(), time.monotonic())
+
+            with self.lock:
+                if self.visible:
+                    if self.redraw:
+                        self.redraw = False
+                        self.clean()
+                        self.draw()
+                        self.draw_spectrum(heights, peaks)
+                        self.update()
+                    else:
+                        self.draw_spectrum(heights, peaks)
+                        self.update_rectangle(self.spectrum_rect)
+
+            next_time += self.update_ui_interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.monotonic()
@@ -32,6 +32,8 @@ ELLIPSES = "..."
 
 class Button(Container):
     """ Base class for button objects """
+
+    HIT_BOX_ATTRIBUTE = "state.bounding_box" # checked by the hit-test index
     
     def __init__(self, util, state):
         """ Initializer
@@ -555,6 +557,16 @@ class Button(Container):
         if getattr(self, "redraw_observer", None):
             self.redraw_observer()
 
+    def get_hit_box(self):
+        """ Get the area outside of which the button ignores pointer events.
+        The subclasses with own mouse handling get all pointer events.
+
+        :return: rectangle or None if the button should get all pointer events
+        """
+        if type(self).handle_event is not Button.handle_event or type(self).mouse_action is not Button.mouse_action:
+            return None
+        return getattr(self.state, "bounding_box", None)
+
     def mouse_action(self, event):
         """ Mouse event dispatcher
         
@@ -37,6 +37,7 @@ class Component(object):
         """
         self.screen = None
         self.screen = util.pygame_screen
+        self.compositor = getattr(util, "compositor", None)
         self.content = c
         self.content_x = x
         self.content_y = y
@@ -148,13 +149,18 @@ class Component(object):
         """ Update Pygame Screen """
         
         if not self.visible: return
-        pygame.display.update(self.bounding_box)
+        self.update_rectangle(self.bounding_box)
         
     def update_rectangle(self, r):
-        """ Update Pygame Screen """
+        """ Update Pygame Screen. The rectangle is added to the compositor
+        which updates the display once per frame.
+        """
         
         if not self.visible: return
-        pygame.display.update(r)      
+        if self.compositor:
+            self.compositor.add_rect(r)
+        else:
+            pygame.display.update(r)
         
     def set_visible(self, flag):
         """ Set component visibility 
@@ -163,6 +169,14 @@ class Component(object):
         """
         self.visible = flag
         
+    def get_hit_box(self):
+        """ Get the area outside of which the component ignores pointer events.
+        Used by the container hit-test index.
+
+        :return: rectangle or None if the component should get all pointer events
+        """
+        return None
+
     def refresh(self):
         """ Refresh component. Used for periodical updates  animation. """
         
@@ -0,0 +1,240 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+#
+# This file is part of Peppy Player.
+#
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import pygame
+
+from threading import RLock
+from timeit import default_timer as timer
+from util.keys import WAKE_UP_EVENT_TYPE
+
+MAX_DIRTY_RECTS = 32
+
+def merge_rects(rects):
+    """ Merge overlapping rectangles
+
+    :param rects: list of pygame.Rect
+
+    :return: list of non-overlapping rectangles
+    """
+    merged = []
+    for r in rects:
+        r = pygame.Rect(r)
+        if r.w <= 0 or r.h <= 0:
+            continue
+        i = r.collidelist(merged)
+        while i != -1:
+            r.union_ip(merged.pop(i))
+            i = r.collidelist(merged)
+        merged.append(r)
+    return merged
+
+class Compositor(object):
+    """ Collects the dirty rectangles of all components during the frame
+    and updates the display once per frame from the main loop.
+    Until the main loop is started the rectangles are updated immediately.
+
+    The components which need periodical refresh (e.g. text animation) register
+    themselves as animations. If there are no animations the main loop doesn't
+    run at the frame rate, it waits for the next event instead. The rectangles,
+    animations and frame requests added by other threads wake up the waiting main loop.
+    """
+
+    def __init__(self, max_rects=MAX_DIRTY_RECTS):
+        """ Initializer
+
+        :param max_rects: if there are more merged rectangles than this number
+            then their union is updated instead
+        """
+        self.lock = RLock()
+        self.max_rects = max_rects
+        self.rects = []
+        self.animations = set()
+        self.enabled = False
+        self.waiting = False
+        self.frame_requested = False
+        self.frames = 0
+        self.dirty_rects = 0
+        self.updated_rects = 0
+        self.updated_area = 0
+        self.frame_time = 0
+        self.total_frame_time = 0
+        self.max_frame_time = 0
+        self.total_flush_time = 0
+        self.cpu_time = 0
+        self.total_cpu_time = 0
+        self.idle_waits = 0
+        self.idle_time = 0
+
+    def start(self):
+        """ Start collecting rectangles """
+
+        self.enabled = True
+
+    def stop(self):
+        """ Stop collecting rectangles and update the pending ones """
+
+        self.flush()
+        self.enabled = False
+
+    def add_rect(self, rect):
+        """ Add dirty rectangle
+
+        :param rect: rectangle which should be updated on display
+        """
+        if rect == None:
+            return
+
+        if not self.enabled:
+            pygame.display.update(rect)
+            return
+
+        with self.lock:
+            self.rects.append(pygame.Rect(rect))
+            self.wake_up()
+
+    def start_animation(self, animation):
+        """ Register animation. The main loop runs at the frame rate while there are animations.
+
+        :param animation: object which should be refreshed every frame
+        """
+        with self.lock:
+            self.animations.add(animation)
+            self.wake_up()
+
+    def stop_animation(self, animation):
+        """ Unregister animation
+
+        :param animation: animation object
+        """
+        with self.lock:
+            self.animations.discard(animation)
+
+    def request_frame(self):
+        """ Request one refresh of the components, e.g. when the background task has results """
+
+        with self.lock:
+            self.frame_requested = True
+            self.wake_up()
+
+    def is_animating(self):
+        """ Check if there are registered animations
+
+        :return: True - there are animations, False - no animations
+        """
+        with self.lock:
+            return len(self.animations) > 0
+
+    def wait(self, timeout):
+        """ Wait for the next event. Called from the main loop when there are no animations.
+
+        :param timeout: maximum waiting time in seconds
+
+        :return: list with received event or empty list
+        """
+        with self.lock:
+            if self.frame_requested or self.rects or self.animations:
+                self.frame_requested = False
+                return []
+            self.waiting = True
+
+        start = timer()
+        event = pygame.event.wait(max(int(timeout * 1000), 1))
+
+        with self.lock:
+            self.waiting = False
+            self.idle_waits += 1
+            self.idle_time += timer() - start
+
+        if event.type == pygame.NOEVENT or event.type == WAKE_UP_EVENT_TYPE:
+            return []
+        return [event]
+
+    def wake_up(self):
+        """ Wake up the main loop waiting for events """
+
+        with self.lock:
+            if not self.waiting:
+                return
+            self.waiting = False
+            try:
+                pygame.event.post(pygame.event.Event(WAKE_UP_EVENT_TYPE))
+            except:
+                pass
+
+    def flush(self, frame_start=None, cpu_start=None):
+        """ Update display with all rectangles collected during the frame
+
+        :param frame_start: frame start time used for the frame time counter
+        :param cpu_start: main thread CPU time at the frame start
+        """
+        with self.lock:
+            rects = self.rects
+            self.rects = []
+
+        if rects:
+            start = timer()
+            merged = merge_rects(rects)
+            if len(merged) > self.max_rects:
+                merged = [merged[0].unionall(merged[1:])]
+            pygame.display.update(merged)
+            flush_time = timer() - start
+        else:
+            merged = []
+            flush_time = 0
+
+        if frame_start == None:
+            return
+
+        with self.lock:
+            self.frame_time = timer() - frame_start
+            self.frames += 1
+            self.dirty_rects += len(rects)
+            self.updated_rects += len(merged)
+            self.updated_area += sum(r.w * r.h for r in merged)
+            self.total_frame_time += self.frame_time
+            self.total_flush_time += flush_time
+            if self.frame_time > self.max_frame_time:
+                self.max_frame_time = self.frame_time
+            if cpu_start != None:
+                self.cpu_time = time.thread_time() - cpu_start
+                self.total_cpu_time += self.cpu_time
+
+    def get_statistics(self):
+        """ Get frame statistics
+
+        :return: dictionary with frame statistics, times in milliseconds
+        """
+        with self.lock:
+            n = max(self.frames, 1)
+            return {
+                "frames": self.frames,
+                "dirty_rects": self.dirty_rects,
+                "updated_rects": self.updated_rects,
+                "dirty_rects_per_frame": round(self.dirty_rects / n, 2),
+                "updated_rects_per_frame": round(self.updated_rects / n, 2),
+                "updated_area_per_frame": int(self.updated_area / n),
+                "last_frame_time": round(self.frame_time * 1000, 3),
+                "average_frame_time": round(self.total_frame_time * 1000 / n, 3),
+                "max_frame_time": round(self.max_frame_time * 1000, 3),
+                "average_flush_time": round(self.total_flush_time * 1000 / n, 3),
+                "last_loop_cpu_time": round(self.cpu_time * 1000, 3),
+                "average_loop_cpu_time": round(self.total_cpu_time * 1000 / n, 3),
+                "idle_waits": self.idle_waits,
+                "idle_time": round(self.idle_time * 1000, 3),
+                "animations": len(self.animations)
+            }
@@ -16,6 +16,9 @@
 # along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
 
 from ui.component import Component
+from ui.hittestindex import HitTestIndex, POINTER_EVENTS
+
+HIT_TEST_INDEX_MIN_SIZE = 8
 
 class Container(Component):
     """ This container class keeps the list of components and executes group methods on them """
@@ -39,6 +42,7 @@ class Container(Component):
             self.image_filename = image_filename
 
         self.exit_top_y = self.exit_bottom_y = self.exit_left_x = self.exit_right_x = None
+        self.hit_test_index = None
         
     def add_component(self, component):
         """ Add component to the container
@@ -96,7 +100,12 @@ class Container(Component):
         """
         if not self.visible or len(self.components) == 0: return
 
-        for i in range(len(self.components) - 1, -1, -1):
+        if event.type in POINTER_EVENTS and hasattr(event, "pos") and len(self.components) >= HIT_TEST_INDEX_MIN_SIZE:
+            indexes = self.get_hit_test_index().get_candidates(event.pos)
+        else:
+            indexes = range(len(self.components) - 1, -1, -1)
+
+        for i in indexes:
             try:
                 comp = self.components[i]
 
@@ -112,6 +121,17 @@ class Container(Component):
             except:
                 pass
     
+    def get_hit_test_index(self):
+        """ Get the index of the component hit boxes. The index is rebuilt when the components change
+        e.g. when a new menu page is set, or when a component hit box is moved or resized.
+
+        :return: hit-test index
+        """
+        index = getattr(self, "hit_test_index", None)
+        if index == None or not index.is_valid(self.components):
+            index = self.hit_test_index = HitTestIndex(self.components)
+        return index
+
     def set_current(self, state=None):
         """ Set container as current. Used by screens 
         
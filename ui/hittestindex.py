@@ -0,0 +1,235 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+#
+# This file is part of Peppy Player.
+#
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import logging
+import operator
+import pygame
+
+from timeit import default_timer as timer
+from ui.component import Component
+
+CELL_SIZE = 64
+POINTER_EVENTS = [pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION]
+
+BENCHMARK_SCREEN_SIZE = (800, 480)
+BENCHMARK_BUTTONS = 48
+BENCHMARK_EVENTS = 20000
+
+class HitTestIndex(object):
+    """ Grid of the component hit boxes. Used by containers for routing pointer events
+    only to the components under the pointer. The components which don't have hit box
+    (e.g. containers, sliders) get all pointer events as before.
+    The index keeps the hit boxes of the components which can change them (e.g. buttons),
+    so it's rebuilt when a box is moved, resized or replaced.
+    """
+
+    def __init__(self, components, cell_size=CELL_SIZE):
+        """ Initializer
+
+        :param components: list of components
+        :param cell_size: grid cell size in pixels
+        """
+        self.components = tuple(components)
+        self.cell_size = cell_size
+        self.boxes = {}
+        self.cells = {}
+        self.always = []
+        self.watched = {}
+        self.getters = []
+        self.checked_boxes = []
+
+        for i, comp in enumerate(self.components):
+            box = None
+            if comp and hasattr(comp, "get_hit_box"):
+                box = comp.get_hit_box()
+                self.watch(comp, box)
+
+            if box == None:
+                self.always.append(i)
+                continue
+
+            box = pygame.Rect(box)
+            self.boxes[i] = box
+            for x in range(box.left // cell_size, (box.right - 1) // cell_size + 1):
+                for y in range(box.top // cell_size, (box.bottom - 1) // cell_size + 1):
+                    self.cells.setdefault((x, y), []).append(i)
+
+    def watch(self, comp, box):
+        """ Remember the hit box of the component which can change it. If the component defines
+        the attribute which keeps its hit box (e.g. 'state.bounding_box' for buttons) the attribute
+        is checked without calling component methods, otherwise the get_hit_box method is called.
+
+        :param comp: component
+        :param box: current hit box
+        """
+        attribute = getattr(comp, "HIT_BOX_ATTRIBUTE", None)
+        if attribute:
+            getter = operator.attrgetter(attribute)
+            try:
+                value = getter(comp)
+            except AttributeError:
+                attribute = None
+
+        if attribute:
+            getter, comps, boxes = self.watched.setdefault(attribute, (getter, [], []))
+            comps.append(comp)
+            boxes.append(None if value == None else pygame.Rect(value))
+        elif type(comp).get_hit_box is not Component.get_hit_box:
+            self.getters.append(comp.get_hit_box)
+            self.checked_boxes.append(None if box == None else pygame.Rect(box))
+
+    def is_valid(self, components):
+        """ Check that the index was built for the current components and their hit boxes
+        weren't moved, resized or replaced
+
+        :param components: list of components
+
+        :return: True - index is valid, False - index should be rebuilt
+        """
+        if len(components) != len(self.components) or not all(map(operator.is_, components, self.components)):
+            return False
+
+        for getter, comps, boxes in self.watched.values():
+            try:
+                if list(map(getter, comps)) != boxes:
+                    return False
+            except AttributeError:
+                return False
+
+        return [getter() for getter in self.getters] == self.checked_boxes
+
+    def get_candidates(self, pos):
+        """ Get the indexes of the components which should handle pointer event
+
+        :param pos: pointer position
+
+        :return: component indexes in reverse order
+        """
+        x, y = int(pos[0]), int(pos[1])
+        cell = self.cells.get((x // self.cell_size, y // self.cell_size), [])
+        hits = [i for i in cell if self.boxes[i].collidepoint(x, y)]
+        if not hits:
+            return self.always[::-1]
+        return sorted(self.always + hits, reverse=True)
+
+def create_benchmark_screen(buttons):
+    """ Create screen with the menu and navigator buttons
+
+    :param buttons: number of menu buttons
+
+    :return: screen container
+    """
+    from types import SimpleNamespace
+    from ui.container import Container
+    from ui.component import Component
+    from ui.button.button import Button
+    from ui.state import State
+
+    util = SimpleNamespace(pygame_screen=None)
+    w, h = BENCHMARK_SCREEN_SIZE
+
+    def create_button(bb):
+        b = Button.__new__(Button)
+        Container.__init__(b, util, bb)
+        b.state = State()
+        b.state.bounding_box = bb
+        b.clicked = False
+        return b
+
+    screen = Container(util, pygame.Rect(0, 0, w, h))
+    screen.add_component(Component(util, bb=pygame.Rect(0, 0, w, 40)))
+
+    menu = Container(util, pygame.Rect(0, 40, w, h - 100))
+    cols = 8
+    rows = max((buttons + cols - 1) // cols, 1)
+    bw = w // cols
+    bh = (h - 100) // rows
+    for i in range(buttons):
+        menu.add_component(create_button(pygame.Rect((i % cols) * bw, 40 + (i // cols) * bh, bw, bh)))
+    screen.add_component(menu)
+
+    navigator = Container(util, pygame.Rect(0, h - 60, w, 60))
+    for i in range(8):
+        navigator.add_component(create_button(pygame.Rect(i * (w // 8), h - 60, w // 8, 60)))
+    screen.add_component(navigator)
+
+    return screen
+
+def route_events(screen, events):
+    """ Send events to the screen
+
+    :param screen: screen container
+    :param events: list of events
+
+    :return: time in milliseconds
+    """
+    start = timer()
+    for event in events:
+        screen.handle_event(event)
+    return (timer() - start) * 1000
+
+def benchmark(buttons, number):
+    """ Compare broadcast and indexed routing of the pointer events
+
+    :param buttons: number of menu buttons
+    :param number: number of events
+    """
+    import random
+    import ui.container
+
+    screen = create_benchmark_screen(buttons)
+    w, h = BENCHMARK_SCREEN_SIZE
+    events = []
+    for _ in range(number):
+        e = pygame.event.Event(pygame.MOUSEBUTTONUP)
+        e.pos = (random.randrange(w), random.randrange(h))
+        e.button = 1
+        events.append(e)
+
+    min_size = ui.container.HIT_TEST_INDEX_MIN_SIZE
+    ui.container.HIT_TEST_INDEX_MIN_SIZE = sys.maxsize
+    t = route_events(screen, events)
+    logging.debug(f"""broadcast: {t:.1f} ms, {t * 1000 / number:.2f} us per event""")
+
+    ui.container.HIT_TEST_INDEX_MIN_SIZE = min_size
+    t = route_events(screen, events)
+    logging.debug(f"""hit-test index: {t:.1f} ms, {t * 1000 / number:.2f} us per event""")
+
+def main():
+    import argparse
+    log_handler = logging.StreamHandler(sys.stdout)
+    logging.basicConfig(
+        level=logging.NOTSET,
+        format='[%(asctime)s] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s',
+        handlers=[log_handler]
+    )
+    usage = """python -m ui.hittestindex benchmark [args]"""
+    parser = argparse.ArgumentParser(usage=usage)
+    subparsers = parser.add_subparsers(dest="command")
+
+    p = subparsers.add_parser("benchmark", help="time pointer event routing on synthetic screen")
+    p.add_argument("-b", help="number of menu buttons", type=int, default=BENCHMARK_BUTTONS)
+    p.add_argument("-n", help="number of events", type=int, default=BENCHMARK_EVENTS)
+
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark(args.b, args.n)
+
+if __name__ == '__main__':
+    main()
@@ -417,7 +417,44 @@ class FileMenu(Menu):
 
         :param page: page items
         """
-        self.util.image_util.add_file_icon(page, self.icon_box, self.icon_box_without_label)
+        self.util.image_util.add_file_icon(page, self.icon_box, self.icon_box_without_label, self)
+
+    def refresh(self):
+        """ Replace generic icons by the thumbnails loaded in the background. 
+        Only the buttons with new thumbnails are redrawn.
+        """
+        Menu.refresh(self)
+
+        results = self.util.image_util.thumbnail_loader.get_results(self)
+        if not results:
+            return
+
+        buttons = []
+        for state, thumbnail in results:
+            state.icon_base = thumbnail
+            state.icon_placeholder = False
+            for b in self.buttons.values():
+                if b.state is state:
+                    buttons.append(b)
+                    break
+
+        if not buttons:
+            return
+
+        for b in buttons:
+            selected = b.selected
+            b.set_state(b.state)
+            b.set_selected(selected)
+        self.align_content(self.align)
+
+        if not self.visible:
+            return
+
+        update_observer = getattr(self, "update_observer", None)
+        for b in buttons:
+            b.clean_draw_update()
+            if update_observer:
+                update_observer(b.state)
 
     def switch_to_next_page(self, state):
         """ Switch to the next page
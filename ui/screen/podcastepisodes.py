@@ -16,7 +16,9 @@
 # along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
 
 import math
+import pygame
 
+from ui.component import Component
 from ui.layout.borderlayout import BorderLayout
 from ui.factory import Factory
 from ui.page import Page
@@ -38,6 +40,7 @@ PERCENT_BOTTOM_HEIGHT = 14.0625
 
 ICON_AREA = 12
 FONT_HEIGHT = 24
+PROGRESS_BAR_HEIGHT = 3
 
 class PodcastEpisodesScreen(MenuScreen):
     """ Podcast Episodes Screen """
@@ -81,8 +84,12 @@ class PodcastEpisodesScreen(MenuScreen):
             self.go_to_page, m, MENU_ROWS_EPISODES, MENU_COLUMNS_EPISODES, None, (0, 0, 0, 0), self.menu_layout, align=ALIGN_CENTER, font_size=font_size)
         self.set_menu(self.episodes_menu)
         
-        self.save_episode_listeners = []
         self.animated_title = True
+
+        download_manager = self.podcasts_util.get_download_manager()
+        if download_manager != None:
+            download_manager.add_progress_listener(self.update_download_progress)
+            download_manager.add_finish_listener(self.finish_download)
     
     def create_episode_menu_button(self, s, constr, action, scale, font_size):
         """ Create podcast episode menu button
@@ -243,32 +250,76 @@ class PodcastEpisodesScreen(MenuScreen):
                 if self.podcasts_util.is_podcast_folder_available():                
                     state.icon_base = state.event_origin.components[1].content = self.podcasts_util.loading_icon
                     state.status = STATUS_LOADING
-                    self.add_save_episode_listener(state) 
-                    self.podcasts_util.save_episode(state, self.notify_save_episode_listeners)                              
+                    self.podcasts_util.save_episode(state)
             self.clean_draw_update()     
         else:
             self.current_item = state.name
             podcast_player = self.listeners[KEY_PLAYER]
             podcast_player(state)                    
 
-    def add_save_episode_listener(self, listener):
-        """ Add save episode listener
-        
-        :param listener: event listener
+    def get_episode_buttons(self, url):
+        """ Get buttons of the current page showing the episode
+
+        :param url: episode URL
+
+        :return: list of buttons
         """
-        if listener not in self.save_episode_listeners:
-            self.save_episode_listeners.append(listener)
-            
-    def notify_save_episode_listeners(self):
-        """ Notify all save episode listeners """
-        
-        for index, listener in enumerate(self.save_episode_listeners):
-            listener.icon_base = listener.event_origin.components[1].content = self.podcasts_util.loaded_icon
-            listener.status = STATUS_LOADED
-            self.clean_draw_update()
-            if hasattr(self, "redraw_observer"):
-                self.redraw_observer()
-            del self.save_episode_listeners[index]
+        return [b for b in self.episodes_menu.buttons.values() if getattr(b.state, "url", None) == url]
+
+    def update_download_progress(self, url, downloaded, total):
+        """ Draw download progress bar on the episode button. Called by download manager.
+
+        :param url: episode URL
+        :param downloaded: downloaded bytes
+        :param total: episode file size
+        """
+        if not self.visible or not total:
+            return
+
+        for button in self.get_episode_buttons(url):
+            bb = button.bounding_box
+            r = pygame.Rect(bb.x, bb.y + bb.h - PROGRESS_BAR_HEIGHT, int(bb.w * min(downloaded / total, 1.0)), PROGRESS_BAR_HEIGHT)
+            bar = getattr(button, "progress_bar", None)
+            if bar == None or bar not in button.components:
+                bar = Component(self.util, r)
+                bar.name = button.state.name + ".progress"
+                bar.bgr = self.config[COLORS][COLOR_BRIGHT]
+                button.add_component(bar)
+                button.progress_bar = bar
+            else:
+                bar.content = r
+            button.clean_draw_update()
+            if hasattr(self, "update_observer"):
+                self.update_observer(button.state)
+
+    def finish_download(self, url, filename, data):
+        """ Mark episode as loaded. Called by download manager.
+
+        :param url: episode URL
+        :param filename: episode file
+        :param data: episode details
+        """
+        loaded_icon = self.podcasts_util.loaded_icon
+        for s in self.episodes:
+            if getattr(s, "url", None) == url:
+                s.icon_base = loaded_icon
+                s.status = STATUS_LOADED
+                s.file_name = filename
+
+        buttons = self.get_episode_buttons(url)
+        for button in buttons:
+            button.components[1].content = loaded_icon
+            bar = getattr(button, "progress_bar", None)
+            if bar in button.components:
+                button.components.remove(bar)
+            button.progress_bar = None
+
+        if not self.visible or not buttons:
+            return
+
+        self.clean_draw_update()
+        if hasattr(self, "redraw_observer"):
+            self.redraw_observer()
 
     def handle_event(self, event):
         """ Handle screen event
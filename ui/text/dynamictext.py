@@ -90,7 +90,7 @@ class DynamicText(OutputText):
         if text == None or self.text == text:
             return
         
-        self.animate = False
+        self.stop_animation()
         font = self.util.get_font(self.default_font_size)                    
         size = font.size(text)        
         self.components = []
@@ -160,6 +160,13 @@ class DynamicText(OutputText):
         self.clean_draw_update()
         self.comp1 = self.components[1]
         self.comp2 = self.components[2]
+        self.util.compositor.start_animation(self)
+
+    def stop_animation(self):
+        """ Stop animation """
+
+        self.animate = False
+        self.util.compositor.stop_animation(self)
 
     def refresh(self):
         """ Animation method """
@@ -219,6 +226,6 @@ class DynamicText(OutputText):
     def shutdown(self):
         """ Stop animation (if any) """
         
-        self.animate = False
+        self.stop_animation()
 
     
\ No newline at end of file
@@ -15,21 +15,226 @@
 # You should have received a copy of the GNU General Public License
 # along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import sys
+import shutil
+import struct
+import logging
+import pygame
+
 from threading import RLock
+from collections import OrderedDict
+
+CACHE_SIZE = 8 * 1024 * 1024
+DISK_CACHE_HEADER = "<II"
+DISK_CACHE_EXTENSION = ".rgba"
+DISK_CACHE_VERSION_PREFIX = "v"
+
+def get_size(value):
+    """ Estimate memory size of the cached value
+
+    :param value: cached value
+
+    :return: size in bytes
+    """
+    if value == None:
+        return 0
+    elif isinstance(value, pygame.Surface):
+        return value.get_width() * value.get_height() * value.get_bytesize()
+    elif isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    elif isinstance(value, (tuple, list)):
+        return sum([get_size(v) for v in value])
+    else:
+        return sys.getsizeof(value)
+
+class LruCache(object):
+    """ Least recently used cache with memory budget. 
+    Pinned items are never evicted and don't count against the budget.
+    Supports dictionary-like access, missing key raises KeyError.
+    """
+
+    def __init__(self, name, max_size, size_function=get_size):
+        """ Initializer
+
+        :param name: cache name used in statistics
+        :param max_size: memory budget in bytes
+        :param size_function: function which estimates item size
+        """
+        self.name = name
+        self.max_size = max_size
+        self.size_function = size_function
+        self.lock = RLock()
+        self.items = OrderedDict()
+        self.pinned_items = {}
+        self.pinned_keys = set()
+        self.sizes = {}
+        self.size = 0
+        self.pinned_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getitem__(self, key):
+        """ Get item and mark it as recently used
+
+        :param key: item key
+
+        :return: item
+        """
+        with self.lock:
+            try:
+                value = self.pinned_items[key]
+                self.hits += 1
+                return value
+            except KeyError:
+                pass
+
+            try:
+                value = self.items[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self.items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key, value):
+        """ Add or replace item. Evicts least recently used items if the budget is exceeded.
+
+        :param key: item key
+        :param value: item
+        """
+        with self.lock:
+            self.remove(key)
+            size = self.size_function(value)
+            self.sizes[key] = size
+            if key in self.pinned_keys:
+                self.pinned_items[key] = value
+                self.pinned_size += size
+            else:
+                self.items[key] = value
+                self.size += size
+                self.evict()
+
+    def __delitem__(self, key):
+        """ Delete item
+
+        :param key: item key
+        """
+        with self.lock:
+            if not self.remove(key):
+                raise KeyError(key)
+
+    def __contains__(self, key):
+        """ Check item presence without changing its usage order
+
+        :param key: item key
+
+        :return: True - item in cache, False - item not in cache
+        """
+        with self.lock:
+            return key in self.items or key in self.pinned_items
+
+    def __len__(self):
+        """ Get number of items
+
+        :return: number of items
+        """
+        with self.lock:
+            return len(self.items) + len(self.pinned_items)
+
+    def get(self, key, default=None):
+        """ Get item
+
+        :param key: item key
+        :param default: value returned if item is not in cache
+
+        :return: item or default value
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def remove(self, key):
+        """ Remove item if present
+
+        :param key: item key
+
+        :return: True - item removed, False - item not found
+        """
+        with self.lock:
+            if key in self.items:
+                del self.items[key]
+                self.size -= self.sizes.pop(key)
+            elif key in self.pinned_items:
+                del self.pinned_items[key]
+                self.pinned_size -= self.sizes.pop(key)
+            else:
+                return False
+            return True
+
+    def pin(self, key):
+        """ Never evict the item. The key can be pinned before the item is added.
+
+        :param key: item key
+        """
+        with self.lock:
+            self.pinned_keys.add(key)
+            if key in self.items:
+                value = self.items.pop(key)
+                size = self.sizes[key]
+                self.size -= size
+                self.pinned_items[key] = value
+                self.pinned_size += size
+
+    def evict(self):
+        """ Evict least recently used items until the cache fits into the budget """
+
+        with self.lock:
+            while self.size > self.max_size and len(self.items) > 1:
+                key, _ = self.items.popitem(last=False)
+                self.size -= self.sizes.pop(key)
+                self.evictions += 1
+
+    def clear(self):
+        """ Remove all items except pinned """
+
+        with self.lock:
+            self.items.clear()
+            self.sizes = {k: v for k, v in self.sizes.items() if k in self.pinned_items}
+            self.size = 0
+
+    def get_statistics(self):
+        """ Get cache statistics
+
+        :return: dictionary with cache statistics
+        """
+        with self.lock:
+            return {
+                "name": self.name,
+                "items": len(self.items),
+                "pinned": len(self.pinned_items),
+                "size": self.size,
+                "pinned_size": self.pinned_size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
 
 class Cache(object):
     """ Image cache """
     
-    lock = RLock()
-    
-    def __init__(self, util):
+    def __init__(self, util, max_size=CACHE_SIZE):
         """ Initializer 
         
         :param util: utility object 
+        :param max_size: memory budget in bytes
         """
         self.util = util
-        self.cached_images_hashes = []
-        self.image_cache = {}
+        self.image_cache = LruCache("images", max_size)
     
     def get_image(self, url):
         """ Get image from cache by specified url 
@@ -37,11 +242,7 @@ class Cache(object):
         :param url: image url 
         :return: image if in cache, None if not in cache
         """
-        with self.lock:
-            try:
-                return self.image_cache[url]
-            except:
-                return None
+        return self.image_cache.get(url)
         
     def cache_image(self, img, url):
         """ Save image in cache 
@@ -49,11 +250,158 @@ class Cache(object):
         :param img: image to cache
         :param url: image url 
         """
+        if url in self.image_cache:
+            return
+        self.image_cache[url] = img
+
+class DiskCache(object):
+    """ Persistent cache of rendered RGBA images.
+    Each image is stored in a separate file with a header containing width and height.
+    Files are kept in a versioned folder, folders of other versions are deleted.
+    The least recently used files are deleted when the size limit is exceeded.
+    """
+
+    def __init__(self, name, folder, version, max_size):
+        """ Initializer
+
+        :param name: cache name used in statistics
+        :param folder: base cache folder
+        :param version: cache version, should be changed when the rendering changes
+        :param max_size: maximum size of all files in bytes
+        """
+        self.lock = RLock()
+        self.name = name
+        self.max_size = max_size
+        self.folder = os.path.join(folder, DISK_CACHE_VERSION_PREFIX + str(version))
+        self.size = 0
+        self.used_keys = set()
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        try:
+            if os.path.isdir(folder):
+                for f in os.listdir(folder):
+                    p = os.path.join(folder, f)
+                    if p != self.folder and os.path.isdir(p):
+                        shutil.rmtree(p, ignore_errors=True)
+            os.makedirs(self.folder, exist_ok=True)
+            with os.scandir(self.folder) as entries:
+                for e in entries:
+                    self.size += e.stat().st_size
+        except Exception as e:
+            logging.debug(f"""Disk cache is not available: {e}""")
+            self.enabled = False
+
+    def get_path(self, key):
+        """ Get file path for the key
+
+        :param key: cache key
+
+        :return: file path
+        """
+        return os.path.join(self.folder, key + DISK_CACHE_EXTENSION)
+
+    def get(self, key):
+        """ Get image from the cache
+
+        :param key: cache key
+
+        :return: tuple (width, height, RGBA bytes) or None if not in cache
+        """
+        if not self.enabled:
+            return None
+
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except:
+            data = None
+
+        header_size = struct.calcsize(DISK_CACHE_HEADER)
+        if data == None or len(data) < header_size:
+            self.misses += 1
+            return None
+
+        w, h = struct.unpack_from(DISK_CACHE_HEADER, data)
+        if len(data) != header_size + w * h * 4:
+            self.misses += 1
+            return None
+
         with self.lock:
-            new_url = url.encode("utf-8")
-            h = self.util.get_hash(new_url)
-            if h in self.cached_images_hashes:
+            self.hits += 1
+            if key not in self.used_keys:
+                self.used_keys.add(key)
+                try:
+                    os.utime(path) # modification time is used for LRU trimming
+                except:
+                    pass
+
+        return (w, h, data[header_size:])
+
+    def put(self, key, width, height, buffer):
+        """ Save image in the cache
+
+        :param key: cache key
+        :param width: image width
+        :param height: image height
+        :param buffer: RGBA bytes
+        """
+        if not self.enabled:
+            return
+
+        path = self.get_path(key)
+        tmp_path = path + ".tmp"
+        data = struct.pack(DISK_CACHE_HEADER, width, height) + bytes(buffer)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.debug(f"""Cannot write disk cache file: {e}""")
+            return
+
+        with self.lock:
+            self.used_keys.add(key)
+            self.writes += 1
+            self.size += len(data)
+            if self.size > self.max_size:
+                self.trim()
+
+    def trim(self):
+        """ Delete the least recently used files until the cache takes 3/4 of the maximum size """
+
+        with self.lock:
+            try:
+                with os.scandir(self.folder) as entries:
+                    files = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+            except:
                 return
-            self.image_cache[url] = img
-            self.cached_images_hashes.append(h)
-            
+
+            files.sort()
+            self.size = sum([f[1] for f in files])
+            for _, size, path in files:
+                if self.size <= self.max_size * 3 / 4:
+                    break
+                try:
+                    os.remove(path)
+                    self.size -= size
+                except:
+                    pass
+
+    def get_statistics(self):
+        """ Get cache statistics
+
+        :return: dictionary with cache statistics
+        """
+        with self.lock:
+            return {
+                "name": self.name,
+                "size": self.size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes
+            }
@@ -24,6 +24,9 @@ import operator
 
 from timeit import default_timer as timer
 from datetime import timedelta
+from threading import Thread
+from queue import Queue
+from concurrent.futures import ProcessPoolExecutor, Future
 from mutagen import File
 from mutagen.mp4 import MP4
 
@@ -31,6 +34,10 @@ from mutagen.mp4 import MP4
 
 DEFAULT_TABLE_NAME = "metadata"
 DEFAULT_SUMMARY_TABLE_NAME = "summary"
+DEFAULT_FTS_TABLE_NAME = "metadata_fts"
+DEFAULT_COUNT_TABLE_NAME = "topic_count"
+DEFAULT_FOLDER_TABLE_NAME = "folder_state"
+SCHEMA_VERSION = 3
 FOLDER = "folder"
 FILENAME = "filename"
 TYPE = "type"
@@ -41,15 +48,23 @@ ARTIST = "artist"
 PERFORMER = "performer"
 TITLE = "title"
 DATE = "date"
+MTIME = "mtime"
+SIZE = "size"
+INODE = "inode"
 BASEFOLDER = "basefolder"
 ORIGINOS = "originos"
 EXTENSIONS = (".aac", ".ac3", ".aiff", ".ape", ".flac", ".m4a", ".mp3", ".ogg", ".opus", ".wav", ".wma", ".wv")
 METADATA = [GENRE, ALBUM, COMPOSER, ARTIST, PERFORMER, TITLE, DATE]
 MP4_METADATA = ["\xa9gen", "\xa9alb", "\xa9wrt", "\xa9ART", "aART", "\xa9nam", "\xa9day"]
 INFO = ["sample_rate", "channels", "bits_per_sample", "length", "bitrate"]
+FILE_INFO = [MTIME, SIZE, INODE]
 ALL_METADATA = [FOLDER, FILENAME, TYPE]
-ALL_METADATA.extend(METADATA + INFO)
+ALL_METADATA.extend(METADATA + INFO + FILE_INFO)
+COLUMN_TYPES = {MTIME: "integer", SIZE: "integer", INODE: "integer"}
 SUMMARY = [BASEFOLDER, ORIGINOS, GENRE, ARTIST, COMPOSER, ALBUM, TITLE, DATE, TYPE, FOLDER, FILENAME]
+TOPICS = [GENRE, ARTIST, COMPOSER, ALBUM, TITLE, DATE, FOLDER, FILENAME]
+KEY_SUFFIX = "_key"
+KEYS = [t + KEY_SUFFIX for t in TOPICS]
 
 # Collector constants
 
@@ -67,7 +82,16 @@ METADATA_STATISTICS = "Metadata Statistics"
 DATABASE_STATISTICS = "Database Statistics"
 UPDATE_STATISTICS = "Update Statistics"
 UP_TO_DATE = "The database file is up-to-date"
+THUMBNAIL_STATISTICS = "Thumbnail Statistics"
+THUMBNAIL_FILES = "Audio files with embedded images support"
+THUMBNAILS_CREATED = "Thumbnails created"
+THUMBNAIL_FOLDER = os.path.join("cache", "thumbnails")
+THUMBNAIL_TIME = "Thumbnail time (h:mm:ss)"
+NO_THUMBNAIL_BOXES = "Thumbnail sizes are not known yet, open the file browser in the player first"
+EMBEDDED_IMAGE_EXTENSIONS = (".flac", ".m4a", ".mp3", ".mp4")
+DELETED_PREFIX = "Deleted:"
 ERRORS = "Errors: "
+FILES_PER_SECOND = "Files per second: "
 AVERAGE_PARSE_TIME = 0.016
 AVERAGE_METADATA_SIZE = 278
 EMPTY_COLLECTION_SIZE = 8192
@@ -77,11 +101,115 @@ PROGRESS_BAR_SUFFIX = "Complete"
 PROGRESS_BAR_LENGTH = 50
 BATCH_SIZE = 300
 FILE_BATCH_SIZE = 50
+TASKS_PER_JOB = 4
+WRITER_QUEUE_SIZE = 4
 FULL_BLOCK_CHARACTER = chr(9608)
 ADDED_PREFIX = "Added:"
+MODIFIED_PREFIX = "Modified:"
 ADDED_SUFFIX = "file"
 UPDATE_TIME = "Update time (h:mm:ss):"
 
+def get_file_metadata(folder, filename, ext, meta, file_info=None):
+    """ Prepare audio file metadata
+
+    :param folder: file folder
+    :param filename: file name
+    :param ext: file extension
+    :param meta: file metadata from mutagen
+    :param file_info: list of file modification time (ns), size and inode
+
+    :return: file metadata list of values for insert
+    """
+    metadata = []
+    if not file_info:
+        file_info = [None for _ in FILE_INFO]
+
+    if not folder: # file in the base folder
+        folder = os.sep
+
+    metadata.append(folder)
+    metadata.append(filename)
+    metadata.append(ext)
+
+    if meta == None:
+        for _ in range(len(METADATA + INFO)):
+            metadata.append(None)
+        return metadata + list(file_info)
+
+    if filename.lower().endswith(".mp4") or filename.lower().endswith(".m4a"):
+        m = MP4_METADATA
+    else:
+        m = METADATA
+
+    for key in m:
+        if key not in meta.keys() or len(meta[key][0].replace(" ", "").strip()) == 0:
+            v = None
+        else:
+            v = meta[key][0].strip()
+        metadata.append(v)
+
+    if hasattr(meta, "info"):
+        for key in INFO:
+            metadata.append(getattr(meta.info, key, None))
+    else:
+        for _ in INFO:
+            metadata.append(None)
+
+    return metadata + list(file_info)
+
+def get_file_info(path):
+    """ Get file properties used to detect changes
+
+    :param path: file path
+
+    :return: list of file modification time (ns), size and inode
+    """
+    try:
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size, st.st_ino]
+    except:
+        return None
+
+def parse_file(path, ext):
+    """ Parse audio file metadata using mutagen
+
+    :param path: file path
+    :param ext: file extension in lower case
+
+    :return: tuple (metadata from mutagen or None, error message or None)
+    """
+    try:
+        if ext == "mp4" or ext == "m4a":
+            return (MP4(path), None)
+        else:
+            return (File(path, easy=True), None)
+    except Exception as e:
+        return (None, f"""Metadata parsing error in file {os.path.basename(path)}: {e}""")
+
+def parse_files(base_folder, current_folder, files):
+    """ Parse metadata of the audio files from one folder. Runs in the worker process.
+
+    :param base_folder: collection base folder
+    :param current_folder: folder with audio files
+    :param files: list of audio file names
+
+    :return: tuple (list of metadata values for insert, list of errors)
+    """
+    metadata = []
+    errors = []
+    meta_folder = current_folder[len(base_folder):]
+
+    for file in files:
+        ext = file[file.rfind('.') + 1:].lower()
+        path = os.path.join(current_folder, file)
+        meta, error = parse_file(path, ext)
+        if error:
+            errors.append(error)
+        metadata.append(get_file_metadata(meta_folder, file, ext, meta, get_file_info(path)))
+
+    return (metadata, errors)
+
+
 class DbUtil(object):
     """ Database utility class. Keeps the connection to the database and provides utility SQL functions. """
 
@@ -96,16 +224,47 @@ class DbUtil(object):
         self.metadata_keys = METADATA
         self.info_keys = INFO
 
-        csv = ",".join([m + " text" for m in ALL_METADATA])
+        self.fts_table_name = DEFAULT_FTS_TABLE_NAME
+        self.count_table_name = DEFAULT_COUNT_TABLE_NAME
+        self.folder_table_name = DEFAULT_FOLDER_TABLE_NAME
+        self.fts_available = False
+
+        csv = ",".join([m + " " + COLUMN_TYPES.get(m, "text") for m in ALL_METADATA + KEYS])
         self.CREATE_METADATA_TABLE = f"""CREATE TABLE IF NOT EXISTS {self.table_name} (id integer PRIMARY KEY,{csv});"""
 
+        self.CREATE_COUNT_TABLE = f"""CREATE TABLE IF NOT EXISTS {self.count_table_name} (topic text, prefix text, 
+            count integer, PRIMARY KEY(topic, prefix));"""
+        self.CREATE_FOLDER_TABLE = f"""CREATE TABLE IF NOT EXISTS {self.folder_table_name} (folder text PRIMARY KEY, 
+            mtime integer);"""
+
         csv = ",".join([m + " text" for m in SUMMARY])
         self.CREATE_SUMMARY_TABLE = f"""CREATE TABLE IF NOT EXISTS {self.summary_table_name} ({csv});"""
 
-        csv = ",".join([m for m in ALL_METADATA])
-        values = ",".join(["?" for _ in ALL_METADATA])
+        csv = ",".join([m for m in ALL_METADATA + KEYS])
+        values = ",".join(["?" for _ in ALL_METADATA + KEYS])
         self.INSERT_DATA = f"""INSERT INTO {self.table_name}({csv}) VALUES({values});"""
 
+        csv = ",".join(TOPICS)
+        self.CREATE_FTS_TABLE = f"""CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table_name} USING fts5({csv}, 
+            content='{self.table_name}', content_rowid='id', tokenize='trigram');"""
+        new_values = ",".join(["new." + t for t in TOPICS])
+        old_values = ",".join(["old." + t for t in TOPICS])
+        insert_fts = f"""INSERT INTO {self.fts_table_name}(rowid,{csv}) VALUES(new.id,{new_values});"""
+        delete_fts = f"""INSERT INTO {self.fts_table_name}({self.fts_table_name},rowid,{csv}) VALUES('delete',old.id,{old_values});"""
+        # batch inserts update the full-text search table with one statement, it's much faster than the insert trigger
+        self.INSERT_FTS_DATA = f"""INSERT INTO {self.fts_table_name}(rowid,{csv}) SELECT id,{csv} FROM {self.table_name} WHERE id > ?;"""
+        self.CREATE_FTS_TRIGGERS = [
+            f"""CREATE TRIGGER IF NOT EXISTS {self.table_name}_ad AFTER DELETE ON {self.table_name} BEGIN {delete_fts} END;""",
+            f"""CREATE TRIGGER IF NOT EXISTS {self.table_name}_au AFTER UPDATE OF {csv} ON {self.table_name} BEGIN {delete_fts} {insert_fts} END;"""
+        ]
+        self.CREATE_INDEXES = []
+        for t in TOPICS:
+            self.CREATE_INDEXES.append(f"""CREATE INDEX IF NOT EXISTS idx_{t}{KEY_SUFFIX} ON {self.table_name}({t}{KEY_SUFFIX},{t});""")
+            if t == FOLDER:
+                self.CREATE_INDEXES.append(f"""CREATE INDEX IF NOT EXISTS idx_{t} ON {self.table_name}({FOLDER},{TITLE},{FILENAME});""")
+            else:
+                self.CREATE_INDEXES.append(f"""CREATE INDEX IF NOT EXISTS idx_{t} ON {self.table_name}({t},{FOLDER});""")
+
         csv = ",".join([m for m in SUMMARY])
         values = ",".join(["?" for _ in SUMMARY])
         self.INSERT_SUMMARY_DATA = f"""INSERT INTO {self.summary_table_name}({csv}) VALUES({values});"""
@@ -139,16 +298,173 @@ class DbUtil(object):
         """ Connect to the collection database """
 
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False) # collector writes from the writer thread
             logging.debug(f"""Connected to the collection database {self.db_path}""")
             if not self.is_metadata_available():
                 logging.debug("Collection tables don't exist")
                 self.run_command(self.CREATE_METADATA_TABLE)
                 self.run_command(self.CREATE_SUMMARY_TABLE)
                 logging.debug("Created collection tables")
+            self.migrate()
         except Exception as e:
             logging.debug(e)
 
+    def get_schema_version(self):
+        """ Get schema version of the collection database
+
+        :return: schema version
+        """
+        r = self.run_query("PRAGMA user_version")
+        if r:
+            return int(r[0][0])
+        else:
+            return 0
+
+    def is_fts_available(self):
+        """ Check if full-text search table exists
+
+        :return: True - table exists, False - table doesn't exist
+        """
+        query = f"""SELECT name FROM sqlite_master WHERE type='table' AND name='{self.fts_table_name}';"""
+        if self.run_query(query):
+            return True
+        else:
+            return False
+
+    def migrate(self):
+        """ Upgrade the collection database created by the previous versions. 
+        Version 1 adds normalized sort key columns, indexes and full-text search table.
+        Version 2 adds materialized page counts table.
+        Version 3 adds file modification time, size, inode and folder modification time table.
+        """
+        version = self.get_schema_version()
+        if version >= SCHEMA_VERSION:
+            self.fts_available = self.is_fts_available()
+            return
+
+        start = timer()
+        logging.debug("Migrating collection database...")
+
+        if version < 1:
+            columns = [c[1] for c in self.run_query(f"""PRAGMA table_info({self.table_name})""")]
+            missing_keys = [k for k in KEYS if k not in columns]
+            for k in missing_keys:
+                self.run_command(f"""ALTER TABLE {self.table_name} ADD COLUMN {k} text""")
+            if missing_keys:
+                self.update_keys()
+
+            for command in self.CREATE_INDEXES:
+                self.run_command(command)
+
+            self.create_fts()
+        else:
+            self.fts_available = self.is_fts_available()
+
+        if version < 2:
+            self.run_command(self.CREATE_COUNT_TABLE)
+            self.refresh_counts()
+
+        if version < 3:
+            columns = [c[1] for c in self.run_query(f"""PRAGMA table_info({self.table_name})""")]
+            for c in FILE_INFO:
+                if c not in columns:
+                    self.run_command(f"""ALTER TABLE {self.table_name} ADD COLUMN {c} {COLUMN_TYPES[c]}""")
+            self.run_command(self.CREATE_FOLDER_TABLE)
+            if self.fts_available:
+                # version 1 trigger was fired by any update, file info updates don't change the search table
+                self.run_command(f"""DROP TRIGGER IF EXISTS {self.table_name}_au""")
+                self.run_command(self.CREATE_FTS_TRIGGERS[-1])
+
+        self.run_command(f"""PRAGMA user_version = {SCHEMA_VERSION}""")
+        self.run_command("ANALYZE")
+        logging.debug(f"""Collection database migrated in {timedelta(seconds=(timer() - start))}""")
+
+    def refresh_counts(self):
+        """ Recalculate the number of unique values for each topic and for each first character. 
+        Should be called every time when the collection changes.
+        """
+        params = []
+        for t in TOPICS:
+            total = self.run_query(f"""
+                SELECT COUNT(DISTINCT {t})
+                FROM {self.table_name}
+                WHERE {t} > ''
+            """)
+            if total:
+                params.append((t, "", total[0][0]))
+
+            by_char = self.run_query(f"""
+                SELECT SUBSTR({t}{KEY_SUFFIX}, 1, 1), COUNT(DISTINCT {t})
+                FROM {self.table_name}
+                WHERE LENGTH({t}{KEY_SUFFIX}) > 2
+                GROUP BY 1
+            """)
+            if by_char:
+                params.extend([(t, c, n) for c, n in by_char])
+
+        try:
+            self.conn.execute("begin")
+            self.conn.execute(f"""DELETE FROM {self.count_table_name}""")
+            self.conn.executemany(f"""INSERT INTO {self.count_table_name} VALUES(?, ?, ?)""", params)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.execute("rollback")
+            logging.debug(e)
+
+    def update_keys(self):
+        """ Fill sort key columns for the existing rows """
+
+        csv = ",".join(TOPICS)
+        rows = self.run_query(f"""SELECT id,{csv} FROM {self.table_name}""")
+        if not rows:
+            return
+
+        keys = ",".join([k + " = ?" for k in KEYS])
+        command = f"""UPDATE {self.table_name} SET {keys} WHERE id = ?"""
+        params = [[self.get_key(v) for v in row[1:]] + [row[0]] for row in rows]
+        try:
+            self.conn.execute("begin")
+            self.conn.executemany(command, params)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.execute("rollback")
+            logging.debug(e)
+
+    def create_fts(self):
+        """ Create full-text search table and triggers which keep it in sync with the metadata table on update/delete. 
+        FTS5 trigram tokenizer requires SQLite 3.34 or later, the search falls back to LIKE if it's not available.
+        """
+        try:
+            self.conn.execute(self.CREATE_FTS_TABLE)
+            for command in self.CREATE_FTS_TRIGGERS:
+                self.conn.execute(command)
+            self.conn.execute(f"""INSERT INTO {self.fts_table_name}({self.fts_table_name}) VALUES('rebuild')""")
+            self.conn.commit()
+            self.fts_available = True
+        except Exception as e:
+            logging.debug(f"""Full-text search is not available: {e}""")
+            self.fts_available = False
+
+    def get_key(self, value):
+        """ Get normalized sort key for the metadata value
+
+        :param value: metadata value
+
+        :return: lower case value without leading/trailing spaces
+        """
+        if value == None:
+            return None
+        return str(value).strip().lower()
+
+    def get_keys(self, row):
+        """ Get row with sort key values appended
+
+        :param row: list of values for insert in the order defined by ALL_METADATA
+
+        :return: list of values for insert with keys
+        """
+        return list(row) + [self.get_key(row[ALL_METADATA.index(t)]) for t in TOPICS]
+
     def disconnect(self):
         """ Disconnect from the collection database """
 
@@ -174,12 +490,16 @@ class DbUtil(object):
 
     def run_batch_insert(self, params):
         """ Run multiple INSERT commands in transaction. Rollback if exception.
+        New rows are added to the full-text search table in the same transaction.
 
         :param params: list of values for multiple inserts
         """
         try:
             self.conn.execute("begin")
-            self.conn.executemany(self.INSERT_DATA, params)
+            last_id = self.conn.execute(f"""SELECT IFNULL(MAX(id), 0) FROM {self.table_name}""").fetchone()[0]
+            self.conn.executemany(self.INSERT_DATA, [self.get_keys(p) for p in params])
+            if self.fts_available:
+                self.conn.execute(self.INSERT_FTS_DATA, (last_id,))
             self.conn.commit()
         except Exception as e:
             self.conn.execute("rollback")
@@ -267,10 +587,82 @@ class DbUtil(object):
         self.run_command(command)
         command = f"""DROP TABLE IF EXISTS {self.summary_table_name}"""
         self.run_command(command)
+        command = f"""DROP TABLE IF EXISTS {self.fts_table_name}"""
+        self.run_command(command)
+        command = f"""DROP TABLE IF EXISTS {self.count_table_name}"""
+        self.run_command(command)
+        command = f"""DROP TABLE IF EXISTS {self.folder_table_name}"""
+        self.run_command(command)
         self.run_command(self.CREATE_METADATA_TABLE)
         self.run_command(self.CREATE_SUMMARY_TABLE)
+        self.run_command("PRAGMA user_version = 0")
+        self.migrate()
         logging.debug("Collection deleted")
 
+    def run_batch_command(self, command, params):
+        """ Run the same command with multiple values in transaction. Rollback if exception.
+
+        :param command: SQL command
+        :param params: list of values
+        """
+        try:
+            self.conn.execute("begin")
+            self.conn.executemany(command, params)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.execute("rollback")
+            logging.debug(e)
+
+    def get_known_files(self):
+        """ Get properties of all files in the collection
+
+        :return: dictionary where key - folder, value - dictionary where key - filename, value - tuple (id, mtime, size)
+        """
+        files = {}
+        r = self.run_query(f"""SELECT id, {FOLDER}, {FILENAME}, {MTIME}, {SIZE} FROM {self.table_name}""")
+        if r:
+            for id, folder, filename, mtime, size in r:
+                files.setdefault(folder, {})[filename] = (id, mtime, size)
+        return files
+
+    def get_folder_mtimes(self):
+        """ Get modification times of the collection folders
+
+        :return: dictionary where key - folder, value - modification time (ns)
+        """
+        r = self.run_query(f"""SELECT folder, mtime FROM {self.folder_table_name}""")
+        if r:
+            return dict(r)
+        return {}
+
+    def save_folder_mtimes(self, mtimes):
+        """ Replace modification times of the collection folders
+
+        :param mtimes: dictionary where key - folder, value - modification time (ns)
+        """
+        try:
+            self.conn.execute("begin")
+            self.conn.execute(f"""DELETE FROM {self.folder_table_name}""")
+            self.conn.executemany(f"""INSERT INTO {self.folder_table_name} VALUES(?, ?)""", mtimes.items())
+            self.conn.commit()
+        except Exception as e:
+            self.conn.execute("rollback")
+            logging.debug(e)
+
+    def delete_files(self, ids):
+        """ Delete files from the collection
+
+        :param ids: list of file IDs
+        """
+        self.run_batch_command(f"""DELETE FROM {self.table_name} WHERE id = ?""", [(i,) for i in ids])
+
+    def update_file_info(self, params):
+        """ Set modification time, size and inode for files added by the previous versions
+
+        :param params: list of tuples (mtime, size, inode, id)
+        """
+        self.run_batch_command(f"""UPDATE {self.table_name} SET {MTIME} = ?, {SIZE} = ?, {INODE} = ? WHERE id = ?""", params)
+
     def delete_summary_data(self):
         """ Delete data from the Summary table """
 
@@ -375,116 +767,244 @@ class Collector(object):
 
         :return: file metadata list of values for insert
         """
-        metadata = []
+        return get_file_metadata(folder, filename, ext, meta)
+
+    def get_folder_key(self, base_folder, current_folder):
+        """ Get folder name as it's stored in the database
 
-        if not folder: # file in the base folder
+        :param base_folder: base folder
+        :param current_folder: current folder
+
+        :return: folder name relative to the base folder
+        """
+        folder = current_folder[len(base_folder):]
+        if not folder: # base folder
             folder = os.sep
+        return folder
 
-        metadata.append(folder)
-        metadata.append(filename)
-        metadata.append(ext)
+    def save_folder_mtime(self, base_folder, current_folder):
+        """ Remember folder modification time
 
-        if meta == None:
-            for _ in range(len(ALL_METADATA) - len(metadata)):
-                metadata.append(None)
-            return metadata
+        :param base_folder: base folder
+        :param current_folder: current folder
 
-        if filename.lower().endswith(".mp4") or filename.lower().endswith(".m4a"):
-            m = MP4_METADATA
-        else:
-            m = METADATA
+        :return: folder modification time (ns) or None if not available
+        """
+        try:
+            mtime = os.stat(current_folder).st_mtime_ns
+        except:
+            return None
+        self.folder_mtimes[self.get_folder_key(base_folder, current_folder)] = mtime
+        return mtime
 
-        for key in m:
-            if meta and (key not in meta.keys() or len(meta[key][0].replace(" ", "").strip()) == 0):
-                v = None
-            else:
-                v = meta[key][0].strip()
-            metadata.append(v)
+    def get_all_files(self, base_folder):
+        """ Walk through the base folder and sub-folders
 
-        if hasattr(meta, "info"):
-            for key in INFO:
-                metadata.append(getattr(meta.info, key, None))
-        else:
-            for _ in INFO:
-                metadata.append(None)
+        :param base_folder: base folder
+
+        :return: generator of tuples (folder, list of audio files)
+        """
+        self.folder_mtimes = {}
+        for current_folder, _, files in os.walk(base_folder, followlinks=True):
+            self.save_folder_mtime(base_folder, current_folder)
+            yield (current_folder, [f for f in files if f.lower().endswith(EXTENSIONS)])
+
+    def get_changed_files(self, base_folder, known_files, known_folders, full=False):
+        """ Walk through the base folder and sub-folders and find new and modified files. 
+        Folders with unchanged modification time are skipped unless full check is requested.
+        IDs of modified and deleted files are collected in self.deleted_ids,
+        the number of modified files is counted in self.modified_files.
+
+        :param base_folder: base folder
+        :param known_files: files from the database, see DbUtil.get_known_files
+        :param known_folders: folder modification times from the database
+        :param full: True - check files in all folders, False - check files only in modified folders
+
+        :return: generator of tuples (folder, list of new and modified audio files)
+        """
+        self.folder_mtimes = {}
+        self.deleted_ids = []
+        self.modified_files = 0
+        self.file_info_updates = []
 
-        return metadata
+        for current_folder, _, files in os.walk(base_folder, followlinks=True):
+            folder = self.get_folder_key(base_folder, current_folder)
+            mtime = self.save_folder_mtime(base_folder, current_folder)
+            known = known_files.pop(folder, {})
 
-    def collect_metadata(self, base_folder, total_folders, metadata_callback=None, progress_callback=None):
-        """ Collect audio file metadata
+            if not full and mtime != None and known_folders.get(folder) == mtime:
+                yield (current_folder, [])
+                continue
+
+            changed = []
+            for file in files:
+                if not file.lower().endswith(EXTENSIONS):
+                    continue
+                k = known.pop(file, None)
+                if k == None:
+                    changed.append(file)
+                    continue
+
+                id, known_mtime, known_size = k
+                info = get_file_info(os.path.join(current_folder, file))
+                if info == None:
+                    self.deleted_ids.append(id)
+                elif known_mtime == None: # added by the previous version, not parsed again
+                    self.file_info_updates.append((info[0], info[1], info[2], id))
+                elif known_mtime != info[0] or known_size != info[1]:
+                    self.deleted_ids.append(id)
+                    self.modified_files += 1
+                    changed.append(file)
+
+            self.deleted_ids.extend([k[0] for k in known.values()])
+            yield (current_folder, changed)
+
+        for known in known_files.values(): # deleted folders
+            self.deleted_ids.extend([k[0] for k in known.values()])
+
+    def collect_metadata(self, base_folder, total_folders, metadata_callback=None, progress_callback=None, jobs=1, folders=None):
+        """ Collect audio file metadata. The folder walker sends files to the pool of parser processes, 
+        parsed metadata is passed to the writer thread in batches.
 
         :param base_folder: base folder
         :param base_folder: total number of subfolders
         :param metadata_callback: callback for reporting progress, called when BATCH_SIZE reached
         :param progress_callback: callback for reporting progress, called for each new folder
+        :param jobs: number of parser processes, 1 - parse in the current process
+        :param folders: generator of tuples (folder, list of audio files), all files in the base folder if not provided
 
         :return: dictionary with statistics
         """
-        metadata = []
-        errors = []
-        num = 0
-        total_files = 0
-        scanned_folders = 0
-        start = timer()
-
         if not base_folder:
             base_folder = os.getcwd()
         elif base_folder and not os.path.isdir(base_folder):
             logging.debug(f"""Folder {base_folder} not found""")
             return
 
-        for current_folder, _, files in os.walk(base_folder, followlinks=True):
-            scanned_folders += 1
-            for file in files:
-                if not file.lower().endswith(EXTENSIONS):
-                    continue
+        self.metadata = []
+        self.errors = []
+        self.total_files = 0
+        self.scanned_folders = 0
+        self.writer_error = None
+        start = timer()
 
-                ext = file[file.rfind('.') + 1:]
-                ext = ext.lower()
-                meta = None
-                try:
-                    p = os.path.join(current_folder, file)
-                    if ext == "mp4" or ext == "m4a":
-                        meta = MP4(p)
+        writer_queue = Queue(maxsize=WRITER_QUEUE_SIZE)
+        self.writer = Thread(target=self.write_metadata, args=(writer_queue, metadata_callback))
+
+        executor = None
+        if jobs > 1:
+            executor = ProcessPoolExecutor(max_workers=jobs)
+        max_tasks = max(jobs, 1) * TASKS_PER_JOB
+        pending_folders = []
+        pending_tasks = 0
+
+        if folders == None:
+            folders = self.get_all_files(base_folder)
+
+        try:
+            for current_folder, audio_files in folders:
+                tasks = []
+                for i in range(0, len(audio_files), FILE_BATCH_SIZE):
+                    chunk = audio_files[i : i + FILE_BATCH_SIZE]
+                    if executor:
+                        tasks.append(executor.submit(parse_files, base_folder, current_folder, chunk))
                     else:
-                        meta = File(p, easy=True)
-                except Exception as e:
-                    msg = f"""Metadata parsing error in file {file}: {e}"""
-                    errors.append(msg)
-
-                meta_folder = current_folder[len(base_folder):]
-                if meta:
-                    m = self.get_file_metadata(meta_folder, file, ext, meta)
-                    metadata.append(m)
-                else:
-                    metadata.append(self.get_file_metadata(meta_folder, file, ext, None))
+                        tasks.append(parse_files(base_folder, current_folder, chunk))
+                pending_folders.append(tasks)
+                pending_tasks += len(tasks)
 
-                num += 1
-                total_files += 1
+                while pending_tasks > max_tasks:
+                    pending_tasks -= self.collect_folder(pending_folders.pop(0), writer_queue, total_folders, progress_callback)
 
-                if num == BATCH_SIZE:
-                    if metadata_callback:
-                        metadata_callback(metadata)
-                    metadata = []
-                    num = 0
+            while pending_folders:
+                self.collect_folder(pending_folders.pop(0), writer_queue, total_folders, progress_callback)
 
-            if progress_callback:
-                progress_callback(scanned_folders, total_folders)
+            if self.metadata:
+                self.put_batch(writer_queue, self.metadata)
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+            if self.writer.ident != None:
+                writer_queue.put(None)
+                self.writer.join()
 
-        end = timer()
+        if self.writer_error:
+            raise self.writer_error
 
-        if metadata_callback and metadata:
-            metadata_callback(metadata)
+        end = timer()
+        elapsed = end - start
 
         stats = {
-            SCANNED_FOLDERS: scanned_folders,
-            TOTAL_FILES: total_files,
-            PARSING_TIME: timedelta(seconds=(end - start)),
-            ERRORS: errors
+            SCANNED_FOLDERS: self.scanned_folders,
+            TOTAL_FILES: self.total_files,
+            PARSING_TIME: timedelta(seconds=elapsed),
+            FILES_PER_SECOND: round(self.total_files / elapsed, 1) if elapsed > 0 else 0,
+            ERRORS: self.errors
         }
 
         return stats
 
+    def collect_folder(self, tasks, writer_queue, total_folders, progress_callback):
+        """ Wait for parsing results for one folder and send full batches to the writer thread
+
+        :param tasks: list of futures or parsing results for the folder
+        :param writer_queue: writer thread queue
+        :param total_folders: total number of subfolders
+        :param progress_callback: callback for reporting progress, called for each folder
+
+        :return: number of collected tasks
+        """
+        for task in tasks:
+            if isinstance(task, Future):
+                metadata, errors = task.result()
+            else:
+                metadata, errors = task
+            self.metadata.extend(metadata)
+            self.errors.extend(errors)
+            self.total_files += len(metadata)
+
+            while len(self.metadata) >= BATCH_SIZE:
+                self.put_batch(writer_queue, self.metadata[:BATCH_SIZE])
+                self.metadata = self.metadata[BATCH_SIZE:]
+
+        self.scanned_folders += 1
+        if progress_callback:
+            progress_callback(self.scanned_folders, total_folders)
+
+        return len(tasks)
+
+    def put_batch(self, writer_queue, batch):
+        """ Send metadata batch to the writer thread. Blocks if the writer is behind.
+        The writer thread is started with the first batch. At that time the parser processes
+        were already forked, so they are not forked from the process with running threads.
+
+        :param writer_queue: writer thread queue
+        :param batch: metadata batch
+        """
+        if self.writer.ident == None:
+            self.writer.start()
+        writer_queue.put(batch)
+
+    def write_metadata(self, writer_queue, metadata_callback):
+        """ Writer thread loop. Passes metadata batches to the callback until None received.
+        If the callback fails the error is saved and the remaining batches are discarded,
+        so the producer never blocks on the full queue. The error is raised by the producer.
+
+        :param writer_queue: queue with metadata batches
+        :param metadata_callback: callback which writes the batch
+        """
+        while True:
+            batch = writer_queue.get()
+            if batch == None:
+                break
+            if metadata_callback == None or self.writer_error:
+                continue
+            try:
+                metadata_callback(batch)
+            except Exception as e:
+                logging.debug(e)
+                self.writer_error = e
+
     def create_summary(self, base_folder):
         """ Create collection summary
 
@@ -508,13 +1028,14 @@ class Collector(object):
         self.dbutil.run_command(self.dbutil.INSERT_SUMMARY_DATA, values)
         logging.debug("Summary created")
 
-    def create_collection(self, base_folder, total_folders, db_filename, progress_callback=None):
+    def create_collection(self, base_folder, total_folders, db_filename, progress_callback=None, jobs=1):
         """ Create the database collection with audio files metadata
 
         :param base_folder: collection base folder
         :param total_folders: total number of the subfolders in the base folder
         :param db_filename: collection database filename
         :param progress_callback: callback for reporting progress
+        :param jobs: number of parser processes
 
         :return: dictionary with collection database statistics
         """
@@ -526,107 +1047,99 @@ class Collector(object):
         self.dbutil.connect()
 
         logging.debug("Creating collection")
-        stats = self.collect_metadata(base_folder, total_folders, self.dbutil.run_batch_insert, progress_callback)
+        stats = self.collect_metadata(base_folder, total_folders, self.dbutil.run_batch_insert, progress_callback, jobs)
         logging.debug("Collection created")
+        self.dbutil.run_command("ANALYZE")
+        self.dbutil.refresh_counts()
+        self.dbutil.save_folder_mtimes(self.folder_mtimes)
         self.create_summary(base_folder)
         logging.debug("Creation process completed")
         return stats
 
-    def update_collection(self, base_folder, total_folders, progress_callback=None):
-        """ Go through the base folder/sub-folders and check if the files exist in the database. 
-            If not add the audio files metadata to the database.
+    def update_collection(self, base_folder, total_folders, progress_callback=None, jobs=1, full=False):
+        """ Go through the base folder/sub-folders and compare files with the database. 
+            Add new files, parse modified files again and delete files which don't exist anymore.
+            Files in the folders which modification time didn't change are not checked unless full check is requested.
 
         :param base_folder: collection base folder
         :param total_folders: total number of the subfolders in the base folder
         :param progress_callback: callback for reporting progress
+        :param jobs: number of parser processes
+        :param full: True - check modification time of all files
 
         :return: dictionary with collection database statistics
         """
-        if base_folder and not os.path.isdir(base_folder):
-            logging.debug(f"""Folder {base_folder} not found""")
-            return None
-
-        metadata = []
-        errors = []
-        num = 0
-        scanned_folders = 0
-        start = timer()
-        new_files_added = 0
-
         if not base_folder:
             base_folder = os.getcwd()
         elif base_folder and not os.path.isdir(base_folder):
             logging.debug(f"""Folder {base_folder} not found""")
             return None
 
-        query = f"""
-            SELECT COUNT(DISTINCT ID)
-            FROM {self.dbutil.table_name} 
-            WHERE FOLDER = ? AND FILENAME = ?
-        """
+        start = timer()
+        known_files = self.dbutil.get_known_files()
+        known_folders = self.dbutil.get_folder_mtimes()
+        folders = self.get_changed_files(base_folder, known_files, known_folders, full)
+        stats = self.collect_metadata(base_folder, total_folders, self.dbutil.run_batch_insert, progress_callback, jobs, folders)
 
-        for current_folder, _, files in os.walk(base_folder, followlinks=True):
-            scanned_folders += 1
-            for file in files:
-                if not file.lower().endswith(EXTENSIONS):
-                    continue
+        self.dbutil.delete_files(self.deleted_ids)
+        self.dbutil.update_file_info(self.file_info_updates)
+        self.dbutil.save_folder_mtimes(self.folder_mtimes)
 
-                ext = file[file.rfind('.') + 1:]
-                ext = ext.lower()
-                meta = None
+        files_modified = self.modified_files
+        files_added = max(stats[TOTAL_FILES] - files_modified, 0)
+        files_deleted = len(self.deleted_ids) - files_modified
 
-                folder = current_folder[len(base_folder):]
-                filename = file
+        if stats[TOTAL_FILES] > 0 or len(self.deleted_ids) > 0:
+            self.dbutil.refresh_counts()
+            self.dbutil.delete_summary_data()
+            self.create_summary(base_folder)
 
-                result = self.dbutil.run_parameterized_query(query, (folder, filename))
-                if result and int(result[0][0]) == 1:
-                    continue
+        end = timer()
 
-                try:
-                    p = os.path.join(current_folder, file)
-                    if ext == "mp4" or ext == "m4a":
-                        meta = MP4(p)
-                    else:
-                        meta = File(p, easy=True)
-                except Exception as e:
-                    msg = f"""Metadata parsing error in file {file}: {e}"""
-                    errors.append(msg)
-
-                if meta:
-                    m = self.get_file_metadata(folder, file, ext, meta)
-                    metadata.append(m)
-                else:
-                    metadata.append(self.get_file_metadata(folder, file, ext, None))
+        stats = {
+            ADDED_PREFIX: files_added,
+            MODIFIED_PREFIX: files_modified,
+            DELETED_PREFIX: files_deleted,
+            PARSING_TIME: timedelta(seconds=(end - start)),
+            ERRORS: stats[ERRORS]
+        }
 
-                num += 1
+        return stats
 
-                if num == BATCH_SIZE:
-                    self.dbutil.run_batch_insert(metadata)
-                    logging.debug(metadata)
-                    new_files_added += len(metadata)
-                    metadata = []
-                    num = 0
+    def create_thumbnails(self, base_folder, store_folder, progress_callback=None):
+        """ Create thumbnails of the images embedded into audio files. 
+        Thumbnails are created for all sizes used by the file browser, existing thumbnails are skipped.
 
-            if progress_callback:
-                progress_callback(scanned_folders, total_folders)
+        :param base_folder: collection base folder
+        :param store_folder: thumbnail store folder
+        :param progress_callback: callback for reporting progress
 
-        end = timer()
+        :return: dictionary with thumbnail statistics
+        """
+        from util.thumbnailstore import ThumbnailStore
 
-        if metadata:
-            self.dbutil.run_batch_insert(metadata)
-            new_files_added += len(metadata)
+        if base_folder and not os.path.isdir(base_folder):
+            logging.debug(f"""Folder {base_folder} not found""")
+            return None
 
-        if new_files_added > 0:
-            self.dbutil.delete_summary_data()
-            self.create_summary(base_folder)
+        store = ThumbnailStore(store_folder)
+        if not store.boxes:
+            logging.debug(NO_THUMBNAIL_BOXES)
+            return None
 
-        stats = {
-            TOTAL_FILES: new_files_added,
-            PARSING_TIME: timedelta(seconds=(end - start)),
-            ERRORS: errors
-        }
+        start = timer()
+        paths = []
+        for current_folder, files in self.get_all_files(base_folder):
+            paths.extend([os.path.join(current_folder, f) for f in files if f.lower().endswith(EMBEDDED_IMAGE_EXTENSIONS)])
 
-        return stats
+        created = store.warm_up(paths, progress_callback)
+        end = timer()
+
+        return {
+            THUMBNAIL_FILES: len(paths),
+            THUMBNAILS_CREATED: created,
+            THUMBNAIL_TIME: timedelta(seconds=(end - start))
+        }
 
     def print_files_statistics(self, stats):
         """ Prepare formatted string with folder statistics
@@ -672,6 +1185,7 @@ class Collector(object):
         s += f"""\n\n{SCANNED_FOLDERS} {stats[SCANNED_FOLDERS]}"""
         s += f"""\n{TOTAL_FILES} {stats[TOTAL_FILES]}"""
         s += f"""\n{PARSING_TIME} {stats[PARSING_TIME]}"""
+        s += f"""\n{FILES_PER_SECOND}{stats[FILES_PER_SECOND]}"""
         s += f"""\n{ERRORS} {len(stats[ERRORS])}\n"""
         if stats[ERRORS]:
             s += f"""{ERRORS}\n"""
@@ -691,24 +1205,33 @@ class Collector(object):
         n = int((STARS - 2 - len(header)) / 2)
         s = "\n\n" + "*" * n + " " + header + " " + "*" * n
 
-        if not stats or int(stats[TOTAL_FILES]) == 0:
+        if not stats or (stats[ADDED_PREFIX] == 0 and stats[MODIFIED_PREFIX] == 0 and stats[DELETED_PREFIX] == 0):
             s += f"""\n\n{UP_TO_DATE}\n"""
             s += "\n" + "*" * STARS
             logging.debug(s)
             return
 
-        if stats[TOTAL_FILES] > 1:
-            suffix = ADDED_SUFFIX + "s"
-        else:
-            suffix = ADDED_SUFFIX
-
-        s += f"""\n\n{ADDED_PREFIX} {stats[TOTAL_FILES]} {suffix}"""
+        s += f"""\n\n{ADDED_PREFIX} {stats[ADDED_PREFIX]} {self.get_files_suffix(stats[ADDED_PREFIX])}"""
+        s += f"""\n{MODIFIED_PREFIX} {stats[MODIFIED_PREFIX]} {self.get_files_suffix(stats[MODIFIED_PREFIX])}"""
+        s += f"""\n{DELETED_PREFIX} {stats[DELETED_PREFIX]} {self.get_files_suffix(stats[DELETED_PREFIX])}"""
         s += f"""\n{UPDATE_TIME} {stats[PARSING_TIME]}"""
         s += f"""\n{ERRORS} {len(stats[ERRORS])}\n"""
         s += "\n" + "*" * STARS
         
         logging.debug(s)
 
+    def get_files_suffix(self, n):
+        """ Get singular or plural suffix
+
+        :param n: number of files
+
+        :return: suffix
+        """
+        if n == 1:
+            return ADDED_SUFFIX
+        else:
+            return ADDED_SUFFIX + "s"
+
     def print_statistics(self, stats, header):
         """ Prepare formatted string
 
@@ -793,8 +1316,14 @@ def main():
     python collector.py db -i c:\\peppy.db\t show statistics for specific database file
     python collector.py create -i c:\\music -o c:\peppy.db
         create collection database using specified folder and database filename
+    python collector.py create -i c:\\music -o c:\peppy.db -j 4
+        create collection database using 4 parallel metadata parsers
     python collector.py update -i c:\\music -o c:\peppy.db
         update collection database using specified folder and database filename
+    python collector.py update -i c:\\music -o c:\peppy.db -f
+        update collection database checking all files, not only files in modified folders
+    python collector.py thumbnails -i c:\\music
+        create file browser thumbnails of the images embedded into audio files
     """
     parser = argparse.ArgumentParser(
         usage=usage,
@@ -812,10 +1341,17 @@ def main():
     p = subparsers.add_parser("create", help="create collection database")
     p.add_argument("-i", help="audio files root folder", required=True)
     p.add_argument("-o", help="collection database filename", required=True)
+    p.add_argument("-j", "--jobs", help="number of parallel metadata parsers", type=int, default=os.cpu_count())
 
     p = subparsers.add_parser("update", help="update collection database")
     p.add_argument("-i", help="audio files root folder", required=True)
     p.add_argument("-o", help="collection database filename", required=True)
+    p.add_argument("-j", "--jobs", help="number of parallel metadata parsers", type=int, default=os.cpu_count())
+    p.add_argument("-f", "--full", help="check all files, not only files in modified folders", action="store_true")
+
+    p = subparsers.add_parser("thumbnails", help="create thumbnails of embedded images")
+    p.add_argument("-i", help="audio files root folder", required=True)
+    p.add_argument("-c", "--cache", help="thumbnail store folder", default=THUMBNAIL_FOLDER)
 
     try:
         args = parser.parse_args()
@@ -855,7 +1391,7 @@ def main():
         coll.dbutil.connect()
         n = coll.count_folders(base_folder)
         if n:
-            stats = coll.create_collection(base_folder, n[0], db_filename, coll.print_progress_bar)
+            stats = coll.create_collection(base_folder, n[0], db_filename, coll.print_progress_bar, args.jobs)
             coll.print_metadata_statistics(stats)
     elif command == "update":        
         base_folder = args.i
@@ -871,8 +1407,15 @@ def main():
         coll.dbutil.connect()        
         n = coll.count_folders(base_folder)
         if n:
-            stats = coll.update_collection(base_folder, n[0], coll.print_progress_bar)
+            stats = coll.update_collection(base_folder, n[0], coll.print_progress_bar, args.jobs, args.full)
             coll.print_update_statistics(stats, UPDATE_STATISTICS)
+    elif command == "thumbnails":
+        base_folder = args.i
+        if base_folder.endswith(os.sep):
+            base_folder = base_folder[:-1]
+        coll = Collector()
+        stats = coll.create_thumbnails(base_folder, args.cache, coll.print_progress_bar)
+        coll.print_statistics(stats, THUMBNAIL_STATISTICS)
         
 if __name__ == '__main__':
     main()
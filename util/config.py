@@ -128,6 +128,8 @@ STREAM_SERVER = "stream.server"
 STREAM_SERVER_PORT = "stream.server.port"
 
 PODCASTS_FOLDER = "podcasts.folder"
+PODCASTS_DOWNLOAD_THREADS = "podcasts.download.threads"
+PODCASTS_DOWNLOAD_RATE = "podcasts.download.rate"
 PODCAST_URL = "podcast.url"
 PODCAST_EPISODE_NAME = "podcast.episode.name"
 PODCAST_EPISODE_URL = "podcast.episode.url"
@@ -867,6 +869,16 @@ class Config(object):
         
         config[PODCASTS_FOLDER] = config_file.get(PODCASTS, PODCASTS_FOLDER)
 
+        try:
+            config[PODCASTS_DOWNLOAD_THREADS] = config_file.getint(PODCASTS, PODCASTS_DOWNLOAD_THREADS)
+        except:
+            config[PODCASTS_DOWNLOAD_THREADS] = 1
+
+        try:
+            config[PODCASTS_DOWNLOAD_RATE] = config_file.getint(PODCASTS, PODCASTS_DOWNLOAD_RATE)
+        except:
+            config[PODCASTS_DOWNLOAD_RATE] = 0
+
         show_numbers = False
         try:
             show_numbers = config_file.getboolean(COLLECTION, SHOW_NUMBERS)
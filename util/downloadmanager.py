@@ -0,0 +1,353 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+#
+# This file is part of Peppy Player.
+#
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import time
+import logging
+import requests
+
+from queue import Queue
+from threading import RLock, Lock, Thread, Timer
+
+DOWNLOADS_FILENAME = "downloads.json"
+PART_EXTENSION = ".part"
+DOWNLOAD_THREADS = 1
+DOWNLOAD_TIMEOUT = (5, 30)
+CHUNK_SIZE = 64 * 1024
+PROGRESS_PERIOD = 1.0
+RETRY_DELAYS = [10, 60, 300, 900]
+USER_AGENT = "PeppyPlayer + https://github.com/project-owner/Peppy"
+
+URL = "url"
+FILE = "file"
+DATA = "data"
+ATTEMPTS = "attempts"
+
+class RateLimiter(object):
+    """ Token bucket shared by all downloads """
+
+    def __init__(self, rate):
+        """ Initializer
+
+        :param rate: maximum rate in bytes per second, 0 - unlimited
+        """
+        self.lock = Lock()
+        self.rate = rate
+        self.allowance = rate
+        self.last = time.monotonic()
+
+    def consume(self, size):
+        """ Take the bytes from the bucket. Sleep if the rate was exceeded.
+
+        :param size: number of bytes
+        """
+        if not self.rate:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.rate, self.allowance + (now - self.last) * self.rate)
+            self.last = now
+            self.allowance -= size
+            delay = -self.allowance / self.rate if self.allowance < 0 else 0
+
+        if delay > 0:
+            time.sleep(delay)
+
+class DownloadManager(object):
+    """ Downloads files in the worker threads. The number of simultaneous downloads
+    and the total download rate are limited. The queue is saved to disk and the partial files
+    are kept, so the downloads are resumed using HTTP Range requests after restart or network failure.
+    """
+
+    def __init__(self, folder, threads=DOWNLOAD_THREADS, rate=0):
+        """ Initializer
+
+        :param folder: folder for the download queue file
+        :param threads: maximum number of simultaneous downloads
+        :param rate: maximum total download rate in KB per second, 0 - unlimited
+        """
+        self.lock = RLock()
+        self.path = os.path.join(folder, DOWNLOADS_FILENAME)
+        self.threads = max(threads, 1)
+        self.rate_limiter = RateLimiter(rate * 1024)
+        self.queue = Queue()
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        self.progress = {}
+        self.active = set()
+        self.progress_listeners = []
+        self.finish_listeners = []
+        self.started = False
+        self.jobs = self.load_jobs()
+
+    def load_jobs(self):
+        """ Load download queue from disk
+
+        :return: list of download jobs
+        """
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except:
+            return []
+
+    def save_jobs(self):
+        """ Save download queue to disk """
+
+        with self.lock:
+            try:
+                if not self.jobs:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                    return
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self.jobs, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logging.debug(e)
+
+    def get_job(self, url):
+        """ Get download job
+
+        :param url: file URL
+
+        :return: job dictionary or None
+        """
+        with self.lock:
+            for job in self.jobs:
+                if job[URL] == url:
+                    return job
+            return None
+
+    def get_jobs(self):
+        """ Get all pending jobs
+
+        :return: list of job dictionaries
+        """
+        with self.lock:
+            return list(self.jobs)
+
+    def start(self):
+        """ Start worker threads and resume the saved downloads """
+
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+            for _ in range(self.threads):
+                Thread(target=self.run, name="download", daemon=True).start()
+            for job in self.jobs:
+                self.queue.put(job[URL])
+
+    def add(self, url, filename, data=None):
+        """ Add file to the download queue
+
+        :param url: file URL
+        :param filename: destination file
+        :param data: dictionary passed to the listeners
+        """
+        with self.lock:
+            if self.get_job(url) != None:
+                return
+            self.jobs.append({URL: url, FILE: filename, DATA: data or {}, ATTEMPTS: 0})
+            self.save_jobs()
+            if self.started:
+                self.queue.put(url)
+
+    def cancel(self, url):
+        """ Remove file from the download queue and delete partial file
+
+        :param url: file URL
+        """
+        with self.lock:
+            job = self.get_job(url)
+            if job == None:
+                return
+            self.jobs.remove(job)
+            self.progress.pop(url, None)
+            self.save_jobs()
+
+        try:
+            os.remove(job[FILE] + PART_EXTENSION)
+        except:
+            pass
+
+    def run(self):
+        """ Worker thread method """
+
+        while True:
+            url = self.queue.get()
+            with self.lock:
+                job = self.get_job(url)
+                if job == None or url in self.active:
+                    continue
+                self.active.add(url)
+
+            success = self.download(job)
+
+            with self.lock:
+                self.active.discard(url)
+
+            if success:
+                with self.lock:
+                    if job in self.jobs:
+                        self.jobs.remove(job)
+                    self.progress.pop(url, None)
+                    self.save_jobs()
+                for listener in self.finish_listeners:
+                    try:
+                        listener(url, job[FILE], job[DATA])
+                    except Exception as e:
+                        logging.debug(e)
+            elif self.get_job(url) != None:
+                with self.lock:
+                    delay = RETRY_DELAYS[min(job[ATTEMPTS], len(RETRY_DELAYS) - 1)]
+                    job[ATTEMPTS] += 1
+                    self.save_jobs()
+                logging.debug(f"""Download of {url} failed, retry in {delay} seconds""")
+                t = Timer(delay, self.queue.put, [url])
+                t.daemon = True
+                t.start()
+
+    def download(self, job):
+        """ Download file. Continue partial download if server supports Range requests.
+
+        :param job: download job
+
+        :return: True - file downloaded, False - download failed or was cancelled
+        """
+        url = job[URL]
+        part = job[FILE] + PART_EXTENSION
+        downloaded = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {"Range": f"""bytes={downloaded}-"""} if downloaded else {}
+
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
+                if r.status_code == 416 and downloaded:
+                    os.replace(part, job[FILE])
+                    return True
+                elif r.status_code == 206:
+                    mode = "ab"
+                    total = self.get_total_size(r, downloaded)
+                elif r.status_code == 200:
+                    mode = "wb"
+                    downloaded = 0
+                    total = int(r.headers.get("Content-Length", 0))
+                else:
+                    logging.debug(f"""Download of {url} failed, status {r.status_code}""")
+                    return False
+
+                last_notification = 0
+                with open(part, mode) as f:
+                    for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                        if not chunk:
+                            continue
+                        f.write(chunk)
+                        downloaded += len(chunk)
+                        self.rate_limiter.consume(len(chunk))
+
+                        if self.get_job(url) == None:
+                            return False
+
+                        now = time.monotonic()
+                        if now - last_notification >= PROGRESS_PERIOD:
+                            last_notification = now
+                            self.notify_progress_listeners(url, downloaded, total)
+
+            self.notify_progress_listeners(url, downloaded, total)
+            os.replace(part, job[FILE])
+            return True
+        except Exception as e:
+            logging.debug(e)
+            return False
+
+    def get_total_size(self, response, downloaded):
+        """ Get the full file size from the partial content response
+
+        :param response: HTTP response
+        :param downloaded: size of the partial file
+
+        :return: file size or 0 if unknown
+        """
+        content_range = response.headers.get("Content-Range", "")
+        try:
+            return int(content_range.split("/")[-1])
+        except:
+            return downloaded + int(response.headers.get("Content-Length", 0))
+
+    def get_progress(self, url):
+        """ Get download progress
+
+        :param url: file URL
+
+        :return: tuple (downloaded bytes, total bytes) or None
+        """
+        with self.lock:
+            return self.progress.get(url, None)
+
+    def get_status(self):
+        """ Get status of all pending downloads
+
+        :return: list of dictionaries with URL, file, attempts, downloaded and total bytes
+        """
+        with self.lock:
+            status = []
+            for job in self.jobs:
+                downloaded, total = self.progress.get(job[URL], (0, 0))
+                status.append({
+                    URL: job[URL],
+                    FILE: job[FILE],
+                    ATTEMPTS: job[ATTEMPTS],
+                    "downloaded": downloaded,
+                    "total": total
+                })
+            return status
+
+    def add_progress_listener(self, listener):
+        """ Add progress listener
+
+        :param listener: function with parameters url, downloaded bytes, total bytes
+        """
+        if listener not in self.progress_listeners:
+            self.progress_listeners.append(listener)
+
+    def notify_progress_listeners(self, url, downloaded, total):
+        """ Notify progress listeners
+
+        :param url: file URL
+        :param downloaded: downloaded bytes
+        :param total: file size, 0 if unknown
+        """
+        with self.lock:
+            self.progress[url] = (downloaded, total)
+
+        for listener in self.progress_listeners:
+            try:
+                listener(url, downloaded, total)
+            except Exception as e:
+                logging.debug(e)
+
+    def add_finish_listener(self, listener):
+        """ Add download finished listener
+
+        :param listener: function with parameters url, filename, data
+        """
+        if listener not in self.finish_listeners:
+            self.finish_listeners.append(listener)
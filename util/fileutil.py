@@ -16,17 +16,24 @@
 # along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
 
 import os, string
+import sys
 import platform
 import re
 import codecs
 import logging
+import tempfile
+import shutil
 
 from operator import attrgetter
 from re import compile
+from timeit import default_timer as timer
+from concurrent.futures import ThreadPoolExecutor
 from ui.state import State
 from os.path import expanduser
+from util.cache import LruCache
 from util.config import AUDIO_FILE_EXTENSIONS, LOG_FILENAME, PLAYLIST_FILE_EXTENSIONS, IMAGE_FILE_EXTENSIONS, CURRENT_FOLDER, \
-    AUDIO, MUSIC_FOLDER, COVER_ART_FOLDERS, CLIENT_NAME, VLC, FILE_PLAYBACK, SORT_BY_TYPE, ENABLE_FOLDER_IMAGES, ENABLE_IMAGE_FILE_ICON
+    AUDIO, MUSIC_FOLDER, COVER_ART_FOLDERS, CLIENT_NAME, VLC, FILE_PLAYBACK, SORT_BY_TYPE, ENABLE_FOLDER_IMAGES, ENABLE_IMAGE_FILE_ICON, \
+    FOLDER_IMAGES
 
 FOLDER = "folder"
 FOLDER_WITH_ICON = "folder with icon"
@@ -41,6 +48,130 @@ WINDOWS_DISK_SUFFIX = ":\\"
 HIDDEN_FOLDER_PREFIXES = [".", "$", "System Volume Information"]
 RE_HIDDEN_FOLDER_PREFIXES = "|".join(re.escape(p) for p in HIDDEN_FOLDER_PREFIXES)
 
+FOLDER_CONTENT_CACHE_SIZE = 8 * 1024 * 1024
+FOLDER_IMAGE_CACHE_SIZE = 2 * 1024 * 1024
+FOLDER_IMAGE_WORKERS = 8
+FOLDER_ENTRY_SIZE = 128
+FOLDER_NOT_ACCESSIBLE = False
+BENCHMARK_FOLDERS = 5000
+BENCHMARK_FOLDER_IMAGE = "folder.jpg"
+BENCHMARK_FILES = ["01.mp3", "02.mp3"]
+
+class FolderScanner(object):
+    """ Lists folder content using os.scandir. 
+    Folder content and folder images are cached, the cache entries are validated by the folder modification time.
+    """
+
+    def __init__(self, folder_image_names):
+        """ Initializer
+
+        :param folder_image_names: lower case names of the folder image files
+        """
+        self.folder_image_names = folder_image_names or []
+        self.content_cache = LruCache("folder_content", FOLDER_CONTENT_CACHE_SIZE, lambda v: FOLDER_ENTRY_SIZE * (len(v[1]) + 1))
+        self.image_cache = LruCache("folder_image", FOLDER_IMAGE_CACHE_SIZE, lambda v: FOLDER_ENTRY_SIZE)
+        self.executor = ThreadPoolExecutor(max_workers=FOLDER_IMAGE_WORKERS, thread_name_prefix="folder_image")
+
+    def get_entries(self, folder):
+        """ Get folder entries
+
+        :param folder: folder path
+
+        :return: list of tuples (name, real path, is folder, is file) or None if folder cannot be read
+        """
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return None
+
+        cached = self.content_cache.get(folder)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        real_folder = os.path.realpath(folder)
+        entries = []
+        try:
+            with os.scandir(folder) as it:
+                for e in it:
+                    try:
+                        is_folder = e.is_dir()
+                        is_file = not is_folder and e.is_file()
+                        if e.is_symlink():
+                            path = os.path.realpath(e.path)
+                        else:
+                            path = os.path.join(real_folder, e.name)
+                    except OSError:
+                        continue
+                    entries.append((e.name, path, is_folder, is_file))
+        except OSError as e:
+            logging.debug(e)
+            return None
+
+        self.content_cache[folder] = (mtime, entries)
+        return entries
+
+    def get_folder_images(self, folders):
+        """ Find images for the list of folders. 
+        Images of the folders which are not in the cache are searched in parallel.
+
+        :param folders: list of folder paths
+
+        :return: dictionary where key - folder, value - image path, None if folder doesn't have image 
+            or FOLDER_NOT_ACCESSIBLE if folder cannot be read
+        """
+        images = {}
+        missing = []
+
+        for folder in folders:
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+            except OSError:
+                images[folder] = FOLDER_NOT_ACCESSIBLE
+                continue
+
+            cached = self.image_cache.get(folder)
+            if cached and cached[0] == mtime:
+                images[folder] = cached[1]
+            else:
+                missing.append((folder, mtime))
+
+        if missing:
+            chunks = [missing[i::FOLDER_IMAGE_WORKERS] for i in range(FOLDER_IMAGE_WORKERS)]
+            for chunk, found in zip(chunks, self.executor.map(self.find_folder_images, chunks)):
+                for (folder, mtime), image in zip(chunk, found):
+                    self.image_cache[folder] = (mtime, image)
+                    images[folder] = image
+
+        return images
+
+    def find_folder_images(self, folders):
+        """ Find image files in the folders. Runs in the worker thread.
+
+        :param folders: list of tuples (folder path, modification time)
+
+        :return: list of image paths
+        """
+        return [self.find_folder_image(f[0]) for f in folders]
+
+    def find_folder_image(self, folder):
+        """ Find image file in the folder
+
+        :param folder: folder path
+
+        :return: real path of the image file, None if folder doesn't have image 
+            or FOLDER_NOT_ACCESSIBLE if folder cannot be read
+        """
+        try:
+            with os.scandir(folder) as it:
+                for e in it:
+                    if e.name.lower() in self.folder_image_names:
+                        return os.path.realpath(e.path)
+        except PermissionError:
+            return FOLDER_NOT_ACCESSIBLE
+        except OSError as e:
+            logging.debug(e)
+        return None
+
 class FileUtil(object):
     """ Utility class containing methods necessary for file playback """
     
@@ -64,6 +195,7 @@ class FileUtil(object):
             
         self.current_folder = self.config[FILE_PLAYBACK][CURRENT_FOLDER] or self.USER_HOME
         self.cre = compile(r'(\d+)') # compiled regular expression
+        self.folder_scanner = FolderScanner(self.config[FOLDER_IMAGES])
     
     def get_windows_disks(self):
         """ Return disks available on Windows machine
@@ -167,9 +299,17 @@ class FileUtil(object):
                 files.append(state)
             return files
         
-        for f in os.listdir(folder_name):
+        entries = self.folder_scanner.get_entries(folder_name)
+        if entries == None:
+            return files
+
+        folder_images = {}
+        if self.config[ENABLE_FOLDER_IMAGES]:
+            folders = [e[1] for e in entries if e[2] and not re.match(RE_HIDDEN_FOLDER_PREFIXES, e[0])]
+            folder_images = self.folder_scanner.get_folder_images(folders)
+
+        for f, real_path, is_folder, is_file in entries:
             file_path = os.path.join(folder_name, f)
-            real_path = os.path.realpath(file_path)
             
             state = State()
             state.folder = folder_name
@@ -177,17 +317,15 @@ class FileUtil(object):
             state.file_name = f
             state.url = real_path
             
-            if os.path.isdir(file_path) and not re.match(RE_HIDDEN_FOLDER_PREFIXES, f): # folder
-                try:
-                    if self.config[ENABLE_FOLDER_IMAGES]:
-                        folder_image_path = self.util.get_folder_image_path(real_path)
-                        if folder_image_path:
-                            state.file_type = FOLDER_WITH_ICON
-                            state.file_image_path = folder_image_path
-                    files.append(state)
-                except PermissionError:
-                    pass
-            elif os.path.isfile(file_path) and not f.startswith("."): # file
+            if is_folder and not re.match(RE_HIDDEN_FOLDER_PREFIXES, f): # folder
+                folder_image_path = folder_images.get(real_path, None)
+                if folder_image_path == FOLDER_NOT_ACCESSIBLE:
+                    continue
+                if folder_image_path:
+                    state.file_type = FOLDER_WITH_ICON
+                    state.file_image_path = folder_image_path
+                files.append(state)
+            elif is_file and not f.startswith("."): # file
                 if self.is_audio_file(f):
                     state.file_type = FILE_AUDIO
                     if load_images and self.image_util.get_image_from_audio_file(file_path):
@@ -314,3 +452,107 @@ class FileUtil(object):
                 logging.error(e)
 
         raise Exception()
+
+def create_benchmark_tree(base_folder, folders):
+    """ Create synthetic folder tree for benchmark
+
+    :param base_folder: base folder
+    :param folders: number of subfolders
+    """
+    for n in range(folders):
+        folder = os.path.join(base_folder, f"""album {n:05d}""")
+        os.makedirs(folder, exist_ok=True)
+        names = list(BENCHMARK_FILES)
+        if n % 2 == 0:
+            names.append(BENCHMARK_FOLDER_IMAGE)
+        for name in names:
+            open(os.path.join(folder, name), "w").close()
+
+def list_folder_with_listdir(folder, folder_image_names):
+    """ Folder listing using os.listdir and separate stat calls for every entry. Used as benchmark baseline.
+
+    :param folder: folder path
+    :param folder_image_names: lower case names of the folder image files
+
+    :return: number of folders with images
+    """
+    n = 0
+    for f in os.listdir(folder):
+        file_path = os.path.join(folder, f)
+        real_path = os.path.realpath(file_path)
+        if os.path.isdir(file_path):
+            for i in os.listdir(real_path):
+                if i.lower() in folder_image_names:
+                    os.path.realpath(os.path.join(real_path, i))
+                    n += 1
+                    break
+        elif os.path.isfile(file_path):
+            pass
+    return n
+
+def list_folder_with_scanner(scanner, folder):
+    """ Folder listing using folder scanner
+
+    :param scanner: folder scanner
+    :param folder: folder path
+
+    :return: number of folders with images
+    """
+    entries = scanner.get_entries(folder)
+    images = scanner.get_folder_images([e[1] for e in entries if e[2]])
+    return len([i for i in images.values() if i])
+
+def benchmark(base_folder, folders):
+    """ Compare folder listing methods
+
+    :param base_folder: folder with synthetic tree, temporary folder is used if not defined
+    :param folders: number of subfolders in synthetic tree
+    """
+    temporary = base_folder == None
+    if temporary:
+        base_folder = tempfile.mkdtemp()
+
+    try:
+        if not os.listdir(base_folder):
+            create_benchmark_tree(base_folder, folders)
+
+        names = [BENCHMARK_FOLDER_IMAGE]
+        start = timer()
+        n = list_folder_with_listdir(base_folder, names)
+        logging.debug(f"""listdir: {(timer() - start) * 1000:.1f} ms, folders with images: {n}""")
+
+        scanner = FolderScanner(names)
+        start = timer()
+        n = list_folder_with_scanner(scanner, base_folder)
+        logging.debug(f"""scandir: {(timer() - start) * 1000:.1f} ms, folders with images: {n}""")
+
+        start = timer()
+        n = list_folder_with_scanner(scanner, base_folder)
+        logging.debug(f"""scandir cached: {(timer() - start) * 1000:.1f} ms, folders with images: {n}""")
+    finally:
+        if temporary:
+            shutil.rmtree(base_folder, ignore_errors=True)
+
+def main():
+    import argparse
+    log_handler = logging.StreamHandler(sys.stdout)
+    logging.basicConfig(
+        level=logging.NOTSET,
+        format='[%(asctime)s] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s',
+        handlers=[log_handler]
+    )
+    usage = """python -m util.fileutil benchmark [args]"""
+    parser = argparse.ArgumentParser(usage=usage)
+    subparsers = parser.add_subparsers(dest="command")
+
+    p = subparsers.add_parser("benchmark", help="time folder listing on synthetic folder tree")
+    p.add_argument("-d", help="folder for synthetic tree, temporary folder is used if not defined")
+    p.add_argument("-n", help="number of subfolders in synthetic tree", type=int, default=BENCHMARK_FOLDERS)
+
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark(args.d, args.n)
+
+if __name__ == '__main__':
+    main()
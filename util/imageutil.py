@@ -21,6 +21,7 @@ import base64
 import logging
 import codecs
 import random
+import hashlib
 
 from util.config import SHOW_EMBEDDED_IMAGES, USAGE, USE_WEB, COLORS, COLOR_DARK_LIGHT, COLOR_MUTE, IMAGE_SIZE, \
     SCREEN_INFO, WIDTH, HEIGHT, BACKGROUND, BLUR_RADIUS, OVERLAY_COLOR, OVERLAY_OPACITY, BACKGROUND_DEFINITIONS, \
@@ -32,6 +33,9 @@ from PIL.ImageOps import grayscale
 from io import BytesIO
 from svg import Parser, Rasterizer
 from util.fileutil import FOLDER, FOLDER_WITH_ICON, FILE_AUDIO, FILE_PLAYLIST, FILE_IMAGE, FILE_CD_DRIVE
+from util.cache import LruCache, DiskCache
+from util.thumbnailloader import ThumbnailLoader
+from util.thumbnailstore import ThumbnailStore
 from urllib import request
 from urllib.request import urlopen
 from mutagen.id3 import ID3
@@ -61,6 +65,23 @@ EXT_FLAC = ".flac"
 EXT_MP4 = ".mp4"
 EXT_M4A = ".m4a"
 
+IMAGE_CACHE_SIZE = 32 * 1024 * 1024
+IMAGE_CACHE_BASE64_SIZE = 8 * 1024 * 1024
+SVG_CACHE_SIZE = 1024 * 1024
+BACKGROUND_CACHE_SIZE = 16 * 1024 * 1024
+ALBUM_ART_URL_CACHE_SIZE = 64 * 1024
+ICON_DISK_CACHE_FOLDER = os.path.join("cache", "icons")
+ICON_DISK_CACHE_VERSION = 1
+ICON_DISK_CACHE_SIZE = 32 * 1024 * 1024
+WEB_IMAGE_CACHE_SIZE = 16 * 1024 * 1024
+WEB_IMAGE_KEY_CACHE_SIZE = 256 * 1024
+WEB_IMAGE_URL_PREFIX = "/img/"
+THUMBNAIL_CACHE_SIZE = 8 * 1024 * 1024
+CONTENT_TYPE_PNG = "image/png"
+CONTENT_TYPE_JPEG = "image/jpeg"
+CONTENT_TYPE_SVG = "image/svg+xml"
+CONTENT_TYPE_EXTENSIONS = {CONTENT_TYPE_PNG: EXT_PNG, CONTENT_TYPE_JPEG: EXT_JPG, CONTENT_TYPE_SVG: EXT_SVG}
+
 MONOCHROME = "monochrome"
 BI_COLOR = "bi-color"
 GRADIENT = "gradient"
@@ -89,15 +110,42 @@ class ImageUtil(object):
         self.COLOR_OFF = self.color_to_hex(self.config[COLORS][COLOR_DARK_LIGHT])
         self.COLOR_MUTE = self.color_to_hex(self.config[COLORS][COLOR_MUTE])        
 
-        self.image_cache = {}
-        self.image_cache_base64 = {}
-        self.svg_cache = {}
-        self.background_cache = {}
-        self.album_art_url_cache = {}
+        self.image_cache = LruCache("image", IMAGE_CACHE_SIZE)
+        self.image_cache_base64 = LruCache("image_base64", IMAGE_CACHE_BASE64_SIZE)
+        self.svg_cache = LruCache("svg", SVG_CACHE_SIZE)
+        self.background_cache = LruCache("background", BACKGROUND_CACHE_SIZE)
+        self.album_art_url_cache = LruCache("album_art_url", ALBUM_ART_URL_CACHE_SIZE)
+        self.web_image_cache = LruCache("web_image", WEB_IMAGE_CACHE_SIZE)
+        self.web_image_key_cache = LruCache("web_image_key", WEB_IMAGE_KEY_CACHE_SIZE)
+        self.thumbnail_cache = LruCache("thumbnail", THUMBNAIL_CACHE_SIZE)
+        compositor = getattr(util, "compositor", None)
+        self.thumbnail_loader = ThumbnailLoader(listener=compositor.request_frame if compositor else None)
+        self.thumbnail_store = ThumbnailStore()
+        self.file_icon_atlas = {}
+        self.file_icon_atlas_theme = None
+        self.icon_disk_cache = DiskCache("icon_disk", ICON_DISK_CACHE_FOLDER, ICON_DISK_CACHE_VERSION, ICON_DISK_CACHE_SIZE)
         self.FILE_EXTENSIONS_EMBEDDED_IMAGES = None
         if self.config[SHOW_EMBEDDED_IMAGES]:
             self.FILE_EXTENSIONS_EMBEDDED_IMAGES = ["." + s for s in self.config[SHOW_EMBEDDED_IMAGES]]
 
+    def get_cache_statistics(self):
+        """ Get statistics of all image caches
+
+        :return: list of dictionaries with cache statistics
+        """
+        caches = [self.image_cache, self.image_cache_base64, self.svg_cache, self.background_cache, self.album_art_url_cache,
+            self.web_image_cache, self.web_image_key_cache, self.thumbnail_cache, self.icon_disk_cache, self.thumbnail_store]
+        return [c.get_statistics() for c in caches]
+
+    def is_icon(self, path):
+        """ Check if the image is the icon from the icons folder. Icons are never evicted from the caches.
+
+        :param path: image path
+
+        :return: True - icon, False - other image
+        """
+        return path.replace('\\', '/').startswith(FOLDER_ICONS + "/")
+
     def load_image(self, path, base64=False, bounding_box=None):
         """ Load and return image
         
@@ -147,6 +195,125 @@ class ImageUtil(object):
                 self.image_cache_base64[key] = img
                 return img
 
+    def set_base64_image(self, key, img):
+        """ Put base64 encoded image into the cache. The web image URL of the key is recalculated
+        on the next request as the image content can be different.
+
+        :param key: cache key
+        :param img: base64 encoded image
+        """
+        self.image_cache_base64[key] = img
+        self.web_image_key_cache.remove(key)
+
+    def get_web_image_url(self, path):
+        """ Get content-addressed URL of the image for web UI. 
+        The image is loaded and hashed only once, then it's served by the hash from the web image cache.
+
+        :param path: image path, SVG cache key or base64 image cache key
+
+        :return: image URL or None if image cannot be loaded
+        """
+        try:
+            url = self.web_image_key_cache[path]
+            if url[len(WEB_IMAGE_URL_PREFIX) : url.rfind(".")] in self.web_image_cache:
+                return url
+        except KeyError:
+            pass
+
+        data = None
+        try:
+            img = self.image_cache_base64.get(path)
+            if img != None:
+                data = base64.b64decode(img)
+            elif EXT_SVG in path:
+                data = self.svg_cache[path].encode()
+            else:
+                p = path.lower()
+                if p.endswith(EXT_MP3) or p.endswith(EXT_FLAC) or p.endswith(EXT_MP4) or p.endswith(EXT_M4A):
+                    image_buffer = self.get_image_from_audio_file(path, True)
+                    if image_buffer:
+                        data = image_buffer.read()
+                if data == None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+        except Exception as e:
+            logging.debug(e)
+            return None
+
+        url = self.put_web_image(hashlib.sha1(data).hexdigest(), data)
+        self.web_image_key_cache[path] = url
+        return url
+
+    def get_web_surface_url(self, surface):
+        """ Get content-addressed URL of the generated Pygame Surface for web UI.
+        The hash is calculated from the surface pixels, the surface is encoded to PNG only once.
+
+        :param surface: Pygame Surface object
+
+        :return: image URL or None if surface cannot be encoded
+        """
+        if surface == None:
+            return None
+
+        try:
+            d = pygame.image.tostring(surface, "RGBA", False)
+        except Exception as e:
+            logging.debug(e)
+            return None
+
+        h = hashlib.sha1(str(surface.get_size()).encode())
+        h.update(d)
+        sha = h.hexdigest()
+        if sha in self.web_image_cache:
+            return WEB_IMAGE_URL_PREFIX + sha + EXT_PNG
+
+        try:
+            img = Image.frombytes("RGBA", surface.get_size(), d)
+            buffer = BytesIO()
+            img.save(buffer, "PNG")
+        except Exception as e:
+            logging.debug(e)
+            return None
+
+        return self.put_web_image(sha, buffer.getvalue())
+
+    def put_web_image(self, sha, data):
+        """ Put encoded image into the web image cache
+
+        :param sha: image hash
+        :param data: encoded image bytes
+
+        :return: image URL
+        """
+        content_type = self.get_content_type(data)
+        self.web_image_cache[sha] = (content_type, data)
+        return WEB_IMAGE_URL_PREFIX + sha + CONTENT_TYPE_EXTENSIONS[content_type]
+
+    def get_web_image(self, sha):
+        """ Get encoded image from the web image cache
+
+        :param sha: image hash
+
+        :return: tuple (content type, image bytes) or None if image is not in the cache
+        """
+        return self.web_image_cache.get(sha)
+
+    def get_content_type(self, data):
+        """ Detect image content type by the image signature
+
+        :param data: encoded image bytes
+
+        :return: content type
+        """
+        if data.startswith(b"\xff\xd8"):
+            return CONTENT_TYPE_JPEG
+        elif data.startswith(b"\x89PNG"):
+            return CONTENT_TYPE_PNG
+        elif b"<svg" in data[:1024]:
+            return CONTENT_TYPE_SVG
+        else:
+            return CONTENT_TYPE_PNG
+
     def load_pygame_image(self, path, bounding_box=None, use_cache=True):
         """ Load image. 
         First, check if image is in the cache.
@@ -184,6 +351,8 @@ class ImageUtil(object):
                 img = self.scale_image(image, scale_ratio)
                 p = path + str(bounding_box[0])
             if use_cache:
+                if self.is_icon(path):
+                    self.image_cache.pin(p)
                 self.image_cache[p] = img
             return (path, img)
         else:
@@ -577,16 +746,22 @@ class ImageUtil(object):
             else:
                 s = s.replace(SVG_DEFAULT_COLOR_1, color_1)
         
+        if self.config[USAGE][USE_WEB]:
+            self.svg_cache.pin(cache_path)
+            self.svg_cache[cache_path] = s
+
+        disk_key = self.get_disk_cache_key(s, bounding_box, scale)
+        image = self.load_rendered_icon(cache_path, disk_key)
+        if image:
+            return image
+
         try:
             bitmap_image = Parser.parse(s)
         except:
             logging.debug("Problem parsing file %s", path)
             return None
         
-        if self.config[USAGE][USE_WEB]:
-            self.svg_cache[cache_path] = s
-        
-        return self.scale_svg_image(cache_path, bitmap_image, bounding_box, scale)
+        return self.scale_svg_image(cache_path, bitmap_image, bounding_box, scale, disk_key)
     
     def load_multi_color_svg_icon(self, filename, bounding_box=None, scale=1.0):
         """ Load SVG image
@@ -608,27 +783,72 @@ class ImageUtil(object):
             pass
         
         try:
-            svg_image = Parser.parse_file(path)
+            s = codecs.open(path, "r").read()
         except:
-            logging.debug("Problem parsing file %s", path)
+            logging.debug("Problem reading file %s", path)
             return None
 
         if self.config[USAGE][USE_WEB]:
-            try:
-                self.svg_cache[cache_path]
-            except KeyError:
-                t = cache_path.replace('\\','/')
-                self.svg_cache[t] = codecs.open(path, "r").read()
+            t = cache_path.replace('\\','/')
+            if t not in self.svg_cache:
+                self.svg_cache.pin(t)
+                self.svg_cache[t] = s
+
+        disk_key = self.get_disk_cache_key(s, bounding_box, scale)
+        image = self.load_rendered_icon(cache_path, disk_key)
+        if image:
+            return image
+
+        try:
+            svg_image = Parser.parse(s)
+        except:
+            logging.debug("Problem parsing file %s", path)
+            return None
         
-        return self.scale_svg_image(cache_path, svg_image, bounding_box, scale)
+        return self.scale_svg_image(cache_path, svg_image, bounding_box, scale, disk_key)
+
+    def get_disk_cache_key(self, svg, bounding_box, scale):
+        """ Get the key of the rendered icon in the disk cache. 
+        The SVG text already contains icon colors and gradient.
+
+        :param svg: SVG text
+        :param bounding_box: image bounding box
+        :param scale: scale factor
 
-    def scale_svg_image(self, cache_path, svg_image, bounding_box=None, scale=1.0):
+        :return: cache key
+        """
+        if bounding_box == None:
+            bb = "None"
+        else:
+            bb = f"""{bounding_box.w}x{bounding_box.h}"""
+        return hashlib.sha1(f"""{svg}_{bb}_{scale}""".encode()).hexdigest()
+
+    def load_rendered_icon(self, cache_path, disk_key):
+        """ Load icon rendered by the previous runs from the disk cache
+
+        :param cache_path: memory cache key
+        :param disk_key: disk cache key
+
+        :return: tuple (cache path, image) or None if icon is not in the disk cache
+        """
+        r = self.icon_disk_cache.get(disk_key)
+        if not r:
+            return None
+
+        w, h, buff = r
+        image = pygame.image.frombuffer(buff, (w, h), 'RGBA')
+        self.image_cache.pin(cache_path)
+        self.image_cache[cache_path] = image
+        return (cache_path, image)
+
+    def scale_svg_image(self, cache_path, svg_image, bounding_box=None, scale=1.0, disk_key=None):
         """ Scale SVG image
         
         :param cache_path: cache key for image
         :param svg_image: SVG image
         :param bounding_box: image bounding box
         :param scale: scale factor
+        :param disk_key: disk cache key, the image is saved in the disk cache if provided
         
         :return: scaled bitmap image
         """
@@ -651,7 +871,11 @@ class ImageUtil(object):
         r = Rasterizer()        
         buff = r.rasterize(svg_image, w_final, h_final, scale_factor)    
         image = pygame.image.frombuffer(buff, (w_final, h_final), 'RGBA')
+
+        if disk_key:
+            self.icon_disk_cache.put(disk_key, w_final, h_final, buff)
         
+        self.image_cache.pin(cache_path)
         self.image_cache[cache_path] = image
         
         return (cache_path, image)
@@ -684,23 +908,6 @@ class ImageUtil(object):
             img_scaled = self.scale_image(img[1], scale_ratio)
             return (img[0], img_scaled)    
 
-    def load_scaled_images(self, folder):
-        """ Load all images from folder, scale to fit screen
-        
-        :param folder: image folder
-        
-        :return: list of images
-        """
-        images = []
-
-        for f in os.listdir(folder):
-            path = os.path.join(folder, f)
-            img = self.load_image(path)
-            if img == None: continue
-            images.append(self.get_scaled_image(img))
-            
-        return images
-
     def load_scaled_image(self, path):
         img = self.load_pygame_image(path, bounding_box=None, use_cache=False)
         if img == None:
@@ -708,6 +915,29 @@ class ImageUtil(object):
         else:
             return self.get_scaled_image(img)
 
+    def load_slide(self, path):
+        """ Decode image and scale it to fit screen. JPEG images are decoded
+        in draft mode directly at the reduced size which is close to the screen size.
+
+        :param path: image path
+
+        :return: tuple (path, image) or None if image cannot be loaded
+        """
+        w = self.config[SCREEN_INFO][WIDTH]
+        h = self.config[SCREEN_INFO][HEIGHT]
+
+        try:
+            img = Image.open(path)
+            img.draft("RGB", (w, h))
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            surface = pygame.image.fromstring(img.tobytes(), img.size, img.mode)
+        except Exception as e:
+            logging.debug(e)
+            return None
+
+        return self.get_scaled_image((path, surface))
+
     def load_images_from_folder(self, folder):
         """ Load all images from folder
         
@@ -764,7 +994,7 @@ class ImageUtil(object):
  
         return img
 
-    def get_file_icon(self, file_type, file_image_path=None, icon_bb=None, scale_factor=0.6, url=None, show_label=True):
+    def get_file_icon(self, file_type, file_image_path=None, icon_bb=None, scale_factor=0.6, url=None, show_label=True, placeholder=False):
         """ Load image representing file. Six types of icons supported:
         1. Folder icon
         2. Audio file icon
@@ -779,27 +1009,14 @@ class ImageUtil(object):
         :param scale_factor: scale factor
         :param url: file name
         :param show_label: True - take label into account
+        :param placeholder: True - return generic icon without loading the image, False - load the image
         
         :return: image representing file
         """
-        if icon_bb:
-            bb = pygame.Rect(0, 0, icon_bb[0], icon_bb[1])
-        else:
-            bb = None
-        
-        icon_folder = self.load_icon_main(ICON_FOLDER, bb, scale_factor)
-        icon_file_audio = self.load_icon_main(ICON_FILE_AUDIO, bb, scale_factor)
-        icon_file_playlist = self.load_icon_main(ICON_FILE_PLAYLIST, bb, scale_factor)
-        icon_cd_drive = self.load_icon_main(ICON_CD_DRIVE, bb, scale_factor)
-        icon_image_file = self.load_icon_main(ICON_IMAGE_FILE, bb, scale_factor)
+        if placeholder and file_type == FOLDER_WITH_ICON:
+            file_type = FOLDER
 
-        icon_size = self.config[ICON_SIZE]
-        if icon_bb:
-            w = (icon_bb[0] / 100) * icon_size
-            h = (icon_bb[1] / 100) * icon_size
-            icon_box = (w, h)
-        else:
-            icon_box = (icon_size, icon_size)
+        atlas = self.get_file_icon_atlas(icon_bb, scale_factor)
 
         image_size = self.config[IMAGE_SIZE]
         if icon_bb:
@@ -810,45 +1027,157 @@ class ImageUtil(object):
                 h = (icon_bb[1] / 100) * self.config[IMAGE_SIZE_WITHOUT_LABEL]
                 image_box = (w, h)
 
-        if file_type == FOLDER:
-            ratio = self.get_scale_ratio(icon_box, icon_folder[1])
-            scaled_img = self.scale_image(icon_folder, ratio)
-            return (icon_folder[0], scaled_img)
+        if file_type == FOLDER or file_type == FILE_PLAYLIST or file_type == FILE_CD_DRIVE:
+            return atlas[file_type]
         elif file_type == FILE_AUDIO:
-            if self.config[ENABLE_EMBEDDED_IMAGES]:
-                img = self.get_image_from_audio_file(url)
+            if self.config[ENABLE_EMBEDDED_IMAGES] and not placeholder and self.has_embedded_image_extension(url):
+                scaled_img = self.load_stored_thumbnail(url, image_box, self.get_scaled_audio_file_image)
             else:
-                img = None
+                scaled_img = None
 
-            if img:
-                ratio = self.get_scale_ratio(image_box, img)
-                scaled_img = self.scale_image(img, ratio)
+            if scaled_img:
                 return (url, scaled_img)
             else:
-                ratio = self.get_scale_ratio(icon_box, icon_file_audio[1])
-                scaled_img = self.scale_image(icon_file_audio, ratio)
-                return (icon_file_audio[0], scaled_img)
-        elif file_type == FILE_PLAYLIST:
-            ratio = self.get_scale_ratio(icon_box, icon_file_playlist[1])
-            scaled_img = self.scale_image(icon_file_playlist, ratio)
-            return (icon_file_playlist[0], scaled_img)
-        elif file_type == FILE_CD_DRIVE:
-            return icon_cd_drive
+                return atlas[FILE_AUDIO]
         elif file_type == FOLDER_WITH_ICON:
-            img = self.load_image(file_image_path, bounding_box=image_box)
+            img = self.load_stored_thumbnail(file_image_path, image_box, self.get_scaled_file_image)
             if img:
-                return img
+                return (file_image_path, img)
             else:
-                return icon_folder
+                return atlas[FOLDER_WITH_ICON]
         elif file_type == FILE_IMAGE:
-            if file_image_path:
-                img = self.load_image(file_image_path, bounding_box=image_box)
+            if file_image_path and not placeholder:
+                img = self.load_stored_thumbnail(file_image_path, image_box, self.get_scaled_file_image)
                 if img:
-                    return img
+                    return (file_image_path, img)
                 else:
-                    return icon_image_file
+                    return atlas[FILE_IMAGE]
             else:
-                return icon_image_file
+                return atlas[FILE_IMAGE]
+
+    def get_file_icon_atlas(self, icon_bb=None, scale_factor=0.6):
+        """ Get generic file icons for the bounding box. 
+        Icons are created once and shared by all file menu buttons.
+        The atlas is recreated when icon theme changes.
+
+        :param icon_bb: image bounding box
+        :param scale_factor: scale factor
+
+        :return: dictionary where key - file type, value - icon
+        """
+        theme = (self.config[ICONS][ICONS_TYPE], self.COLOR_MAIN_1, self.COLOR_MAIN_2, self.config[ICON_SIZE])
+        if theme != self.file_icon_atlas_theme:
+            self.file_icon_atlas = {}
+            self.file_icon_atlas_theme = theme
+
+        if icon_bb:
+            key = (icon_bb[0], icon_bb[1], scale_factor)
+        else:
+            key = (None, None, scale_factor)
+
+        atlas = self.file_icon_atlas.get(key, None)
+        if atlas:
+            return atlas
+
+        if icon_bb:
+            bb = pygame.Rect(0, 0, icon_bb[0], icon_bb[1])
+        else:
+            bb = None
+        
+        icon_folder = self.load_icon_main(ICON_FOLDER, bb, scale_factor)
+        icon_file_audio = self.load_icon_main(ICON_FILE_AUDIO, bb, scale_factor)
+        icon_file_playlist = self.load_icon_main(ICON_FILE_PLAYLIST, bb, scale_factor)
+        icon_cd_drive = self.load_icon_main(ICON_CD_DRIVE, bb, scale_factor)
+        icon_image_file = self.load_icon_main(ICON_IMAGE_FILE, bb, scale_factor)
+
+        icon_size = self.config[ICON_SIZE]
+        if icon_bb:
+            w = (icon_bb[0] / 100) * icon_size
+            h = (icon_bb[1] / 100) * icon_size
+            icon_box = (w, h)
+        else:
+            icon_box = (icon_size, icon_size)
+
+        atlas = {
+            FOLDER: self.get_scaled_icon(icon_folder, icon_box),
+            FILE_AUDIO: self.get_scaled_icon(icon_file_audio, icon_box),
+            FILE_PLAYLIST: self.get_scaled_icon(icon_file_playlist, icon_box),
+            FILE_CD_DRIVE: icon_cd_drive,
+            FOLDER_WITH_ICON: icon_folder,
+            FILE_IMAGE: icon_image_file
+        }
+        self.file_icon_atlas[key] = atlas
+        return atlas
+
+    def get_scaled_icon(self, icon, box):
+        """ Scale icon to fit the box
+
+        :param icon: icon tuple (name, image)
+        :param box: bounding box
+
+        :return: scaled icon tuple
+        """
+        ratio = self.get_scale_ratio(box, icon[1])
+        return (icon[0], self.scale_image(icon, ratio))
+
+    def load_stored_thumbnail(self, path, box, load_function):
+        """ Get thumbnail from the thumbnail store. 
+        If it's not there, load it using provided function and save in the store.
+
+        :param path: file path
+        :param box: thumbnail bounding box
+        :param load_function: function which loads and scales image
+
+        :return: thumbnail or None if file doesn't have image
+        """
+        found, img = self.thumbnail_store.get_thumbnail(path, box)
+        if found:
+            return img
+
+        img = load_function(path, box)
+        self.thumbnail_store.put_thumbnail(path, box, img)
+        return img
+
+    def get_scaled_audio_file_image(self, path, box):
+        """ Load image embedded into audio file and scale it
+
+        :param path: audio file path
+        :param box: bounding box
+
+        :return: scaled image or None if file doesn't have image
+        """
+        img = self.get_image_from_audio_file(path)
+        if not img:
+            return None
+        ratio = self.get_scale_ratio(box, img)
+        return self.scale_image(img, ratio)
+
+    def get_scaled_file_image(self, path, box):
+        """ Load image file and scale it
+
+        :param path: image file path
+        :param box: bounding box
+
+        :return: scaled image or None if image cannot be loaded
+        """
+        img = self.load_image(path, bounding_box=box)
+        if not img:
+            return None
+        return img[1]
+
+    def has_embedded_image_extension(self, path):
+        """ Check that embedded images are enabled for the file extension
+
+        :param path: file path
+
+        :return: True - enabled, False - disabled
+        """
+        if not path or not self.FILE_EXTENSIONS_EMBEDDED_IMAGES:
+            return False
+        ext = os.path.splitext(path)[1].lower()
+        if ext == EXT_M4A:
+            ext = EXT_MP4
+        return ext in self.FILE_EXTENSIONS_EMBEDDED_IMAGES or (ext == EXT_MP4 and EXT_M4A in self.FILE_EXTENSIONS_EMBEDDED_IMAGES)
 
     def get_cd_album_art(self, album, bb):
         """ Return album art image
@@ -971,10 +1300,23 @@ class ImageUtil(object):
             hdrs = {'User-Agent': 'PeppyPlayer + https://github.com/project-owner/Peppy'}
             req = request.Request(url, headers=hdrs)
             stream = urlopen(req).read()
+        except Exception as e:
+            logging.debug(e)
+            return None
+
+        return self.load_image_from_bytes(url, stream)
+
+    def load_image_from_bytes(self, name, data):
+        """ Load image from encoded image bytes
 
-            buf = BytesIO(stream)
-            image = pygame.image.load(buf).convert_alpha()
-            return (url, image)
+        :param name: image name
+        :param data: encoded image bytes
+
+        :return: tuple (name, image) or None if image cannot be decoded
+        """
+        try:
+            image = pygame.image.load(BytesIO(data)).convert_alpha()
+            return (name, image)
         except Exception as e:
             logging.debug(e)
             return None
@@ -1218,15 +1560,18 @@ class ImageUtil(object):
         state.state_off_image = state.icon_base = (GENERATED_IMAGE + state.name + ".off", images[1])
         state.state_on_image = (GENERATED_IMAGE + state.name + ".on", images[0])
 
-    def add_file_icon(self, page, icon_box, icon_box_without_label):
-        """ Set file icons
+    def add_file_icon(self, page, icon_box, icon_box_without_label, owner=None):
+        """ Set file icons. If the owner is provided the thumbnails of audio files, image files 
+        and folders with images are loaded in the background. Generic icons are used until then.
 
         :param page: page items
         :param icon_box: icon bounding box
         :param icon_box_without_label: icon bounding box without label
+        :param owner: the object which gets loaded thumbnails from the thumbnail loader
         """
+        tasks = []
         for s in page:
-            if getattr(s, "icon_base", None) != None:
+            if getattr(s, "icon_base", None) != None and not getattr(s, "icon_placeholder", False):
                 continue 
             has_embedded_image = getattr(s, "has_embedded_image", False)
             if (s.file_type == FOLDER_WITH_ICON or s.file_type == FILE_IMAGE or has_embedded_image) and self.config[HIDE_FOLDER_NAME]:
@@ -1237,5 +1582,51 @@ class ImageUtil(object):
                 s.show_label = True
                 w = icon_box.w
                 h = icon_box.h
-                
-            s.icon_base = self.get_file_icon(s.file_type, getattr(s, "file_image_path", ""), (w, h), url=s.url, show_label=s.show_label)
+
+            file_image_path = getattr(s, "file_image_path", "")
+            if owner == None or not self.is_thumbnail(s.file_type):
+                s.icon_base = self.get_file_icon(s.file_type, file_image_path, (w, h), url=s.url, show_label=s.show_label)
+                continue
+
+            key = f"""{s.file_type}_{s.url}_{file_image_path}_{w}x{h}_{s.show_label}"""
+            thumbnail = self.thumbnail_cache.get(key)
+            if thumbnail:
+                s.icon_base = thumbnail
+                s.icon_placeholder = False
+                continue
+
+            s.icon_base = self.get_file_icon(s.file_type, file_image_path, (w, h), url=s.url, show_label=s.show_label, placeholder=True)
+            s.icon_placeholder = True
+            args = (key, s.file_type, file_image_path, (w, h), s.url, s.show_label)
+            tasks.append((s, self.load_thumbnail, args))
+
+        if owner != None:
+            self.thumbnail_loader.load(owner, tasks)
+
+    def is_thumbnail(self, file_type):
+        """ Check if the file icon is the thumbnail which requires file decoding
+
+        :param file_type: file type
+
+        :return: True - thumbnail, False - generic icon
+        """
+        if file_type == FILE_AUDIO:
+            return self.config[ENABLE_EMBEDDED_IMAGES]
+        return file_type == FOLDER_WITH_ICON or file_type == FILE_IMAGE
+
+    def load_thumbnail(self, key, file_type, file_image_path, icon_bb, url, show_label):
+        """ Load file thumbnail and put it into the thumbnail cache. Runs in the thumbnail loader thread.
+
+        :param key: thumbnail cache key
+        :param file_type: file type
+        :param file_image_path: path to image file
+        :param icon_bb: image bounding box
+        :param url: file name
+        :param show_label: True - take label into account
+
+        :return: thumbnail
+        """
+        thumbnail = self.get_file_icon(file_type, file_image_path, icon_bb, url=url, show_label=show_label)
+        if thumbnail:
+            self.thumbnail_cache[key] = thumbnail
+        return thumbnail
@@ -0,0 +1,365 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+#
+# This file is part of Peppy Player.
+#
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import io
+import sys
+import time
+import select
+import struct
+import logging
+
+from threading import Thread, RLock
+
+READ_BUFFER_SIZE = 65536
+POLL_TIMEOUT = 500
+HANG_UP_DELAY = 0.1
+
+BENCHMARK_RATE = 60
+BENCHMARK_WRITER_RATE = 200
+BENCHMARK_DURATION = 5
+
+readers = {}
+
+def get_pipe_reader(pipe_name, frame_format, min_interval=0):
+    """ Get reader shared by all consumers of the pipe
+
+    :param pipe_name: named pipe path
+    :param frame_format: struct format of one frame
+    :param min_interval: minimum time between reads in seconds
+
+    :return: pipe reader
+    """
+    key = (pipe_name, frame_format)
+    if key not in readers:
+        readers[key] = PipeReader(pipe_name, frame_format, min_interval)
+    reader = readers[key]
+    reader.min_interval = min(reader.min_interval, min_interval)
+    return reader
+
+class PipeReader(object):
+    """ Reads audio level frames from the named pipe in the background thread.
+    The thread waits for data using poll, reads all available data into preallocated buffer
+    and keeps only the newest complete frame. The frame is decoded once on the first request
+    and published to the consumers.
+    The reads are not done more often than the consumers need the data, the frames written in between
+    are read at once.
+    """
+
+    def __init__(self, pipe_name, frame_format, min_interval=0, buffer_size=READ_BUFFER_SIZE):
+        """ Initializer
+
+        :param pipe_name: named pipe path
+        :param frame_format: struct format of one frame, e.g. "<HH" - two little-endian 16 bit values
+        :param min_interval: minimum time between reads in seconds, usually the consumer refresh period
+        :param buffer_size: read buffer size in bytes
+        """
+        self.lock = RLock()
+        self.pipe_name = pipe_name
+        self.min_interval = min_interval
+        self.frame = struct.Struct(frame_format)
+        self.frame_size = self.frame.size
+        self.buffer = bytearray(max(buffer_size, self.frame_size * 2))
+        self.view = memoryview(self.buffer)
+        self.latest = bytearray(self.frame_size)
+        self.pending = 0
+        self.data = None
+        self.values = None
+        self.frames = 0
+        self.listeners = []
+        self.pipe = None
+        self.file = None
+        self.poll = None
+        self.thread = None
+        self.run_flag = False
+
+    def open(self):
+        """ Open named pipe. Opening doesn't wait for the writer.
+
+        :return: True - pipe opened, False - pipe cannot be opened
+        """
+        with self.lock:
+            if self.pipe != None:
+                return True
+
+            try:
+                self.pipe = os.open(self.pipe_name, os.O_RDONLY | os.O_NONBLOCK)
+            except Exception as e:
+                logging.debug("Cannot open named pipe: " + self.pipe_name)
+                logging.debug(e)
+                return False
+
+            self.file = io.FileIO(self.pipe, "rb", closefd=False)
+            self.poll = select.poll()
+            self.poll.register(self.pipe, select.POLLIN)
+            return True
+
+    def close(self):
+        """ Close named pipe """
+
+        if self.pipe == None:
+            return
+
+        try:
+            self.poll.unregister(self.pipe)
+            os.close(self.pipe)
+        except Exception as e:
+            logging.debug(e)
+        self.pipe = self.file = self.poll = None
+
+    def start(self):
+        """ Start reading thread. The data which was written before start is discarded. """
+
+        if not self.open():
+            return
+
+        self.flush()
+        with self.lock:
+            if self.thread != None and self.thread.is_alive():
+                self.run_flag = True
+                return
+            self.run_flag = True
+            self.thread = Thread(target=self.run, name="pipereader", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """ Stop reading thread """
+
+        self.run_flag = False
+
+    def flush(self):
+        """ Discard all available data and the last values """
+
+        if self.pipe == None:
+            return
+
+        with self.lock:
+            self.read_all()
+            self.pending = 0
+            self.data = self.values = None
+
+    def read_all(self):
+        """ Read all available data. The newest complete frame is copied to the frame buffer,
+        the incomplete frame is moved to the beginning of the read buffer.
+
+        :return: True - new frame was read, False - no new frame, None - writer closed the pipe
+        """
+        found = False
+        while True:
+            try:
+                n = self.file.readinto(self.view[self.pending:])
+            except Exception as e:
+                logging.debug(e)
+                return found
+
+            if n == None:
+                return found
+            if n == 0:
+                return found or None
+
+            total = self.pending + n
+            complete = total - total % self.frame_size
+            if complete:
+                self.latest[:] = self.view[complete - self.frame_size:complete]
+                found = True
+                self.view[0:total - complete] = self.view[complete:total]
+            self.pending = total - complete
+
+    def run(self):
+        """ Thread method. Waits for data and publishes the newest frame. """
+
+        while self.run_flag:
+            try:
+                events = self.poll.poll(POLL_TIMEOUT)
+            except Exception as e:
+                logging.debug(e)
+                break
+
+            if not events:
+                with self.lock:
+                    self.data = self.values = None
+                continue
+
+            with self.lock:
+                found = self.read_all()
+                if found:
+                    self.data = bytes(self.latest)
+                    self.values = None
+                    self.frames += 1
+                elif found == None:
+                    self.data = self.values = None
+
+            if found:
+                values = self.get_values() if self.listeners else None
+                for listener in self.listeners:
+                    try:
+                        listener(values)
+                    except Exception as e:
+                        logging.debug(e)
+                if self.min_interval:
+                    time.sleep(self.min_interval)
+            elif found == None or events[0][1] & select.POLLHUP:
+                time.sleep(HANG_UP_DELAY)
+
+    def get_values(self):
+        """ Get the newest frame. The frame is dropped if there was no data during the poll timeout
+        or the writer closed the pipe.
+
+        :return: tuple of decoded values or None if there is no data
+        """
+        with self.lock:
+            if self.data != None and self.values == None:
+                self.values = self.frame.unpack_from(self.data)
+            return self.values
+
+    def get_frame(self):
+        """ Get the newest frame without decoding
+
+        :return: frame bytes or None if there is no data
+        """
+        with self.lock:
+            return self.data
+
+    def add_listener(self, listener):
+        """ Add listener called in the reader thread with the values of each new frame
+
+        :param listener: function with the tuple of values as parameter
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """ Remove listener
+
+        :param listener: listener to remove
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+def write_frames(pipe_name, frame_format, rate, duration):
+    """ Write test frames to the named pipe. Runs in the separate process.
+
+    :param pipe_name: named pipe path
+    :param frame_format: struct format of one frame
+    :param rate: frames per second
+    :param duration: time in seconds
+    """
+    frame = struct.Struct(frame_format)
+    values = [0] * len(frame.unpack(bytes(frame.size)))
+    fd = os.open(pipe_name, os.O_WRONLY)
+    end = time.monotonic() + duration
+    n = 0
+    while time.monotonic() < end:
+        values[0] = n % 65536
+        os.write(fd, frame.pack(*values))
+        n += 1
+        time.sleep(1 / rate)
+    os.close(fd)
+
+def read_legacy(pipe, frame_size, polling_interval):
+    """ Previous implementation: read the frames one by one with sleep until the pipe is empty
+
+    :param pipe: pipe file descriptor
+    :param frame_size: frame size in bytes
+    :param polling_interval: sleep time between reads
+
+    :return: the last frame
+    """
+    data = bytes(frame_size)
+    while True:
+        try:
+            tmp_data = os.read(pipe, frame_size)
+            if not tmp_data:
+                break
+            if len(tmp_data) == frame_size:
+                data = tmp_data
+            time.sleep(polling_interval)
+        except:
+            break
+    return data
+
+def benchmark(frame_format, rate, writer_rate, duration):
+    """ Compare CPU time of the previous polling loop and the pipe reader.
+    Consumer reads the newest frame at the given rate, the frames are written by the separate process.
+
+    :param frame_format: struct format of one frame
+    :param rate: consumer rate
+    :param writer_rate: writer frames per second
+    :param duration: test time in seconds for each implementation
+    """
+    import tempfile
+    from multiprocessing import Process
+
+    folder = tempfile.mkdtemp()
+    pipe_name = os.path.join(folder, "benchmark.fifo")
+    os.mkfifo(pipe_name)
+    frame_size = struct.calcsize(frame_format)
+
+    def run(name, read):
+        writer = Process(target=write_frames, args=(pipe_name, frame_format, writer_rate, duration + 1))
+        writer.start()
+        time.sleep(0.2)
+        reads = 0
+        cpu_start = time.process_time()
+        start = time.monotonic()
+        while time.monotonic() - start < duration:
+            read()
+            reads += 1
+            time.sleep(1 / rate)
+        cpu = time.process_time() - cpu_start
+        t = time.monotonic() - start
+        logging.debug(f"""{name}: CPU {cpu * 100 / t:.2f}%, consumer rate {reads / t:.1f} Hz""")
+        writer.join()
+
+    pipe = os.open(pipe_name, os.O_RDONLY | os.O_NONBLOCK)
+    run("polling loop", lambda: read_legacy(pipe, frame_size, (1 / rate) / 10))
+    os.close(pipe)
+
+    reader = PipeReader(pipe_name, frame_format, 1 / rate)
+    reader.start()
+    run("pipe reader", reader.get_values)
+    reader.stop()
+    reader.close()
+
+    os.remove(pipe_name)
+    os.rmdir(folder)
+
+def main():
+    import argparse
+    log_handler = logging.StreamHandler(sys.stdout)
+    logging.basicConfig(
+        level=logging.NOTSET,
+        format='[%(asctime)s] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s',
+        handlers=[log_handler]
+    )
+    usage = """python -m util.pipereader benchmark [args]"""
+    parser = argparse.ArgumentParser(usage=usage)
+    subparsers = parser.add_subparsers(dest="command")
+
+    p = subparsers.add_parser("benchmark", help="compare CPU time of the polling loop and the pipe reader")
+    p.add_argument("-f", help="frame format", default="<HH")
+    p.add_argument("-r", help="consumer rate", type=int, default=BENCHMARK_RATE)
+    p.add_argument("-w", help="writer frames per second", type=int, default=BENCHMARK_WRITER_RATE)
+    p.add_argument("-t", help="test time in seconds", type=int, default=BENCHMARK_DURATION)
+
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark(args.f, args.r, args.w, args.t)
+
+if __name__ == '__main__':
+    main()
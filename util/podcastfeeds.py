@@ -0,0 +1,275 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+#
+# This file is part of Peppy Player.
+#
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import time
+import hashlib
+import logging
+import feedparser
+import requests
+
+from threading import RLock, Thread
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+
+FEED_CACHE_FOLDER = os.path.join("cache", "podcasts")
+FEEDS_FILENAME = "feeds.json"
+FEED_WORKERS = 4
+FEED_TIMEOUT = (2, 5)
+FEED_REFRESH_PERIOD = 30 * 60
+USER_AGENT = "PeppyPlayer + https://github.com/project-owner/Peppy"
+
+TITLE = "title"
+DESCRIPTION = "description"
+IMAGE = "image"
+ETAG = "etag"
+LAST_MODIFIED = "last_modified"
+UPDATED = "updated"
+
+class PodcastFeeds(object):
+    """ Fetches podcast feeds concurrently using shared HTTP session.
+    The feeds are requested with ETag/Last-Modified headers, so the unchanged feeds are not downloaded again.
+    The feed content, feed summary (title, description, image URL) and podcast image are stored on disk,
+    so that the podcasts can be shown from the cache and refreshed in the background.
+    """
+
+    def __init__(self, folder=FEED_CACHE_FOLDER, workers=FEED_WORKERS):
+        """ Initializer
+
+        :param folder: cache folder
+        :param workers: number of concurrent requests
+        """
+        self.lock = RLock()
+        self.folder = folder
+        self.feeds_path = os.path.join(folder, FEEDS_FILENAME)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="podcast")
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.last_refresh = None
+        self.enabled = True
+
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except Exception as e:
+            logging.debug(e)
+            self.enabled = False
+
+        self.feeds = self.load_feeds()
+
+    def load_feeds(self):
+        """ Load feed summaries from disk
+
+        :return: dictionary where key - feed URL, value - feed summary
+        """
+        try:
+            with open(self.feeds_path) as f:
+                return json.load(f)
+        except:
+            return {}
+
+    def save_feeds(self):
+        """ Save feed summaries to disk """
+
+        if not self.enabled:
+            return
+
+        with self.lock:
+            tmp_path = self.feeds_path + ".tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(self.feeds, f)
+                os.replace(tmp_path, self.feeds_path)
+            except Exception as e:
+                logging.debug(e)
+
+    def get_path(self, url, extension):
+        """ Get path of the cached file
+
+        :param url: feed or image URL
+        :param extension: file extension
+
+        :return: file path
+        """
+        return os.path.join(self.folder, hashlib.sha1(url.encode()).hexdigest() + extension)
+
+    def read_file(self, path):
+        """ Read cached file
+
+        :param path: file path
+
+        :return: file content or None
+        """
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except:
+            return None
+
+    def write_file(self, path, data):
+        """ Write cached file
+
+        :param path: file path
+        :param data: file content
+        """
+        if not self.enabled:
+            return
+
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.debug(e)
+
+    def get_summary(self, url):
+        """ Get cached feed summary
+
+        :param url: feed URL
+
+        :return: dictionary with title, description and image URL or None if feed wasn't fetched yet
+        """
+        with self.lock:
+            return self.feeds.get(url, None)
+
+    def get_feed(self, url):
+        """ Get parsed feed. The feed is fetched if it's not in the cache.
+
+        :param url: feed URL
+
+        :return: parsed feed or None
+        """
+        content = self.read_file(self.get_path(url, ".xml"))
+        if content == None:
+            if not self.fetch(url):
+                return None
+            self.save_feeds()
+            content = self.read_file(self.get_path(url, ".xml"))
+        if content == None:
+            return None
+        return feedparser.parse(content)
+
+    def get_image_data(self, url):
+        """ Get cached podcast image
+
+        :param url: image URL
+
+        :return: image bytes or None
+        """
+        if not url:
+            return None
+        return self.read_file(self.get_path(url, ".img"))
+
+    def fetch(self, url):
+        """ Fetch feed using conditional request. Update summary and download image if feed was changed.
+
+        :param url: feed URL
+
+        :return: True - feed was changed, False - feed wasn't changed or cannot be fetched
+        """
+        summary = self.get_summary(url)
+        headers = {}
+        if summary and os.path.exists(self.get_path(url, ".xml")):
+            if summary.get(ETAG):
+                headers["If-None-Match"] = summary[ETAG]
+            if summary.get(LAST_MODIFIED):
+                headers["If-Modified-Since"] = summary[LAST_MODIFIED]
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=FEED_TIMEOUT)
+        except Exception as e:
+            logging.debug(e)
+            return False
+
+        if response.status_code == 304:
+            with self.lock:
+                summary[UPDATED] = time.time()
+            return False
+
+        if response.status_code != 200:
+            return False
+
+        rss = feedparser.parse(response.content)
+        if not rss or getattr(rss, "bozo_exception", None) or "title" not in rss.feed:
+            return False
+
+        if "image" in rss.feed and "href" in rss.feed.image:
+            image = rss.feed.image.href.strip()
+        else:
+            image = ""
+
+        if image and self.get_image_data(image) == None:
+            self.download_image(image)
+
+        self.write_file(self.get_path(url, ".xml"), response.content)
+
+        with self.lock:
+            self.feeds[url] = {
+                TITLE: rss.feed.title,
+                DESCRIPTION: rss.feed.get("subtitle", ""),
+                IMAGE: image,
+                ETAG: response.headers.get("ETag", None),
+                LAST_MODIFIED: response.headers.get("Last-Modified", None),
+                UPDATED: time.time()
+            }
+        return True
+
+    def download_image(self, url):
+        """ Download podcast image
+
+        :param url: image URL
+        """
+        try:
+            response = self.session.get(url, timeout=FEED_TIMEOUT)
+            if response.status_code == 200:
+                self.write_file(self.get_path(url, ".img"), response.content)
+        except Exception as e:
+            logging.debug(e)
+
+    def fetch_all(self, urls):
+        """ Fetch feeds concurrently and wait for the results
+
+        :param urls: feed URLs
+
+        :return: list of the changed feed URLs
+        """
+        futures = {url: self.executor.submit(self.fetch, url) for url in urls}
+        wait(futures.values())
+        self.save_feeds()
+        return [url for url, f in futures.items() if not f.exception() and f.result()]
+
+    def refresh(self, urls, listener=None):
+        """ Refresh feeds in the background if they weren't refreshed during the refresh period
+
+        :param urls: feed URLs
+        :param listener: function called with the list of changed feed URLs
+        """
+        with self.lock:
+            if self.last_refresh != None and time.time() - self.last_refresh < FEED_REFRESH_PERIOD:
+                return
+            self.last_refresh = time.time()
+
+        def run():
+            changed = self.fetch_all(urls)
+            if changed and listener:
+                listener(changed)
+
+        Thread(target=run, daemon=True).start()
@@ -16,20 +16,21 @@
 # along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
 
 import os
-import feedparser
 import requests
 import codecs
 import json
 import logging
 
-from threading import Thread
 from util.keys import *
 from ui.state import State
 from ui.layout.borderlayout import BorderLayout
 from ui.screen.screen import PERCENT_TOP_HEIGHT, PERCENT_TITLE_FONT
 from ui.screen.menuscreen import PERCENT_TOP_HEIGHT as PERCENT_TOP_HEIGHT_MENU_SCREEN
 from ui.menu.menu import Menu
-from util.config import PODCASTS, AUDIO_FILES, LOADING, PODCASTS_FOLDER, COLORS, COLOR_DARK, UTF8
+from util.config import PODCASTS, AUDIO_FILES, LOADING, PODCASTS_FOLDER, COLORS, COLOR_DARK, UTF8, \
+    PODCASTS_DOWNLOAD_THREADS, PODCASTS_DOWNLOAD_RATE
+from util.podcastfeeds import PodcastFeeds, TITLE, DESCRIPTION, IMAGE
+from util.downloadmanager import DownloadManager
 
 FOLDER_PODCASTS = "podcasts"
 FILE_PODCASTS = "podcasts.m3u"
@@ -67,6 +68,9 @@ class PodcastsUtil(object):
         self.loaded_icon = None
         self.podcast_image_cache = {}
         self.podcasts_json = []
+        self.feeds = PodcastFeeds()
+        self.download_manager = None
+        self.get_download_manager()
         
         layout = BorderLayout(util.screen_rect)
         layout.set_percent_constraints(PERCENT_TOP_HEIGHT, PERCENT_TOP_HEIGHT_MENU_SCREEN, 0, 0)
@@ -214,6 +218,7 @@ class PodcastsUtil(object):
         except:
             pass              
         
+        self.fetch_missing_feeds(links[start_index : end_index])
         for i, link in enumerate(links[start_index : end_index]):
             try:
                 p = self.summary_cache[link]
@@ -226,22 +231,28 @@ class PodcastsUtil(object):
             r = self.get_podcast_info(i, link)
             if r:
                 result[link] = r
-            
+        
+        self.feeds.refresh(links, self.reset_podcasts)
         return result
 
     def get_podcasts_info(self):
+        """ Get info of all podcasts
+
+        :return: list of state objects
+        """
         links = self.get_podcasts_links()
 
         if not links:
             return []
 
         result = []
+        self.fetch_missing_feeds(links)
 
         for i, link in enumerate(links):
             try:
                 p = self.summary_cache[link]
                 p.index = i
-                result[link] = p
+                result.append(p)
                 continue
             except:
                 pass
@@ -250,8 +261,26 @@ class PodcastsUtil(object):
             if r:
                 result.append(r)
 
+        self.feeds.refresh(links, self.reset_podcasts)
         return result
 
+    def fetch_missing_feeds(self, links):
+        """ Fetch concurrently the feeds which are not in the feed cache yet
+
+        :param links: podcasts URLs
+        """
+        missing = [link for link in links if link not in self.summary_cache and self.feeds.get_summary(link) == None]
+        if missing:
+            self.feeds.fetch_all(missing)
+
+    def reset_podcasts(self, links):
+        """ Remove changed podcasts from the summary cache. Called after background refresh.
+
+        :param links: URLs of the changed podcasts
+        """
+        for link in links:
+            self.summary_cache.pop(link, None)
+
     def get_podcast_info(self, index, podcast_url, include_icon=True):
         """ Get podcast info as state object
         
@@ -268,21 +297,18 @@ class PodcastsUtil(object):
         except:
             pass
 
-        try:
-            response = requests.get(podcast_url, timeout=(2, 2))
-            if response.status_code == 404:
-                return None
-            rss = feedparser.parse(response.content)
-            if rss and getattr(rss, "bozo_exception", None):
-                return None
-        except Exception as e:
+        summary = self.feeds.get_summary(podcast_url)
+        if summary == None:
+            self.feeds.fetch_all([podcast_url])
+            summary = self.feeds.get_summary(podcast_url)
+        if summary == None:
             return None
             
         s = State()
         s.index = index
-        s.name = rss.feed.title
+        s.name = summary[TITLE]
         s.l_name = s.name
-        s.description = rss.feed.subtitle
+        s.description = summary[DESCRIPTION]
         s.url = podcast_url
         s.online = True
         s.fixed_height = int(self.podcast_button_font_size * 0.8)
@@ -291,11 +317,7 @@ class PodcastsUtil(object):
         s.bgr = self.config[COLORS][COLOR_DARK]
         s.show_bgr = True
             
-        if 'image' in rss.feed and 'href' in rss.feed.image:
-            img = rss.feed.image.href.strip()
-        else:
-            img = ''
-            
+        img = summary[IMAGE]
         s.image_name = img
         if include_icon:
             s.icon_base = self.get_podcast_image(img, 0.48, 0.8, self.podcast_button_bb)
@@ -390,7 +412,11 @@ class PodcastsUtil(object):
         cache_key = PODCASTS + str(k) + str(f) 
         if len(img_name) != 0:
             if online:
-                image = self.image_util.load_image_from_url(img_name)
+                data = self.feeds.get_image_data(img_name)
+                if data:
+                    image = self.image_util.load_image_from_bytes(img_name, data)
+                else:
+                    image = self.image_util.load_image_from_url(img_name)
             else:
                 image = self.image_util.load_image(img_name)
                 
@@ -509,7 +535,7 @@ class PodcastsUtil(object):
             pass
         
         episodes = []
-        rss = feedparser.parse(podcast_url)
+        rss = self.feeds.get_feed(podcast_url)
         if rss == None:
             return episodes
 
@@ -632,36 +658,93 @@ class PodcastsUtil(object):
                     pass
         return False
 
-    def save_episode(self, state, callback):
-        """ Start saving thread """
-        
-        thread = Thread(target=self.save, args=[state, callback])
-        thread.start()
+    def get_download_manager(self):
+        """ Get download manager. The manager is created when podcasts folder is available.
+        The downloads saved during the previous session are resumed.
 
-    def save(self, button_state, callback):
-        """ Episode saving thread
-        
-        :param button_state: state object defining episode details
-        :param callback: callback function to call when saving finished
+        :return: download manager or None if there is no podcasts folder
         """
-        podcast_folder = self.config[PODCASTS_FOLDER]
-        url = button_state.url
+        if self.download_manager != None:
+            return self.download_manager
+
+        if not self.is_podcast_folder_available():
+            return None
+
+        threads = self.config.get(PODCASTS_DOWNLOAD_THREADS, 1)
+        rate = self.config.get(PODCASTS_DOWNLOAD_RATE, 0)
+        self.download_manager = DownloadManager(self.config[PODCASTS_FOLDER], threads, rate)
+        self.download_manager.add_finish_listener(self.finish_download)
+        for job in self.download_manager.get_jobs():
+            self.loading.append(job["data"].get("name"))
+        self.download_manager.start()
+        return self.download_manager
+
+    def save_episode(self, state):
+        """ Add episode to the download queue. The download manager listeners are notified when saving finished.
+
+        :param state: state object defining episode details
+        """
+        download_manager = self.get_download_manager()
+        if download_manager == None:
+            return
+
+        url = state.url
         filename = url.split('/')[-1]
-        self.loading.append(filename)
-        
-        episode_file = os.path.join(podcast_folder, filename)
-        self.save_file_from_web(episode_file, url)
-                            
-        url = button_state.podcast_image_url
-        if url.startswith("http"):
-            f = url.split("/")[-1]
-            image_file = os.path.join(podcast_folder, f)
-            self.save_file_from_web(image_file, url)
-                           
-        self.loading.remove(filename)
-        button_state.file_name = episode_file
-        self.cache_episode(button_state)
-        callback()       
+        episode_file = os.path.join(self.config[PODCASTS_FOLDER], filename)
+        data = {
+            "name": state.name,
+            "description": getattr(state, "description", ""),
+            "podcast_name": state.podcast_name,
+            "podcast_url": state.podcast_url,
+            "podcast_image_url": getattr(state, "podcast_image_url", "")
+        }
+        try:
+            p = self.summary_cache[state.podcast_url]
+            data["podcast_description"] = p.description
+            data["podcast_image_name"] = p.image_name
+        except:
+            pass
+
+        if state.name not in self.loading:
+            self.loading.append(state.name)
+        download_manager.add(url, episode_file, data)
+
+    def finish_download(self, url, filename, data):
+        """ Called by download manager when episode was saved
+
+        :param url: episode URL
+        :param filename: episode file
+        :param data: episode details
+        """
+        podcast_folder = self.config[PODCASTS_FOLDER]
+        image_url = data.get("podcast_image_url", "")
+        if image_url.startswith("http"):
+            image_file = os.path.join(podcast_folder, image_url.split("/")[-1])
+            if not os.path.exists(image_file):
+                try:
+                    self.save_file_from_web(image_file, image_url)
+                except Exception as e:
+                    logging.debug(e)
+
+        name = data.get("name")
+        if name in self.loading:
+            self.loading.remove(name)
+
+        s = State()
+        s.name = name
+        s.url = url
+        s.file_name = filename
+        s.description = data.get("description", "")
+        s.podcast_name = data.get("podcast_name", "")
+        s.podcast_url = data.get("podcast_url", "")
+        s.podcast_description = data.get("podcast_description", "")
+        s.podcast_image_name = data.get("podcast_image_name", image_url)
+
+        try:
+            self.podcasts_json = self.load_podcasts()
+        except:
+            pass
+        self.cache_episode(s)
 
     def save_file_from_web(self, filename, url):
         """ Save file from web
@@ -695,12 +778,18 @@ class PodcastsUtil(object):
                 break
         
         if podcast == None:
-            p = self.summary_cache[state.podcast_url]
+            p = self.summary_cache.get(state.podcast_url, None)
+            if p != None:
+                description = p.description
+                image_name = p.image_name
+            else:
+                description = getattr(state, "podcast_description", "")
+                image_name = getattr(state, "podcast_image_name", "")
             podcast_json = {
-                "name": p.name,
-                "url": p.url,
-                "summary": self.clean_summary(p.description),
-                "image": p.image_name.split("/")[-1],
+                "name": state.podcast_name,
+                "url": state.podcast_url,
+                "summary": self.clean_summary(description),
+                "image": image_name.split("/")[-1],
                 "episodes": [episode]
             }
             self.podcasts_json.append(podcast_json)
@@ -19,10 +19,18 @@ import os
 import sys
 import sqlite3
 import logging
+import random
 
-from util.collector import DbUtil, FILENAME, TITLE, FOLDER
+from timeit import default_timer as timer
+from util.collector import DbUtil, ALL_METADATA, FILENAME, TITLE, FOLDER, KEY_SUFFIX, TOPICS, GENRE, ARTIST, \
+    COMPOSER, ALBUM, DATE, TYPE
 from util.keys import KEY_ABC, KEY_SEARCH
 
+BENCHMARK_ROWS = 200000
+BENCHMARK_PAGE_SIZE = 10
+BENCHMARK_WORDS = ["love", "night", "blue", "moon", "river", "fire", "dream", "heart", "road", "rain", "stone", 
+    "light", "shadow", "song", "summer", "winter", "city", "ocean", "star", "wind"]
+
 class Selector(object):
     """ Collection of the SQL select statements and helper functions """
 
@@ -79,19 +87,75 @@ class Selector(object):
                     result.append((n[0], n[1]))
         return result
 
-    def get_offset(self, page, next, page_size):
-        """ Get offset clause
+    def get_prefix_range(self, prefix):
+        """ Get the range of sort keys starting with the prefix. 
+        The range is used instead of LIKE 'prefix%' to search by index.
+
+        :param prefix: prefix
+
+        :return: tuple (lower bound, upper bound)
+        """
+        p = prefix.strip().lower()
+        if not p:
+            return ("", chr(0x10FFFF))
+        return (p, p[:-1] + chr(ord(p[-1]) + 1))
+
+    def get_pattern_filter(self, column):
+        """ Get the filter clause for the search by pattern. 
+        Uses full-text search table if available.
+
+        :param column: column name
+
+        :return: filter clause with one parameter
+        """
+        if self.dbutil.fts_available:
+            return f"""id IN (SELECT rowid FROM {self.dbutil.fts_table_name} WHERE {column} LIKE ?)"""
+        else:
+            return f"""{column}{KEY_SUFFIX} LIKE ?"""
+
+    def get_order(self, next):
+        """ Get sort order for keyset pagination
+
+        :param next: next page parameter
+
+        :return: ASC for next DESC for previous
+        """
+        if next: return "ASC"
+        else: return "DESC"
+
+    def get_page_list(self, r, next):
+        """ Get list of values for the page. 
+        Previous page is selected in descending order and should be reversed.
 
-        :param page: page number
+        :param r: result set
         :param next: next or previous page
+
+        :return: list of values in ascending order
+        """
+        result = self.get_list(r)
+        if not next:
+            result.reverse()
+        return result
+
+    def get_cached_count(self, column, prefix, page_size):
+        """ Get page count from the materialized counts table
+
+        :param column: column name
+        :param prefix: first character, empty string for all values
         :param page_size: page size
 
-        :return: empty string for next, OFFSET clause for previous
+        :return: page count or None if counts were not calculated
         """
-        if next:
-            return ""
-        else:
-            return "OFFSET " + str((page - 1) * page_size)
+        query = f"""
+            SELECT prefix, count
+            FROM {self.dbutil.count_table_name}
+            WHERE topic = ? AND prefix IN ('', ?)
+        """
+        r = self.dbutil.run_parameterized_query(query, (column, prefix))
+        if not r:
+            return None
+        counts = dict(r)
+        return self.get_count([(counts.get(prefix, 0),)], page_size)
 
     def get_topic_page(self, mode, topic, search_str, current_page, previous_page, first, last, page_size):
         """ Dispatching function to get topic page
@@ -182,6 +246,10 @@ class Selector(object):
 
         :return: page count
         """
+        n = self.get_cached_count(column, "", page_size)
+        if n != None:
+            return n
+
         query = f"""
             SELECT COUNT(DISTINCT {column})
             FROM {self.dbutil.table_name}
@@ -195,7 +263,7 @@ class Selector(object):
         :param column: column name
         :param page_size: page size
         :param value: first or last value in the current page
-        :param page: page number
+        :param page: page number (not used, pages are selected by the first or last value)
         :param next: True - next page, False - previous page
 
         :return: list of values
@@ -205,11 +273,10 @@ class Selector(object):
             FROM {self.dbutil.table_name} 
             WHERE LENGTH({column}) > 0 AND 
             {column} {self.get_sign(next)} ?
-            ORDER BY {column} ASC 
-            LIMIT {page_size} {self.get_offset(page, next, page_size)}
+            ORDER BY {column} {self.get_order(next)} 
+            LIMIT {page_size}
         """
-        g = self.get_list(self.dbutil.run_parameterized_query(query, (value,)))
-        return g
+        return self.get_page_list(self.dbutil.run_parameterized_query(query, (value,)), next)
 
     def get_page_count_by_char(self, column, ch, page_size):
         """ Get page count filtered by the first character
@@ -220,14 +287,19 @@ class Selector(object):
 
         :return: page count
         """
+        prefix = ch.strip().lower()
+        if len(prefix) == 1:
+            n = self.get_cached_count(column, prefix, page_size)
+            if n != None:
+                return n
+
         query = f"""
             SELECT COUNT(DISTINCT {column})
             FROM {self.dbutil.table_name} 
-            WHERE LENGTH(TRIM({column})) > 2 AND 
-            LOWER(TRIM({column})) like ?
-            ORDER BY {column} ASC
+            WHERE {column}{KEY_SUFFIX} >= ? AND {column}{KEY_SUFFIX} < ? AND 
+            LENGTH({column}{KEY_SUFFIX}) > 2
         """
-        return self.get_count(self.dbutil.run_parameterized_query(query, (ch.lower() + "%",)), page_size)
+        return self.get_count(self.dbutil.run_parameterized_query(query, self.get_prefix_range(ch)), page_size)
 
     def get_page_by_char(self, column, ch, value="", page=None, next=True, page_size=10):
         """ Get values for the page filtered by the first character
@@ -235,7 +307,7 @@ class Selector(object):
         :param column: column name
         :param ch: character
         :param value: first or last value in the current page
-        :param page: page number
+        :param page: page number (not used, pages are selected by the first or last value)
         :param next: True - next page, False - previous page
         :param page_size: page size
 
@@ -244,13 +316,13 @@ class Selector(object):
         query = f"""
             SELECT DISTINCT {column}
             FROM {self.dbutil.table_name} 
-            WHERE LENGTH(TRIM({column})) > 2 AND 
-            LOWER(TRIM({column})) like ? AND 
+            WHERE {column}{KEY_SUFFIX} >= ? AND {column}{KEY_SUFFIX} < ? AND 
+            LENGTH({column}{KEY_SUFFIX}) > 2 AND 
             {column} {self.get_sign(next)} ?
-            ORDER BY {column} ASC 
-            LIMIT {page_size} {self.get_offset(page, next, page_size)}
+            ORDER BY {column} {self.get_order(next)} 
+            LIMIT {page_size}
         """
-        return self.get_list(self.dbutil.run_parameterized_query(query, (ch.lower() + "%", value)))
+        return self.get_page_list(self.dbutil.run_parameterized_query(query, self.get_prefix_range(ch) + (value,)), next)
 
     def get_page_count_by_pattern(self, column, pattern, page_size):
         """ Get page count filtered by the search pattern
@@ -264,9 +336,8 @@ class Selector(object):
         query = f"""
             SELECT COUNT(DISTINCT {column})
             FROM {self.dbutil.table_name} 
-            WHERE LENGTH(LOWER(TRIM({column}))) > 0 AND 
-            LOWER(TRIM({column})) like ?
-            ORDER BY {column} ASC
+            WHERE LENGTH({column}{KEY_SUFFIX}) > 0 AND 
+            {self.get_pattern_filter(column)}
         """
         return self.get_count(self.dbutil.run_parameterized_query(query, ("%" + pattern.lower() + "%",)), page_size)
 
@@ -276,7 +347,7 @@ class Selector(object):
         :param column: column name
         :param pattern: serach pattern
         :param value: first or last value in the current page
-        :param page: page number
+        :param page: page number (not used, pages are selected by the first or last value)
         :param next: True - next page, False - previous page
         :param page_size: page size
 
@@ -285,13 +356,13 @@ class Selector(object):
         query = f"""
             SELECT DISTINCT {column}
             FROM {self.dbutil.table_name} 
-            WHERE LENGTH(TRIM({column})) > 2 AND 
-            LOWER(TRIM({column})) like ? AND 
+            WHERE LENGTH({column}{KEY_SUFFIX}) > 2 AND 
+            {self.get_pattern_filter(column)} AND 
             {column} {self.get_sign(next)} ?
-            ORDER BY {column} ASC 
-            LIMIT {page_size} {self.get_offset(page, next, page_size)}
+            ORDER BY {column} {self.get_order(next)} 
+            LIMIT {page_size}
         """
-        return self.get_list(self.dbutil.run_parameterized_query(query, ("%" + pattern + "%", value)))
+        return self.get_page_list(self.dbutil.run_parameterized_query(query, ("%" + pattern.lower() + "%", value)), next)
 
     def get_topic_detail_page(self, topic, selection, current_page, prev_page, first, last, page_size):
         """ Get topic details
@@ -335,7 +406,7 @@ class Selector(object):
         :param topic: collection topic
         :param param: selection parameter
         :param value: first or last value in the current page
-        :param page: page number
+        :param page: page number (not used, pages are selected by the first or last value)
         :param next: True - next page, False - previous page
         :param page_size: page size
 
@@ -346,10 +417,10 @@ class Selector(object):
             FROM {self.dbutil.table_name}
             WHERE {topic} = ?
             AND folder {self.get_sign(next)} ?
-            ORDER BY folder ASC 
-            LIMIT {page_size} {self.get_offset(page, next, page_size)}
+            ORDER BY folder {self.get_order(next)} 
+            LIMIT {page_size}
         """
-        return self.get_list(self.dbutil.run_parameterized_query(query, (param, value)), True)
+        return self.get_page_list(self.dbutil.run_parameterized_query(query, (param, value)), next)
 
     def get_filename_by_title(self, folder, title):
         """ Get filename by title
@@ -371,3 +442,107 @@ class Selector(object):
             return r[0]
         else:
             return None
+
+def get_benchmark_value(n, prefix):
+    """ Generate synthetic metadata value
+
+    :param n: value number
+    :param prefix: value prefix
+
+    :return: metadata value
+    """
+    w1 = BENCHMARK_WORDS[n % len(BENCHMARK_WORDS)]
+    w2 = BENCHMARK_WORDS[(n // len(BENCHMARK_WORDS)) % len(BENCHMARK_WORDS)]
+    return f"""{w1.capitalize()} {w2} {prefix} {n}"""
+
+def create_benchmark_collection(dbutil, rows):
+    """ Fill the database with synthetic collection
+
+    :param dbutil: DB utility
+    :param rows: number of rows
+    """
+    rnd = random.Random(0)
+    batch = []
+    for n in range(rows):
+        artist = rnd.randrange(rows // 40)
+        album = artist * 5 + rnd.randrange(5)
+        m = dict.fromkeys(ALL_METADATA)
+        m[FOLDER] = os.sep + get_benchmark_value(artist, "artist") + os.sep + get_benchmark_value(album, "album")
+        m[FILENAME] = f"""{n % 20:02d} {get_benchmark_value(n, "track")}.flac"""
+        m[TYPE] = "flac"
+        m[GENRE] = get_benchmark_value(rnd.randrange(50), "genre")
+        m[ARTIST] = get_benchmark_value(artist, "artist")
+        m[COMPOSER] = get_benchmark_value(rnd.randrange(rows // 200), "composer")
+        m[ALBUM] = get_benchmark_value(album, "album")
+        m[TITLE] = get_benchmark_value(n, "track")
+        m[DATE] = str(1950 + rnd.randrange(75))
+        batch.append([m[k] for k in ALL_METADATA])
+        if len(batch) == 5000:
+            dbutil.run_batch_insert(batch)
+            batch = []
+    if batch:
+        dbutil.run_batch_insert(batch)
+    dbutil.run_command("ANALYZE")
+    dbutil.refresh_counts()
+
+def benchmark(db_filename, rows):
+    """ Time topic and page queries on the synthetic collection
+
+    :param db_filename: database filename
+    :param rows: number of rows in the synthetic collection
+    """
+    dbutil = DbUtil(db_filename)
+    dbutil.connect()
+    if not dbutil.run_query(f"""SELECT id FROM {dbutil.table_name} LIMIT 1"""):
+        start = timer()
+        create_benchmark_collection(dbutil, rows)
+        logging.debug(f"""Created {rows} rows in {timer() - start:.2f} s""")
+
+    selector = Selector(dbutil)
+    size = BENCHMARK_PAGE_SIZE
+
+    for topic in TOPICS:
+        value = selector.get_page(topic, size)[0]
+        last = selector.get_page(topic, size, "\uffff", None, False)[0]
+        queries = [
+            ("page count", lambda: selector.get_page_count(topic, size)),
+            ("first page", lambda: selector.get_page(topic, size)),
+            ("next page", lambda: selector.get_page(topic, size, value, None, True)),
+            ("previous page", lambda: selector.get_page(topic, size, last, None, False)),
+            ("page count by char", lambda: selector.get_page_count_by_char(topic, "m", size)),
+            ("page by char", lambda: selector.get_page_by_char(topic, "m", page_size=size)),
+            ("page count by pattern", lambda: selector.get_page_count_by_pattern(topic, "ove", size)),
+            ("page by pattern", lambda: selector.get_page_by_pattern(topic, "ove", page_size=size)),
+            ("page count by column", lambda: selector.get_page_count_by_column(topic, value, size)),
+            ("page by column", lambda: selector.get_page_by_column(topic, value, page_size=size))
+        ]
+        for name, query in queries:
+            start = timer()
+            query()
+            logging.debug(f"""{topic:10} {name:24} {(timer() - start) * 1000:10.2f} ms""")
+
+    dbutil.disconnect()
+
+def main():
+    import argparse
+    log_handler = logging.StreamHandler(sys.stdout)
+    logging.basicConfig(
+        level=logging.NOTSET,
+        format='[%(asctime)s] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s',
+        handlers=[log_handler]
+    )
+    usage = """python -m util.selector benchmark [args]"""
+    parser = argparse.ArgumentParser(usage=usage)
+    subparsers = parser.add_subparsers(dest="command")
+
+    p = subparsers.add_parser("benchmark", help="time collection queries on synthetic collection")
+    p.add_argument("-o", help="database filename, synthetic collection is created if database is empty", required=True)
+    p.add_argument("-n", help="number of rows in synthetic collection", type=int, default=BENCHMARK_ROWS)
+
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark(args.o, args.n)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+#
+# This file is part of Peppy Player.
+#
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import logging
+
+from threading import RLock, Thread, Event, current_thread
+
+NAME = "name"
+THREAD = "thread"
+START = "start"
+DURATION = "duration"
+DEPENDENCIES = "dependencies"
+ERROR = "error"
+WAIT_PREFIX = "wait for "
+FIRST_SCREEN = "first screen"
+
+class StartupTask(object):
+    """ Startup stage """
+
+    def __init__(self, name, function, dependencies):
+        """ Initializer
+
+        :param name: stage name
+        :param function: stage function
+        :param dependencies: names of the stages which should be finished before this stage
+        """
+        self.name = name
+        self.function = function
+        self.dependencies = dependencies
+        self.result = None
+        self.error = None
+        self.thread_name = None
+        self.start_time = None
+        self.end_time = None
+        self.done = Event()
+
+class Startup(object):
+    """ Runs startup stages. The background stages run in separate threads as soon as
+    the stages they depend on are finished. The foreground stages run in the calling thread
+    and wait for the background stages only when they need their results.
+    The start time and duration of each stage and wait are collected into the startup timeline.
+    """
+
+    def __init__(self):
+        """ Initializer """
+
+        self.lock = RLock()
+        self.start_time = time.monotonic()
+        self.tasks = {}
+        self.pending = []
+        self.waits = []
+        self.first_screen_time = None
+        self.reported = False
+
+    def add_task(self, name, function, dependencies=None):
+        """ Add background stage. The stage starts when all its dependencies are finished.
+        The dependencies which were not added are considered finished.
+
+        :param name: stage name
+        :param function: stage function without parameters
+        :param dependencies: names of the stages which should be finished before this stage
+        """
+        task = StartupTask(name, function, dependencies or [])
+        with self.lock:
+            self.tasks[name] = task
+            self.pending.append(task)
+        self.start_ready_tasks()
+
+    def start_ready_tasks(self):
+        """ Start the pending stages whose dependencies are finished """
+
+        with self.lock:
+            ready = [t for t in self.pending if all(self.is_done(d) for d in t.dependencies)]
+            for task in ready:
+                self.pending.remove(task)
+
+        for task in ready:
+            Thread(target=self.run_task, args=[task], name=task.name, daemon=True).start()
+
+    def run_task(self, task):
+        """ Background stage thread method
+
+        :param task: startup task
+        """
+        task.thread_name = current_thread().name
+        task.start_time = time.monotonic()
+        try:
+            task.result = task.function()
+        except Exception as e:
+            logging.debug(f"""Startup stage '{task.name}' failed: {e}""")
+            task.error = str(e)
+        task.end_time = time.monotonic()
+        task.done.set()
+
+        self.start_ready_tasks()
+        self.report_if_finished()
+
+    def run_stage(self, name, function, *args):
+        """ Run foreground stage in the calling thread
+
+        :param name: stage name
+        :param function: stage function
+        :param args: function arguments
+
+        :return: function result
+        """
+        task = StartupTask(name, function, [])
+        task.thread_name = current_thread().name
+        with self.lock:
+            self.tasks[name] = task
+        task.start_time = time.monotonic()
+        try:
+            task.result = function(*args)
+            return task.result
+        except Exception as e:
+            task.error = str(e)
+            raise
+        finally:
+            task.end_time = time.monotonic()
+            task.done.set()
+            self.start_ready_tasks()
+
+    def is_done(self, name):
+        """ Check if stage is finished
+
+        :param name: stage name
+
+        :return: True - stage finished or wasn't added, False - stage is pending or running
+        """
+        with self.lock:
+            task = self.tasks.get(name, None)
+        return task == None or task.done.is_set()
+
+    def wait(self, name, timeout=None):
+        """ Wait until the stage is finished. The wait time is added to the timeline.
+
+        :param name: stage name
+        :param timeout: maximum wait time in seconds, None - wait until the stage is finished
+
+        :return: stage result or None if the stage wasn't added, failed or isn't finished during timeout
+        """
+        with self.lock:
+            task = self.tasks.get(name, None)
+        if task == None:
+            return None
+
+        if not task.done.is_set():
+            start = time.monotonic()
+            task.done.wait(timeout)
+            with self.lock:
+                self.waits.append((WAIT_PREFIX + name, current_thread().name, start, time.monotonic()))
+
+        return task.result
+
+    def get_result(self, name):
+        """ Get result of the finished stage without waiting
+
+        :param name: stage name
+
+        :return: stage result or None if the stage isn't finished
+        """
+        if not self.is_done(name):
+            return None
+        with self.lock:
+            task = self.tasks.get(name, None)
+        return task.result if task else None
+
+    def set_first_screen(self):
+        """ Mark the time when the first screen was drawn """
+
+        self.first_screen_time = time.monotonic()
+        self.report_if_finished()
+
+    def get_timeline(self):
+        """ Get startup timeline
+
+        :return: list of dictionaries with stage name, thread name, start time and duration in seconds
+            relative to the startup start, dependencies and error. The running stages have no duration.
+        """
+        timeline = []
+        with self.lock:
+            for task in self.tasks.values():
+                if task.start_time == None:
+                    continue
+                timeline.append({
+                    NAME: task.name,
+                    THREAD: task.thread_name,
+                    START: round(task.start_time - self.start_time, 3),
+                    DURATION: round(task.end_time - task.start_time, 3) if task.end_time else None,
+                    DEPENDENCIES: task.dependencies,
+                    ERROR: task.error
+                })
+            for name, thread_name, start, end in self.waits:
+                timeline.append({
+                    NAME: name,
+                    THREAD: thread_name,
+                    START: round(start - self.start_time, 3),
+                    DURATION: round(end - start, 3),
+                    DEPENDENCIES: [],
+                    ERROR: None
+                })
+            if self.first_screen_time:
+                timeline.append({
+                    NAME: FIRST_SCREEN,
+                    THREAD: None,
+                    START: round(self.first_screen_time - self.start_time, 3),
+                    DURATION: 0,
+                    DEPENDENCIES: [],
+                    ERROR: None
+                })
+
+        timeline.sort(key=lambda s: s[START])
+        return timeline
+
+    def report_if_finished(self):
+        """ Log the timeline once the first screen is drawn and all stages are finished """
+
+        with self.lock:
+            if self.reported or self.first_screen_time == None or self.pending:
+                return
+            if not all(t.done.is_set() for t in self.tasks.values()):
+                return
+            self.reported = True
+
+        self.report()
+
+    def report(self):
+        """ Log startup timeline """
+
+        lines = ["Startup timeline (start, duration in seconds):"]
+        for s in self.get_timeline():
+            duration = "running" if s[DURATION] == None else f"""{s[DURATION]:7.3f}"""
+            line = f"""{s[START]:7.3f} {duration}  {s[NAME]}"""
+            if s[THREAD]:
+                line += f""" [{s[THREAD]}]"""
+            if s[ERROR]:
+                line += f""" error: {s[ERROR]}"""
+            lines.append(line)
+        logging.debug("\n".join(lines))
@@ -0,0 +1,132 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+#
+# This file is part of Peppy Player.
+#
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from threading import RLock
+from concurrent.futures import ThreadPoolExecutor
+
+THUMBNAIL_WORKERS = 2
+
+class ThumbnailLoader(object):
+    """ Loads file thumbnails in the worker threads.
+    Each requester (e.g. file menu) can have only one active request.
+    The new request cancels the previous one, so the thumbnails of the pages
+    which were already scrolled away are not loaded.
+    """
+
+    def __init__(self, workers=THUMBNAIL_WORKERS, listener=None):
+        """ Initializer
+
+        :param workers: number of worker threads
+        :param listener: function called when thumbnail is loaded
+        """
+        self.lock = RLock()
+        self.listener = listener
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+        self.requests = {}
+        self.generation = 0
+
+    def load(self, owner, tasks):
+        """ Start loading thumbnails. Cancel the previous request of the same owner.
+
+        :param owner: requester object
+        :param tasks: list of tuples (state, function, arguments), the function returns thumbnail
+        """
+        with self.lock:
+            self.cancel(owner)
+            if not tasks:
+                return
+
+            self.generation += 1
+            futures = []
+            self.requests[owner] = (self.generation, futures, [])
+            for state, function, args in tasks:
+                f = self.executor.submit(self.run, owner, self.generation, state, function, args)
+                futures.append(f)
+
+    def run(self, owner, generation, state, function, args):
+        """ Load one thumbnail. Runs in the worker thread.
+
+        :param owner: requester object
+        :param generation: request generation
+        :param state: button state
+        :param function: function which returns thumbnail
+        :param args: function arguments
+        """
+        if not self.is_current(owner, generation):
+            return
+
+        try:
+            thumbnail = function(*args)
+        except Exception as e:
+            logging.debug(e)
+            return
+
+        with self.lock:
+            if not self.is_current(owner, generation):
+                return
+            self.requests[owner][2].append((state, thumbnail))
+
+        if self.listener:
+            self.listener()
+
+    def is_current(self, owner, generation):
+        """ Check that request wasn't cancelled
+
+        :param owner: requester object
+        :param generation: request generation
+
+        :return: True - current request, False - cancelled request
+        """
+        with self.lock:
+            r = self.requests.get(owner, None)
+            return r != None and r[0] == generation
+
+    def cancel(self, owner):
+        """ Cancel the pending tasks of the owner
+
+        :param owner: requester object
+        """
+        with self.lock:
+            r = self.requests.pop(owner, None)
+            if r:
+                for f in r[1]:
+                    f.cancel()
+
+    def get_results(self, owner):
+        """ Get thumbnails loaded since the previous call
+
+        :param owner: requester object
+
+        :return: list of tuples (state, thumbnail)
+        """
+        with self.lock:
+            r = self.requests.get(owner, None)
+            if r == None or len(r[2]) == 0:
+                return []
+            results = list(r[2])
+            del r[2][:]
+            return results
+
+    def shutdown(self):
+        """ Stop worker threads """
+
+        with self.lock:
+            for owner in list(self.requests.keys()):
+                self.cancel(owner)
+        self.executor.shutdown(wait=False)
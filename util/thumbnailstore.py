@@ -0,0 +1,242 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+#
+# This file is part of Peppy Player.
+#
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import logging
+import hashlib
+import pygame
+
+from io import BytesIO
+from PIL import Image
+from mutagen.id3 import ID3
+from mutagen.flac import FLAC
+from mutagen.mp4 import MP4
+from util.cache import DiskCache
+
+THUMBNAIL_STORE_FOLDER = os.path.join("cache", "thumbnails")
+THUMBNAIL_STORE_VERSION = 1
+THUMBNAIL_STORE_SIZE = 64 * 1024 * 1024
+BOXES_FILENAME = "boxes.json"
+
+def get_embedded_image_data(path):
+    """ Get image embedded into audio file. Supported formats: MP3, FLAC, MP4, M4A
+
+    :param path: audio file path
+
+    :return: encoded image bytes or None if file doesn't have embedded image
+    """
+    name = path.lower()
+    try:
+        if name.endswith(".mp3"):
+            tags = ID3(path)
+            if tags and tags.get("APIC:"):
+                return tags.get("APIC:").data
+        elif name.endswith(".flac"):
+            pictures = FLAC(path).pictures
+            if pictures:
+                return pictures[0].data
+        elif name.endswith(".mp4") or name.endswith(".m4a"):
+            pictures = MP4(path).tags["covr"]
+            if pictures:
+                return bytes(pictures[0])
+    except:
+        pass
+
+    return None
+
+def get_thumbnail_size(box, size):
+    """ Calculate the size of the image fitted into the box.
+    Uses the same rules as ImageUtil.get_scale_ratio
+
+    :param box: tuple (width, height) of the bounding box
+    :param size: tuple (width, height) of the image
+
+    :return: tuple (width, height) of the thumbnail
+    """
+    w, h = box
+    width, height = size
+
+    if (width >= w and height > h) or (width > w and height >= h):
+        k = min(w / width, h / height)
+        width = int(width * k)
+        height = int(height * k)
+    elif width > w and height < h:
+        k = w / width
+        width = int(width * k)
+        height = int(height * k)
+    elif width < w and height > h:
+        k = h / height
+        width = int(width * k)
+        height = int(height * k)
+    elif width < w and height < h:
+        k = min(w / width, h / height)
+        width = int(width * k)
+        height = int(height * k)
+    return (width, height)
+
+def create_thumbnail(data, box):
+    """ Decode and scale image
+
+    :param data: encoded image bytes
+    :param box: tuple (width, height) of the bounding box
+
+    :return: tuple (width, height, RGBA bytes)
+    """
+    img = Image.open(BytesIO(data)).convert("RGBA")
+    img = img.resize(get_thumbnail_size(box, img.size))
+    return (img.size[0], img.size[1], img.tobytes())
+
+class ThumbnailStore(DiskCache):
+    """ Persistent store of scaled thumbnails (embedded album art, folder images, image files).
+    The thumbnail key includes file path, modification time, size and bounding box,
+    so the modified files get new thumbnails. Files without image are also stored,
+    so that they are not parsed again. The store remembers the bounding boxes used by UI,
+    the collector uses them to create thumbnails in advance.
+    """
+
+    def __init__(self, folder=THUMBNAIL_STORE_FOLDER, version=THUMBNAIL_STORE_VERSION, max_size=THUMBNAIL_STORE_SIZE):
+        """ Initializer
+
+        :param folder: base store folder
+        :param version: store version
+        :param max_size: maximum size of all thumbnails in bytes
+        """
+        DiskCache.__init__(self, "thumbnail_store", folder, version, max_size)
+        self.boxes_path = os.path.join(folder, BOXES_FILENAME)
+        self.boxes = self.load_boxes()
+
+    def load_boxes(self):
+        """ Load bounding boxes used by UI
+
+        :return: list of tuples (width, height)
+        """
+        try:
+            with open(self.boxes_path) as f:
+                return [tuple(b) for b in json.load(f)]
+        except:
+            return []
+
+    def add_box(self, box):
+        """ Remember bounding box used by UI
+
+        :param box: tuple (width, height)
+        """
+        with self.lock:
+            if box in self.boxes:
+                return
+            self.boxes.append(box)
+            try:
+                with open(self.boxes_path, "w") as f:
+                    json.dump(self.boxes, f)
+            except Exception as e:
+                logging.debug(e)
+
+    def get_thumbnail_key(self, path, box):
+        """ Get thumbnail key
+
+        :param path: file path
+        :param box: tuple (width, height)
+
+        :return: key or None if file not found
+        """
+        try:
+            st = os.stat(path)
+        except:
+            return None
+        s = f"""{path}_{st.st_mtime_ns}_{st.st_size}_{box[0]}x{box[1]}"""
+        return hashlib.sha1(s.encode()).hexdigest()
+
+    def get_thumbnail(self, path, box):
+        """ Get thumbnail
+
+        :param path: file path
+        :param box: tuple (width, height)
+
+        :return: tuple (found, surface), surface is None if file doesn't have image
+        """
+        if not self.enabled or not path:
+            return (False, None)
+
+        box = (int(box[0]), int(box[1]))
+        key = self.get_thumbnail_key(path, box)
+        if key == None:
+            return (False, None)
+
+        r = self.get(key)
+        if r == None:
+            return (False, None)
+
+        w, h, buff = r
+        if w == 0 or h == 0:
+            return (True, None)
+        return (True, pygame.image.frombuffer(buff, (w, h), "RGBA"))
+
+    def put_thumbnail(self, path, box, surface):
+        """ Save thumbnail
+
+        :param path: file path
+        :param box: tuple (width, height)
+        :param surface: thumbnail surface or None if file doesn't have image
+        """
+        if not self.enabled or not path:
+            return
+
+        box = (int(box[0]), int(box[1]))
+        key = self.get_thumbnail_key(path, box)
+        if key == None:
+            return
+
+        self.add_box(box)
+        if surface == None:
+            self.put(key, 0, 0, b"")
+        else:
+            w, h = surface.get_size()
+            self.put(key, w, h, pygame.image.tostring(surface, "RGBA", False))
+
+    def warm_up(self, paths, progress_callback=None):
+        """ Create thumbnails of embedded images for all bounding boxes used by UI
+
+        :param paths: audio file paths
+        :param progress_callback: callback for reporting progress
+
+        :return: number of created thumbnails
+        """
+        created = 0
+        if not self.enabled or not self.boxes:
+            return created
+
+        total = len(paths)
+        for i, path in enumerate(paths):
+            keys = [(box, self.get_thumbnail_key(path, box)) for box in self.boxes]
+            keys = [(box, key) for box, key in keys if key and not os.path.exists(self.get_path(key))]
+            if keys:
+                data = get_embedded_image_data(path)
+                for box, key in keys:
+                    if data == None:
+                        self.put(key, 0, 0, b"")
+                        continue
+                    try:
+                        w, h, buff = create_thumbnail(data, box)
+                        self.put(key, w, h, buff)
+                        created += 1
+                    except Exception as e:
+                        logging.debug(e)
+            if progress_callback:
+                progress_callback(i + 1, total)
+
+        return created
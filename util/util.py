@@ -31,6 +31,7 @@ import threading
 from subprocess import Popen, PIPE
 from zipfile import ZipFile
 from ui.state import State
+from ui.compositor import Compositor
 from util.config import *
 from util.keys import *
 from util.fileutil import FileUtil, FOLDER_WITH_ICON, FILE_AUDIO, FILE_PLAYLIST, FILE_IMAGE
@@ -136,6 +137,7 @@ class Util(object):
         self.cd_titles = {}
         self.cd_track_names_cache = {}
         self.screensaver_cache = {}
+        self.screensaver_lock = threading.RLock()
         self.radio_player_playlist_cache = {}
         self.stream_player_playlist_cache = []
         self.radio_browser_playlist_cache = {}
@@ -145,6 +147,7 @@ class Util(object):
         self.screen_rect = self.config_class.screen_rect
         self.config[LABELS] = self.get_labels()
         self.pygame_screen = self.config_class.pygame_screen
+        self.compositor = Compositor()
         self.CURRENT_WORKING_DIRECTORY = os.getcwd()
         self.read_storage()
         self.discogs_util = DiscogsUtil(self.k1)
@@ -1077,20 +1080,21 @@ class Util(object):
         :param name: plug-in name        
         :return: screensaver object
         """
-        try:
-            s = self.screensaver_cache[name]
+        with self.screensaver_lock:
+            try:
+                s = self.screensaver_cache[name]
+                return s
+            except KeyError:
+                pass
+
+            p = PACKAGE_SCREENSAVER + ('.' + name.lower())*2
+            try:
+                m = importlib.import_module(p)
+            except Exception as e:
+                logging.debug(e)
+            s = getattr(m, name.title())(self)
+            self.screensaver_cache[name] = s
             return s
-        except KeyError:
-            pass
-        
-        p = PACKAGE_SCREENSAVER + ('.' + name.lower())*2
-        try:
-            m = importlib.import_module(p)
-        except Exception as e:
-            logging.debug(e)
-        s = getattr(m, name.title())(self)
-        self.screensaver_cache[name] = s
-        return s
 
     def run_script(self, script_name):
         """ Load and run script
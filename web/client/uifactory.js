@@ -57,7 +57,7 @@ function createComponent(d) {
 			sliderWidth = d.w;
 		}
 	} else if(d.type == "image") {
-		comp = createImage(d.name, d.data, d.filename, d.x, d.y, d.w, d.h);
+		comp = createImage(d.name, d.url, d.filename, d.x, d.y, d.w, d.h);
 		if(d.name == volumeKnobId || d.name == timerKnobId) {
 			comp.setAttribute("style", "cursor: move;");
 		} else if(d.name == "pause.image" && d.filename.endsWith("play.png")) {			
@@ -225,7 +225,7 @@ function createPanel(id, width, height, fgr, bgr, bgrType) {
 	panel.setAttribute('id', id);
 
 	if(bgrType == "image" && bgr) {
-		var img = createImage(bgr.filename, bgr.data, bgr.filename, bgr.x, bgr.y, bgr.w, bgr.h);
+		var img = createImage(bgr.filename, bgr.url, bgr.filename, bgr.x, bgr.y, bgr.w, bgr.h);
 		panel.appendChild(img);
 	} else {	
 		var rect = createRectangle(id + ".rect", 0, 0, width, height, fgr, bgr, 0);
@@ -284,7 +284,7 @@ function createRectangle(id, x, y, w, h, lineColor, fillColor, border) {
 * Creates SVG image component
 *
 * @param id - the name of component
-* @param data image data
+* @param url - image URL
 * @param filename - image filename
 * @param x - image X coordinate
 * @param y - image Y coordinate
@@ -293,18 +293,13 @@ function createRectangle(id, x, y, w, h, lineColor, fillColor, border) {
 * 
 * @return new SVG image
 */
-function createImage(id, data, filename, x, y, w, h) {
+function createImage(id, url, filename, x, y, w, h) {
 	console.log("image id:" + id + " filename:" + filename + " x:" + x + " y:" + y + " w:" + w + " h:" + h);
 	var img = document.createElementNS(SVG_URL, 'image');
 	if (filename.startsWith("http")) {
 		img.setAttributeNS(XLINK_URL, 'href', decodeURIComponent(filename));
-	} else {
-		if(filename.endsWith(".svg")) {
-			img.setAttributeNS(XLINK_URL, 'href', "data:image/svg+xml;base64," + data);
-		} else {
-			console.log(data.length);
-			img.setAttributeNS(XLINK_URL, 'href', "data:image/png;base64," + data);
-		}
+	} else if(url) {
+		img.setAttributeNS(XLINK_URL, 'href', url);
 	}
 
 	img.setAttribute('width', w);
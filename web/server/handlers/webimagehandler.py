@@ -0,0 +1,42 @@
+# Copyright 2026 Peppy Player peppy.player@gmail.com
+# 
+# This file is part of Peppy Player.
+# 
+# Peppy Player is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Peppy Player is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with Peppy Player. If not, see <http://www.gnu.org/licenses/>.
+
+from tornado.web import RequestHandler
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+class WebImageHandler(RequestHandler):
+    """ Serves images by content hash. The content never changes for the same hash. """
+
+    def initialize(self, util):
+        self.image_util = util.image_util
+
+    def get(self, sha, ext):
+        image = self.image_util.get_web_image(sha)
+        if image == None:
+            self.set_status(404)
+            return self.finish()
+
+        content_type, data = image
+        self.set_header("Content-Type", content_type)
+        self.set_header("Cache-Control", CACHE_CONTROL)
+        self.set_header("Etag", '"' + sha + '"')
+        if self.check_etag_header():
+            self.set_status(304)
+            return self.finish()
+
+        self.write(data)
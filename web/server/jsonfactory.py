@@ -277,11 +277,11 @@ class JsonFactory(object):
         c["h"] = img.get_height()
 
         if c["filename"].startswith(GENERATED_IMAGE):
-            c["data"] = self.image_util.get_base64_surface(img)
+            c["url"] = self.image_util.get_web_surface_url(img)
             return c
         
         if not c["filename"].startswith("http"):
-            c["data"] = self.image_util.load_image(c["filename"], True)
+            c["url"] = self.image_util.get_web_image_url(c["filename"])
         
         if "_" in c["filename"] and not c["filename"].startswith("http"):
             c["filename"] = c["filename"][0 : c["filename"].find("_")]
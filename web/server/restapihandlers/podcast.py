@@ -50,6 +50,9 @@ class PodcastHandler(RequestHandler):
                 url = resource.split("=")
                 episodes = self.podcast_util.get_episodes(url[1])
                 payload = self.convert_episodes_to_dictionaries(episodes)
+            elif resource == "downloads":
+                download_manager = self.podcast_util.get_download_manager()
+                payload = download_manager.get_status() if download_manager else []
             self.write(json.dumps(payload))
         except:
             self.set_status(500)
@@ -22,6 +22,7 @@ import tornado.web
 import os
 import json
 import asyncio
+import hashlib
 
 from threading import Thread, RLock
 from util.config import WEB_SERVER, HTTP_PORT, HTTPS, SCREENSAVER, NAME
@@ -49,6 +50,7 @@ from web.server.handlers.nasmanager import NasManager
 from web.server.handlers.sharefolder import ShareFolder
 from web.server.handlers.loghandler import LogHandler
 from web.server.handlers.playlisthandler import PlaylistHandler as PlaylistDownLoader
+from web.server.handlers.webimagehandler import WebImageHandler
 # REST API
 from web.server.restapihandlers.about import AboutHandler
 from web.server.restapihandlers.newrelease import NewReleaseHandler
@@ -81,6 +83,13 @@ from web.server.restapihandlers.genres import GenresHandler
 from web.server.restapihandlers.genre import GenreHandler
 from web.server.restapihandlers.radioplayer import RadioPlayerHandler
 from web.server.restapihandlers.podcast import PodcastHandler
+from web.server.restapihandlers.cache import CacheHandler
+from web.server.restapihandlers.frame import FrameHandler
+from web.server.restapihandlers.mpd import MpdHandler
+from web.server.restapihandlers.startup import StartupHandler
+
+FULL_UPDATE_COMMANDS = ["update_screen"]
+DELTA_UPDATE_COMMANDS = ["update_element"]
 
 class WebServer(object):
     """ Starts Tornado web server in a separate thread """
@@ -98,6 +107,7 @@ class WebServer(object):
         self.peppy = peppy
         self.web_clients = []
         self.player_listeners = []
+        self.component_hashes = {}
         self.json_factory = JsonFactory(util, peppy)
         self.instance = None
         thread = Thread(target=self.start_web_server)
@@ -141,6 +151,7 @@ class WebServer(object):
             (r"/sharefolder/(.*)", ShareFolder, {"peppy": self.peppy}),
             (r"/log", LogHandler, {"util": self.util}),
             (r"/playlist", PlaylistDownLoader, {"root": root}),
+            (r"/img/([0-9a-f]+)(\.\w+)?", WebImageHandler, {"util": self.util}),
             # Public REST API
             ("/api/about", AboutHandler, {"peppy": self.peppy}),
             ("/api/newrelease", NewReleaseHandler, {"peppy": self.peppy}),
@@ -177,7 +188,11 @@ class WebServer(object):
             ("/api/genres", GenresHandler, {"peppy": self.peppy}),
             ("/api/genre", GenreHandler, {"peppy": self.peppy}),
             ("/api/radioplayer", RadioPlayerHandler, {"peppy": self.peppy}),
-            ("/api/podcasts/(.*)", PodcastHandler, {"peppy": self.peppy})
+            ("/api/podcasts/(.*)", PodcastHandler, {"peppy": self.peppy}),
+            ("/api/cache", CacheHandler, {"peppy": self.peppy}),
+            ("/api/frame", FrameHandler, {"peppy": self.peppy}),
+            ("/api/mpd", MpdHandler, {"peppy": self.peppy}),
+            ("/api/startup", StartupHandler, {"peppy": self.peppy})
         ])
 
         if self.config[WEB_SERVER][HTTPS]:
@@ -198,6 +213,7 @@ class WebServer(object):
         :param state: object with Web UI component as event_origin attribute
         """
         if not (state and getattr(state, "event_origin", None) != None): return
+        if not self.web_clients: return
         
         j = self.json_factory.container_to_json(state.event_origin)
         self.send_json_to_web_ui(j)
@@ -205,16 +221,21 @@ class WebServer(object):
     def update_player_listeners(self, state=None):
         """ Update player listeners """
         
+        if not self.web_clients: return
+
         for c in self.player_listeners:
             self.send_json_to_web_ui(self.json_factory.container_to_json(c))
     
     def redraw_web_ui(self, state=None):
         """ Redraw the whole screen in web UI """
         
+        if not self.web_clients: return
+
         self.send_json_to_web_ui(self.screen_to_json())
             
     def start_screensaver_to_json(self, state=None):
         """ Send command to web UI to start screensaver """
+        self.clear_component_hashes()
         if state == None:
             self.send_json_to_web_ui(self.json_factory.start_screensaver_to_json())
         else:
@@ -238,6 +259,7 @@ class WebServer(object):
     def stop_screensaver_to_json(self, state=None):
         """ Send command to web UI to stop screensaver """
         
+        self.clear_component_hashes()
         self.send_json_to_web_ui(self.json_factory.stop_screensaver_to_json())        
     
     def screen_to_json(self):
@@ -253,7 +275,7 @@ class WebServer(object):
                 current_screen = self.peppy.screensaver_dispatcher.current_screensaver.name
                 if current_screen not in WEB_SAVERS:
                     current_screen = KEY_ABOUT
-                    screen = self.peppy.screens[KEY_ABOUT]
+                    screen = self.peppy.get_about_screen()
                     screen.visible = True
         return self.json_factory.screen_to_json(current_screen, screen)
 
@@ -275,16 +297,80 @@ class WebServer(object):
         self.send_json_to_web_ui(j)
     
     def send_json_to_web_ui(self, j):
-        """ Send provided Json object to all web clients
+        """ Send provided Json object to all web clients.
+        The object is serialized once and the same message is sent to all clients.
         
         "param j": Json object to send
         """
+        if not self.web_clients or self.instance == None:
+            return
+
         try:
-            for c in self.web_clients:
-                e = json.dumps(j).encode(encoding="utf-8")
-                self.instance.add_callback(c.write_message, e)
+            e = self.serialize(j)
+            if e != None:
+                self.instance.add_callback(self.broadcast, e)
         except Exception as e:
-            logging.debug(e)    
+            logging.debug(e)
+
+    def clear_component_hashes(self):
+        """ Forget the components sent last time. The next delta update sends all components
+        because web UI replaces the screen on screensaver start and stop.
+        """
+        with self.lock:
+            self.component_hashes.clear()
+
+    def serialize(self, j):
+        """ Serialize Json object. 
+        Each component is serialized separately and its hash is compared with the hash 
+        of the component sent last time. Unchanged components are removed from delta updates.
+
+        :param j: Json object
+
+        :return: UTF-8 encoded message or None if there is nothing to send
+        """
+        components = j.get("components", None)
+        if components == None:
+            return json.dumps(j).encode(encoding="utf-8")
+
+        command = j.get("command", None)
+        parts = []
+
+        with self.lock:
+            if command in FULL_UPDATE_COMMANDS:
+                self.component_hashes.clear()
+
+            for c in components:
+                s = json.dumps(c)
+                if isinstance(c, dict) and c.get("name", None):
+                    name = c["name"]
+                    h = hashlib.sha1(s.encode(encoding="utf-8")).digest()
+                    if command in DELTA_UPDATE_COMMANDS and self.component_hashes.get(name, None) == h:
+                        continue
+                    self.component_hashes[name] = h
+                parts.append(s)
+
+        if command in DELTA_UPDATE_COMMANDS and not parts:
+            return None
+
+        header = dict(j)
+        del header["components"]
+        h = json.dumps(header)[:-1]
+        if header:
+            h += ", "
+        message = h + "\"components\": [" + ", ".join(parts) + "]}"
+
+        return message.encode(encoding="utf-8")
+
+    def broadcast(self, message):
+        """ Send message to all web clients. Runs in the web server thread.
+
+        :param message: encoded message
+        """
+        for c in list(self.web_clients):
+            try:
+                c.write_message(message)
+            except Exception as e:
+                logging.debug(e)
 
     def add_player_listener(self, listener):
         """ Add player web listener